@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IncrementumConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Incrementum'
+
+    def ready(self):
+        from . import lookups, signals  # noqa: F401
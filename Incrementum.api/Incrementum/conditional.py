@@ -0,0 +1,82 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from Incrementum.models.stock import StockModel
+
+CACHEABLE_STATUSES = (200, 304)
+
+
+def _change_stamps(request, ticker, include_stock):
+    """
+    Timestamps behind a per-symbol response: the latest bar time, and for
+    metadata the stock row's updated_at too. Looked up once per request and
+    shared by the ETag and Last-Modified checks.
+    """
+    if not hasattr(request, '_symbol_change_stamps'):
+        row = StockModel.objects.filter(symbol__iexact=ticker).values(
+            'updated_at', 'latest_bar__day_and_time'
+        ).first()
+        stamps = []
+        if row:
+            stamps.append(row['latest_bar__day_and_time'])
+            if include_stock:
+                stamps.append(row['updated_at'])
+        request._symbol_change_stamps = [
+            timezone.make_aware(s) if timezone.is_naive(s) else s
+            for s in stamps if s is not None
+        ]
+    return request._symbol_change_stamps
+
+
+def symbol_conditional(view_name, include_stock=False):
+    """
+    Conditional GET for views keyed by ``ticker``. ETag and Last-Modified
+    come from the symbol's latest bar. Period windows roll daily, so the
+    ETag also covers the request parameters and the current date, and
+    Last-Modified is never earlier than the start of today: a client
+    revalidating with If-Modified-Since alone must not get yesterday's
+    window back as a 304. A matching validator gets a 304 before the view
+    runs.
+    Successful responses are marked publicly cacheable for
+    HISTORY_CACHE_MAX_AGE seconds.
+    """
+    def last_modified(request, ticker):
+        stamps = _change_stamps(request, ticker, include_stock)
+        if not stamps:
+            return None
+        start_of_today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(*stamps, start_of_today)
+
+    def etag(request, ticker):
+        stamps = _change_stamps(request, ticker, include_stock)
+        if not stamps:
+            return None
+        key = ":".join([
+            view_name,
+            ticker.upper(),
+            str(sorted(request.GET.items())),
+            *(stamp.isoformat() for stamp in stamps),
+            str(timezone.now().date()),
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in CACHEABLE_STATUSES:
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=getattr(settings, 'HISTORY_CACHE_MAX_AGE', 60),
+                )
+            return response
+        return wrapper
+    return decorator
@@ -1,24 +1,31 @@
 from ..stock_history_service import StockHistoryService
-from ..yrhilo import (
-    current_price_dict,
-    fifty_two_week_high_dict,
-    fifty_two_week_low_dict,
-    day_percent_change
-)
-from django.db import connection
 import json
 import logging
+import numpy as np
 import pandas as pd
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from Incrementum.models.stock import StockModel
+from Incrementum.conditional import symbol_conditional
+from Incrementum.downsampling import (
+    DOWNSAMPLE_METHODS,
+    MIN_POINTS,
+    lttb_indices,
+    ohlc_downsample,
+)
+from Incrementum.fast_json import FastJsonResponse
+from Incrementum.models.stock import StockModel, parse_stock_fields, stock_columns
+from Incrementum.screener import Screener
 from Incrementum.serializers import StockSerializer
 from Incrementum.get_stock_info import search_stocks, get_stock_by_ticker
+from ..services.quote_service import QuoteService
 from ..services.stock_service import StockService
 from ..services.model_inference_service import ModelInferenceService
 logger = logging.getLogger(__name__)
 
+MAX_QUOTE_SYMBOLS = 1000
+TS_FORMATS = ('iso', 'epoch')
+
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
@@ -61,86 +68,46 @@ def get_stock_info_controller(request, ticker):
     return JsonResponse(stock_data.to_dict(), status=200)
 
 
+def _stock_metadata(stock, quote):
+    return {
+        'symbol': stock.symbol,
+        'company_name': stock.company_name,
+        'description': stock.description,
+        'market_cap': stock.market_cap,
+        'primary_exchange': stock.primary_exchange,
+        'type': stock.type,
+        'currency_name': stock.currency_name,
+        'cik': stock.cik,
+        'composite_figi': stock.composite_figi,
+        'share_class_figi': stock.share_class_figi,
+        'outstanding_shares': stock.outstanding_shares,
+        'homepage_url': stock.homepage_url,
+        'total_employees': stock.total_employees,
+        'list_date': (
+            stock.list_date.isoformat() if stock.list_date else None
+        ),
+        'locale': stock.locale,
+        'sic_code': stock.sic_code,
+        'sic_description': stock.sic_description,
+        'updated_at': (
+            stock.updated_at.isoformat() if stock.updated_at else None
+        ),
+        'eps': (float(stock.eps) if stock.eps is not None else None),
+        # Quote snapshot from latest_bar, daily_close and 52-week extrema
+        **quote,
+    }
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
+@symbol_conditional('metadata', include_stock=True)
 def get_stock_metadata(request, ticker):
     try:
-        stock = StockModel.objects.get(symbol__iexact=ticker)
-        symbol = stock.symbol
-
-        # Get financial data from stock_history using yrhilo functions
-        current_prices = current_price_dict(stock=symbol)
-        highs_52w = fifty_two_week_high_dict(stock=symbol)
-        lows_52w = fifty_two_week_low_dict(stock=symbol)
-        percent_changes = day_percent_change(stock=symbol)
-
-        # Get open, high, low from most recent day
-        query = """
-            SELECT open_price, high, low
-            FROM incrementum.stock_history
-            WHERE stock_symbol = %s
-            ORDER BY day_and_time DESC
-            LIMIT 1
-        """
-        with connection.cursor() as cursor:
-            cursor.execute(query, [symbol])
-            result = cursor.fetchone()
-
-        current_price = current_prices.get(symbol)
-        high_52w = highs_52w.get(symbol)
-        low_52w = lows_52w.get(symbol)
-        percent_change = percent_changes.get(symbol)
-
-        # Convert from cents to dollars
-        open_price = result[0] / 100 if result and result[0] else None
-        day_high = result[1] / 100 if result and result[1] else None
-        day_low = result[2] / 100 if result and result[2] else None
-        current_price = current_price / 100 if current_price else None
-        high_52w = high_52w / 100 if high_52w else None
-        low_52w = low_52w / 100 if low_52w else None
-
-        # Calculate previous close from current and percent change
-        previous_close = None
-        change = None
-        if current_price and percent_change is not None:
-            previous_close = current_price / (1 + percent_change / 100)
-            change = current_price - previous_close
+        stock = QuoteService.annotate(StockModel.objects).get(symbol__iexact=ticker)
+        QuoteService.refresh_expired_ranges([stock])
+        quote = QuoteService.quote(stock)
 
-        return JsonResponse({
-            'symbol': stock.symbol,
-            'company_name': stock.company_name,
-            'description': stock.description,
-            'market_cap': stock.market_cap,
-            'primary_exchange': stock.primary_exchange,
-            'type': stock.type,
-            'currency_name': stock.currency_name,
-            'cik': stock.cik,
-            'composite_figi': stock.composite_figi,
-            'share_class_figi': stock.share_class_figi,
-            'outstanding_shares': stock.outstanding_shares,
-            'homepage_url': stock.homepage_url,
-            'total_employees': stock.total_employees,
-            'list_date': (
-                stock.list_date.isoformat() if stock.list_date else None
-            ),
-            'locale': stock.locale,
-            'sic_code': stock.sic_code,
-            'sic_description': stock.sic_description,
-            'updated_at': (
-                stock.updated_at.isoformat() if stock.updated_at else None
-            ),
-            'eps': (float(stock.eps) if stock.eps is not None else None),
-            # Financial data from stock_history
-            'currentPrice': current_price,
-            'open': open_price,
-            'high': day_high,
-            'low': day_low,
-            'previousClose': previous_close,
-            'change': change,
-            'changePercent': percent_change,
-            'high52Week': high_52w,
-            'low52Week': low_52w,
-        }, status=200)
+        return JsonResponse(_stock_metadata(stock, quote), status=200)
     except StockModel.DoesNotExist:
         return JsonResponse(
             {'error': f'Stock with ticker {ticker} not found'},
@@ -154,54 +121,137 @@ def get_stock_metadata(request, ticker):
         )
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def get_stock_quotes(request):
+    """
+    Metadata and quote for many tickers in one request, with the same fields
+    as get_stock_metadata. Body: {"tickers": [...]} (at most
+    MAX_QUOTE_SYMBOLS). Results keep the request order; unknown tickers are
+    listed under "missing".
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+
+    tickers = data.get('tickers', [])
+    if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
+        return JsonResponse({'error': 'tickers must be a list of strings'}, status=400)
+    if len(tickers) > MAX_QUOTE_SYMBOLS:
+        return JsonResponse(
+            {'error': f'At most {MAX_QUOTE_SYMBOLS} tickers per request'},
+            status=400
+        )
+
+    symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    try:
+        stocks = list(QuoteService.annotate(StockModel.objects.filter(symbol__in=symbols)))
+        QuoteService.refresh_expired_ranges(stocks)
+    except Exception as e:
+        logger.error(f"Error fetching quotes for {len(symbols)} tickers: {str(e)}")
+        return JsonResponse({'error': 'Error fetching stock data'}, status=500)
+
+    by_symbol = {stock.symbol: stock for stock in stocks}
+    return JsonResponse({
+        'quotes': [
+            _stock_metadata(by_symbol[symbol], QuoteService.quote(by_symbol[symbol]))
+            for symbol in symbols if symbol in by_symbol
+        ],
+        'missing': [symbol for symbol in symbols if symbol not in by_symbol],
+    }, status=200)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
+@symbol_conditional('graph')
 def get_stock_graph(request, ticker):
     period = request.GET.get("period", "1y")
     interval = request.GET.get("interval", "1d")
+    downsample = request.GET.get("downsample", "lttb")
+    ts_format = request.GET.get("ts_format", "iso")
+    if ts_format not in TS_FORMATS:
+        return JsonResponse(
+            {"error": f"ts_format must be one of: {', '.join(TS_FORMATS)}"},
+            status=400
+        )
+    try:
+        max_points = int(request.GET["max_points"]) if request.GET.get("max_points") else None
+    except ValueError:
+        return JsonResponse({"error": "max_points must be an integer"}, status=400)
+    if max_points is not None and max_points < MIN_POINTS:
+        return JsonResponse({"error": f"max_points must be at least {MIN_POINTS}"}, status=400)
+    if downsample not in DOWNSAMPLE_METHODS:
+        return JsonResponse(
+            {"error": f"downsample must be one of: {', '.join(DOWNSAMPLE_METHODS)}"},
+            status=400
+        )
+
     history_service = StockHistoryService()
     history, metadata = history_service.history(ticker, period=period, interval=interval)
     if history is None or history.empty:
         return JsonResponse({
             "error": f"No data found for {ticker} with period={period} and interval={interval}"
         }, status=404)
-    try:
-        if 'day_and_time' in history.columns:
-            date_series = pd.to_datetime(history['day_and_time'])
-            dates = [ts.strftime("%Y-%m-%dT%H:%M:%S") for ts in date_series]
-        else:
-            dates = [ts.strftime("%Y-%m-%dT%H:%M:%S") for ts in history.index.to_pydatetime()]
-    except Exception:
-        dates = [str(i) for i in range(len(history))]
-
-    # Convert from cents to dollars
-    close = [None if (pd.isna(v)) else float(v) / 100 for v in history["close_price"].tolist()]
-    open_ = (
-        [None if (pd.isna(v)) else float(v) / 100 for v in history["open_price"].tolist()]
-        if "open_price" in history.columns else [None] * len(dates)
-    )
-    high = (
-        [None if (pd.isna(v)) else float(v) / 100 for v in history["high"].tolist()]
-        if "high" in history.columns else [None] * len(dates)
-    )
-    low = (
-        [None if (pd.isna(v)) else float(v) / 100 for v in history["low"].tolist()]
-        if "low" in history.columns else [None] * len(dates)
-    )
+    if 'day_and_time' in history.columns:
+        date_series = pd.to_datetime(history['day_and_time'])
+    else:
+        date_series = pd.Series(pd.to_datetime(history.index))
+    if date_series.dt.tz is not None:
+        date_series = date_series.dt.tz_convert('UTC').dt.tz_localize(None)
+    if ts_format == "epoch":
+        dates = date_series.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    else:
+        dates = date_series.dt.strftime("%Y-%m-%dT%H:%M:%S").to_numpy(dtype=object)
+
+    prices = {
+        column: (
+            pd.to_numeric(history[column], errors="coerce").to_numpy(dtype=float)
+            if column in history.columns else np.full(len(history), np.nan)
+        )
+        for column in ("open_price", "high", "low", "close_price")
+    }
+
+    # Bound the payload: reduce to max_points before serializing.
+    original_count = len(dates)
+    downsampled = max_points is not None and original_count > max_points
+    if downsampled and downsample == "ohlc":
+        rows, *ohlc = ohlc_downsample(
+            prices["open_price"], prices["high"], prices["low"], prices["close_price"],
+            max_points,
+        )
+        prices = dict(zip(("open_price", "high", "low", "close_price"), ohlc))
+    elif downsampled:
+        rows = lttb_indices(prices["close_price"], max_points)
+        prices = {column: values[rows] for column, values in prices.items()}
+    if downsampled:
+        dates = dates[rows]
+
+    # Convert from cents to dollars; NaN is encoded as null.
+    close = prices["close_price"] / 100
+    open_ = prices["open_price"] / 100
+    high = prices["high"] / 100
+    low = prices["low"] / 100
 
     graphdata = {
         "period": period,
         "interval": interval,
         "count": len(dates),
-        "dates": dates,
+        "original_count": original_count,
+        "downsampled": downsampled,
+        "dates": dates if ts_format == "epoch" else dates.tolist(),
         "close": close,
         "open": open_,
         "high": high,
         "low": low,
     }
+    if downsampled:
+        graphdata["downsample"] = downsample
 
     logging.info("Returning JSON for %s (%d points)", ticker, len(dates))
-    return JsonResponse(graphdata, status=200)
+    return FastJsonResponse(graphdata, status=200)
 
 
 @csrf_exempt
@@ -212,9 +262,36 @@ def get_database_stocks(request):
 
     limit = min(limit, 1000)
 
+    try:
+        fields = parse_stock_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Keyset mode: ?cursor= (empty for the first page) seeks by symbol
+    # instead of scanning past `offset` rows.
+    if 'cursor' in request.GET:
+        try:
+            result = Screener(fields=fields).query_keyset(
+                [], page_size=limit, cursor=request.GET.get('cursor') or None
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        stocks_data = [stock.to_dict(fields) for stock in result['stocks']]
+        return JsonResponse({
+            'count': len(stocks_data),
+            'limit': limit,
+            'next_cursor': result['next_cursor'],
+            'prev_cursor': result['prev_cursor'],
+            'stocks': stocks_data
+        }, status=200)
+
     total_count = StockModel.objects.count()
-    stocks = StockModel.objects.all().order_by('symbol')[offset:offset+limit]
-    stocks_data = [stock.to_dict() for stock in stocks]
+    stocks = StockModel.objects.all()
+    if fields:
+        stocks = stocks.only(*stock_columns(fields))
+    stocks = stocks.order_by('symbol')[offset:offset+limit]
+    stocks_data = [stock.to_dict(fields) for stock in stocks]
 
     return JsonResponse({
         'total': total_count,
@@ -233,8 +310,16 @@ def get_stocks_by_tickers(request):
         tickers = data.get('tickers', [])
         if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
             return JsonResponse({'error': 'tickers must be a list of strings'}, status=400)
-        stocks = StockService.get_stocks_by_symbols(tickers)
+        try:
+            fields = parse_stock_fields(request.GET.get('fields', data.get('fields')))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        stocks = StockService.get_stocks_by_symbols(tickers, fields=fields)
         logger.info(f"Got {len(stocks)} stocks")
+        if fields:
+            return JsonResponse(
+                {'stocks': [stock.to_dict(fields) for stock in stocks]}, status=200
+            )
         serializer = StockSerializer(stocks, many=True)
         return JsonResponse({'stocks': serializer.data}, status=200)
     except Exception as e:
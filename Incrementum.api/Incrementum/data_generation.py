@@ -0,0 +1,47 @@
+"""
+Global data-generation counter.
+
+Anything memoized from stock or stock_history data (count caches, result
+caches, in-memory snapshots) keys itself on the current generation, and the
+generation is bumped whenever that data is written. Stale entries are then
+simply never read again rather than having to be found and deleted.
+
+The counter lives in the ``SCREENER_CACHE_ALIAS`` cache. Point that alias at
+a backend shared between processes (file, redis, memcached) when writers run
+outside the web process, e.g. the ingest job calling
+``manage.py bump_data_generation``. stock_history is only written in bulk,
+so it bumps once per load through that command rather than per bar.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+DATA_GENERATION_CACHE_KEY = 'incrementum:data-generation'
+
+
+def screener_cache_alias() -> str:
+    return getattr(settings, 'SCREENER_CACHE_ALIAS', 'default')
+
+
+def data_generation_is_shared() -> bool:
+    """Whether a bump in one process is seen by every other process."""
+    return not isinstance(caches[screener_cache_alias()], (LocMemCache, DummyCache))
+
+
+def get_data_generation() -> int:
+    cache = caches[screener_cache_alias()]
+    generation = cache.get(DATA_GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(DATA_GENERATION_CACHE_KEY, 1, timeout=None)
+        generation = cache.get(DATA_GENERATION_CACHE_KEY, 1)
+    return generation
+
+
+def bump_data_generation() -> int:
+    cache = caches[screener_cache_alias()]
+    try:
+        return cache.incr(DATA_GENERATION_CACHE_KEY)
+    except ValueError:
+        cache.add(DATA_GENERATION_CACHE_KEY, 2, timeout=None)
+        return cache.get(DATA_GENERATION_CACHE_KEY, 2)
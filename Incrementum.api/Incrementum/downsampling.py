@@ -0,0 +1,71 @@
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'ohlc')
+MIN_POINTS = 3
+
+
+def bucket_edges(length: int, buckets: int) -> np.ndarray:
+    """Start offsets of ``buckets`` near-equal contiguous buckets over ``length`` rows."""
+    return np.linspace(0, length, buckets + 1).astype(np.int64)[:-1]
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of at most ``max_points`` rows
+    of ``values`` that keep the visual shape of the series. The first and
+    last rows are always kept; each interior bucket contributes the row
+    forming the largest triangle with the previously kept row and the mean
+    of the next bucket. Rows are evenly spaced on the x axis, as the chart
+    draws them. NaN rows are only chosen when a bucket has nothing else.
+    """
+    length = len(values)
+    if max_points >= length or length <= MIN_POINTS:
+        return np.arange(length)
+    max_points = max(max_points, MIN_POINTS)
+
+    y = np.asarray(values, dtype=np.float64)
+    # Interior rows 1..length-2 split into max_points - 2 buckets.
+    edges = np.linspace(1, length - 1, max_points - 1).astype(np.int64)
+    filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    sums = np.add.reduceat(filled[1:length - 1], edges[:-1] - 1)
+    means = sums / np.diff(edges)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < max_points - 2:
+            next_x = (edges[bucket + 1] + edges[bucket + 2] - 1) / 2
+            next_y = means[bucket + 1]
+        else:
+            next_x, next_y = length - 1, filled[length - 1]
+        x = np.arange(start, end)
+        area = np.abs(
+            (previous - next_x) * (y[start:end] - filled[previous])
+            - (previous - x) * (next_y - filled[previous])
+        )
+        previous = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def ohlc_downsample(open_, high, low, close, max_points: int):
+    """
+    Merge consecutive bars into at most ``max_points`` candles: first open,
+    highest high, lowest low, last close. Returns (starts, open, high, low,
+    close) where ``starts`` indexes the first source bar of each candle.
+    """
+    length = len(close)
+    if max_points >= length:
+        return np.arange(length), open_, high, low, close
+    starts = bucket_edges(length, max(max_points, 1))
+    ends = np.append(starts[1:], length) - 1
+    return (
+        starts,
+        open_[starts],
+        np.fmax.reduceat(high, starts),
+        np.fmin.reduceat(low, starts),
+        close[ends],
+    )
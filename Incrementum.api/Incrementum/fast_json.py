@@ -0,0 +1,39 @@
+import json
+
+import numpy as np
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """
+    Encode ``data`` as JSON bytes. NumPy arrays and scalars are written
+    directly (NaN as null); orjson is used when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, default=_default).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse counterpart that encodes with dumps()."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
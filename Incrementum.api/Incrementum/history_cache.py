@@ -0,0 +1,182 @@
+"""
+Per-process cache of stock_history bars as NumPy arrays.
+
+Entries hold every bar of one (symbol, is_hourly) series from a start time
+onwards. A hit only fetches bars newer than the cached tail and appends
+them; the requested window is then sliced out with a binary search. Entries
+are evicted least-recently-used once the cache exceeds its byte budget, and
+reloaded in full after ``HISTORY_ARRAY_CACHE_REFRESH_SECONDS`` so corrected or
+backfilled bars are picked up.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+TIME_DTYPE = np.dtype("<M8[us]")
+COLUMN_DTYPES = {
+    "open_price": np.dtype("<i4"),
+    "close_price": np.dtype("<i4"),
+    "high": np.dtype("<i4"),
+    "low": np.dtype("<i4"),
+    "volume": np.dtype("<i8"),
+}
+BAR_COLUMNS = tuple(COLUMN_DTYPES)
+
+
+@dataclass
+class HistorySeries:
+    """
+    Time-ordered bars of one series, from ``start`` (None: all history).
+    ``columns`` may hold any subset of BAR_COLUMNS.
+    """
+    start: Optional[np.datetime64]
+    times: np.ndarray
+    columns: dict
+    is_hourly: np.ndarray
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_frame(cls, df: Optional[pd.DataFrame], start=None) -> "HistorySeries":
+        if df is None or df.empty:
+            return cls(
+                start=start,
+                times=np.empty(0, dtype=TIME_DTYPE),
+                columns={c: np.empty(0, dtype=d) for c, d in COLUMN_DTYPES.items()},
+                is_hourly=np.empty(0, dtype=bool),
+            )
+        times = pd.to_datetime(df["day_and_time"])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+        return cls(
+            start=start,
+            times=times.to_numpy(dtype=TIME_DTYPE),
+            columns={c: df[c].to_numpy(dtype=d) for c, d in COLUMN_DTYPES.items()},
+            is_hourly=df["is_hourly"].fillna(True).to_numpy(dtype=bool),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.times.nbytes
+            + self.is_hourly.nbytes
+            + sum(values.nbytes for values in self.columns.values())
+        )
+
+    @property
+    def tail(self) -> Optional[np.datetime64]:
+        return self.times[-1] if len(self.times) else None
+
+    def covers(self, start: Optional[np.datetime64]) -> bool:
+        if self.start is None:
+            return True
+        return start is not None and start >= self.start
+
+    def append(self, newer: "HistorySeries") -> "HistorySeries":
+        return HistorySeries(
+            start=self.start,
+            times=np.concatenate([self.times, newer.times]),
+            columns={
+                c: np.concatenate([values, newer.columns[c]])
+                for c, values in self.columns.items()
+            },
+            is_hourly=np.concatenate([self.is_hourly, newer.is_hourly]),
+            loaded_at=self.loaded_at,
+        )
+
+    def window(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """Bars with start <= day_and_time < end, in get_db_history's shape."""
+        lo = np.searchsorted(self.times, start, side="left") if start is not None else 0
+        hi = np.searchsorted(self.times, end, side="left") if end is not None else len(self.times)
+        frame = {
+            "stock_symbol": np.full(hi - lo, ticker, dtype=object),
+            "day_and_time": self.times[lo:hi].astype("datetime64[ns]"),
+        }
+        frame.update({c: values[lo:hi] for c, values in self.columns.items()})
+        frame["is_hourly"] = self.is_hourly[lo:hi]
+        return pd.DataFrame(frame, copy=False)
+
+
+class HistoryCache:
+    """Thread-safe LRU of HistorySeries bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int, refresh_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.refresh_seconds = refresh_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[HistorySeries]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.refresh_seconds is not None and (
+                time.monotonic() - entry.loaded_at > self.refresh_seconds
+            ):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry: HistorySeries):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if entry.nbytes > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        self.nbytes -= self._entries.pop(key).nbytes
+
+
+_history_cache = None
+_history_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> Optional[HistoryCache]:
+    """The process-wide cache, or None when HISTORY_ARRAY_CACHE_MAX_BYTES is 0."""
+    global _history_cache
+    max_bytes = getattr(settings, "HISTORY_ARRAY_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    if not max_bytes:
+        return None
+    with _history_cache_lock:
+        if _history_cache is None or _history_cache.max_bytes != max_bytes:
+            _history_cache = HistoryCache(
+                max_bytes,
+                refresh_seconds=getattr(settings, "HISTORY_ARRAY_CACHE_REFRESH_SECONDS", 3600),
+            )
+        return _history_cache
@@ -0,0 +1,109 @@
+"""
+On-disk columnar copy of stock_history, read through ``numpy.memmap``.
+
+Each (symbol, hourly|minute) series is a directory of fixed-dtype column
+files plus a ``meta.json`` holding the committed row count:
+
+    <HISTORY_STORE_PATH>/AAPL/hourly/day_and_time.bin   datetime64[us], naive UTC
+                                     open_price.bin     int32 cents
+                                     ...
+                                     volume.bin         int64
+                                     meta.json
+
+Rows are only ever appended in time order (``sync_history_store``). The row
+count is published after the column data is written, so readers never see
+a partial append, and a crashed append is truncated away by the next one.
+"""
+import json
+import os
+import re
+import shutil
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+from Incrementum.history_cache import COLUMN_DTYPES, TIME_DTYPE, HistorySeries
+
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.^=\-]{1,20}$")
+
+
+class HistoryStore:
+    def __init__(self, root):
+        self.root = os.fspath(root)
+
+    def series_dir(self, symbol: str, is_hourly: bool) -> str:
+        symbol = symbol.upper()
+        if not SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"Invalid symbol for history store: {symbol!r}")
+        return os.path.join(self.root, symbol, "hourly" if is_hourly else "minute")
+
+    def count(self, symbol: str, is_hourly: bool) -> int:
+        try:
+            with open(os.path.join(self.series_dir(symbol, is_hourly), "meta.json")) as f:
+                return int(json.load(f)["count"])
+        except FileNotFoundError:
+            return 0
+
+    def read(self, symbol: str, is_hourly: bool) -> Optional[HistorySeries]:
+        """The stored series as read-only memmaps, or None if nothing is stored."""
+        count = self.count(symbol, is_hourly)
+        if not count:
+            return None
+        directory = self.series_dir(symbol, is_hourly)
+        return HistorySeries(
+            start=None,
+            times=np.memmap(
+                os.path.join(directory, "day_and_time.bin"),
+                dtype=TIME_DTYPE, mode="r", shape=(count,),
+            ),
+            columns={
+                column: np.memmap(
+                    os.path.join(directory, f"{column}.bin"),
+                    dtype=dtype, mode="r", shape=(count,),
+                )
+                for column, dtype in COLUMN_DTYPES.items()
+            },
+            is_hourly=np.broadcast_to(np.bool_(is_hourly), (count,)),
+        )
+
+    def append(self, symbol: str, is_hourly: bool, series: HistorySeries) -> int:
+        """Append bars newer than the stored tail; returns the new row count."""
+        directory = self.series_dir(symbol, is_hourly)
+        os.makedirs(directory, exist_ok=True)
+        count = self.count(symbol, is_hourly)
+        if not len(series.times):
+            return count
+
+        stored = self.read(symbol, is_hourly)
+        if stored is not None and series.times[0] <= stored.tail:
+            raise ValueError(
+                f"Bars for {symbol} must be newer than the stored tail {stored.tail}"
+            )
+
+        columns = {"day_and_time": (series.times, TIME_DTYPE)}
+        columns.update(
+            (column, (series.columns[column], dtype)) for column, dtype in COLUMN_DTYPES.items()
+        )
+        for column, (values, dtype) in columns.items():
+            path = os.path.join(directory, f"{column}.bin")
+            with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                f.seek(count * dtype.itemsize)
+                f.truncate()
+                np.asarray(values, dtype=dtype).tofile(f)
+
+        count += len(series.times)
+        meta_path = os.path.join(directory, "meta.json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({"count": count}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        return count
+
+    def clear(self, symbol: str, is_hourly: bool):
+        shutil.rmtree(self.series_dir(symbol, is_hourly), ignore_errors=True)
+
+
+def get_history_store() -> Optional[HistoryStore]:
+    """The configured store, or None when HISTORY_STORE_PATH is unset."""
+    root = getattr(settings, "HISTORY_STORE_PATH", "")
+    return HistoryStore(root) if root else None
@@ -0,0 +1,86 @@
+"""
+Custom ORM lookups.
+
+``ilike`` compiles to a bare ``column ILIKE pattern`` on PostgreSQL so that
+pg_trgm GIN indexes can serve it. Django's built-in ``icontains`` and
+``iregex`` wrap the column in UPPER() or use ``~*`` with an anchored regex,
+which the trigram indexes on stock cannot always use.
+
+The columnar screener engine matches in memory through ``like_regex`` so
+both screener paths read the same patterns the same way.
+"""
+import re
+
+from django.db.models import CharField, Lookup, TextField
+
+LIKE_ESCAPE = '\\'
+
+
+def like_escape(value: str) -> str:
+    """Escape LIKE metacharacters so ``value`` matches literally."""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace('%', LIKE_ESCAPE + '%')
+        .replace('_', LIKE_ESCAPE + '_')
+    )
+
+
+def contains_pattern(value: str) -> str:
+    return f'%{like_escape(value)}%'
+
+
+def prefix_pattern(value: str) -> str:
+    return f'{like_escape(value)}%'
+
+
+def wildcard_like_pattern(value: str) -> str:
+    """Translate a ``*`` wildcard value into an anchored ILIKE pattern."""
+    return '%'.join(like_escape(part) for part in value.split('*'))
+
+
+def screener_contains_pattern(value: str) -> str:
+    """
+    LIKE pattern for the screener's ``contains`` operator: anchored with
+    ``*`` wildcards when the value has any, otherwise a substring match.
+    """
+    if '*' in value:
+        return wildcard_like_pattern(value)
+    return contains_pattern(value)
+
+
+def like_regex(pattern: str) -> re.Pattern:
+    """
+    Compile a LIKE pattern (``%``, ``_`` and ``LIKE_ESCAPE``) into a
+    case-insensitive regex to ``fullmatch`` against, so in-memory matching
+    agrees with ILIKE.
+    """
+    parts = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == LIKE_ESCAPE:
+            parts.append(re.escape(next(chars, LIKE_ESCAPE)))
+        elif char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.IGNORECASE | re.DOTALL)
+
+
+@CharField.register_lookup
+@TextField.register_lookup
+class ILike(Lookup):
+    """Case-insensitive LIKE with a caller-built pattern (``%``/``_`` wildcards)."""
+    lookup_name = 'ilike'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", lhs_params + rhs_params
+
+    def as_sqlite(self, compiler, connection):
+        # SQLite's LIKE is already case-insensitive for ASCII.
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} LIKE {rhs} ESCAPE '\\'", lhs_params + rhs_params
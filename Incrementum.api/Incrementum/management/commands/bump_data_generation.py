@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from Incrementum.data_generation import bump_data_generation
+from Incrementum.services.saved_screener_service import SavedScreenerEvaluator
+
+
+class Command(BaseCommand):
+    help = (
+        'Invalidate screener result and count caches after stock or '
+        'stock_history data is written outside the ORM, then re-evaluate '
+        'saved custom screeners against the new data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-saved-screeners',
+            action='store_true',
+            help='Only bump the generation; leave saved screener results as they are',
+        )
+
+    def handle(self, *args, **options):
+        generation = bump_data_generation()
+        self.stdout.write(
+            self.style.SUCCESS(f'Data generation is now {generation}')
+        )
+        if options['skip_saved_screeners']:
+            return
+        count = SavedScreenerEvaluator().evaluate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Evaluated {count} saved screeners')
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from Incrementum.models.custom_screener import CustomScreener
+from Incrementum.services.saved_screener_service import SavedScreenerEvaluator
+
+
+class Command(BaseCommand):
+    help = 'Precompute results for saved custom screeners (run after each data refresh)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'screener_ids',
+            nargs='*',
+            type=int,
+            help='Only evaluate these screener ids (default: all)',
+        )
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help='Only evaluate screeners whose filters changed since their last evaluation',
+        )
+
+    def handle(self, *args, **options):
+        screeners = CustomScreener.objects.all()
+        if options['screener_ids']:
+            screeners = screeners.filter(id__in=options['screener_ids'])
+        if options['stale']:
+            screeners = screeners.filter(results_stale=True)
+        count = SavedScreenerEvaluator().evaluate_all(screeners)
+        self.stdout.write(
+            self.style.SUCCESS(f'Evaluated {count} saved screeners')
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.lookups import contains_pattern, prefix_pattern
+from Incrementum.models.stock import StockModel
+from Incrementum.screener import Screener
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN ANALYZE the ticker/industry search predicates and report '
+        'whether they still sequentially scan stock'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', default='AA*', help='Ticker filter value')
+        parser.add_argument('--industry', default='software', help='Industry search text')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_stock_search needs PostgreSQL (pg_trgm)')
+
+        ticker = options['ticker']
+        industry = options['industry']
+        queries = {
+            'ticker contains': Screener().build_queryset(
+                [FilterData('contains', 'ticker', 'string', ticker)]
+            ),
+            'industry contains': Screener().build_queryset(
+                [FilterData('contains', 'industry', 'categoric', industry)]
+            ),
+            'industry autocomplete': StockModel.objects.filter(
+                sic_description__ilike=contains_pattern(industry)
+            ).values('sic_description').distinct(),
+            'industry prefix': StockModel.objects.filter(
+                sic_description__ilike=prefix_pattern(industry)
+            ).values('sic_description'),
+        }
+
+        for name, qs in queries.items():
+            sql, params = qs.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (ANALYZE, FORMAT TEXT) {sql}", params)
+                plan = [row[0] for row in cursor.fetchall()]
+            seq_scan = any('Seq Scan on stock' in line for line in plan)
+            timing = next((line for line in plan if 'Execution Time' in line), '').strip()
+            status = self.style.WARNING('SEQ SCAN') if seq_scan else self.style.SUCCESS('index')
+            self.stdout.write(f'{name}: {status} {timing}')
+            if options['verbosity'] > 1:
+                for line in plan:
+                    self.stdout.write(f'    {line}')
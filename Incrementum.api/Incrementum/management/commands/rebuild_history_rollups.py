@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from Incrementum.services.history_rollup_service import HistoryRollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stock_history_rollup OHLCV buckets from stock_history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'symbols',
+            nargs='*',
+            help='Only rebuild these symbols (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('rebuild_history_rollups needs PostgreSQL')
+
+        symbols = [s.upper() for s in options['symbols']]
+        with transaction.atomic():
+            count = HistoryRollupService.rebuild(symbols or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {count} history rollup buckets')
+        )
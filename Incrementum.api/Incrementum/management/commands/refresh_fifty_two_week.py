@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from Incrementum.services.fifty_two_week_service import FiftyTwoWeekService
+
+
+class Command(BaseCommand):
+    help = 'Recompute 52-week highs/lows whose extreme has aged out of the window'
+
+    def handle(self, *args, **options):
+        count = FiftyTwoWeekService.refresh_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f'Recomputed 52-week extrema for {count} symbols')
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from Incrementum.services.latest_bar_service import LatestBarService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the latest_bar snapshot from stock_history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'symbols',
+            nargs='*',
+            help='Only refresh these symbols (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        symbols = [s.upper() for s in options['symbols']]
+        count = LatestBarService.refresh(symbols or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed latest_bar for {count} symbols')
+        )
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Incrementum.services.stock_history_partition_service import (
+    StockHistoryPartitionService,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Manage monthly stock_history partitions: create upcoming months, '
+        'detach (and optionally drop) old ones for retention, or re-attach one'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'ensure', 'detach', 'attach'])
+        parser.add_argument(
+            '--months-ahead', type=int, default=2,
+            help='ensure: months to create past the current one',
+        )
+        parser.add_argument(
+            '--since',
+            help='ensure: also create every month from YYYY-MM on (before a backfill)',
+        )
+        parser.add_argument(
+            '--before',
+            help='detach: detach partitions for months before YYYY-MM',
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help='detach: drop the detached tables instead of keeping them',
+        )
+        parser.add_argument('--table', help='attach: stock_history_YYYY_MM table to attach')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('stock_history_partitions needs PostgreSQL')
+
+        action = options['action']
+        if action == 'list':
+            for name in StockHistoryPartitionService.partitions():
+                self.stdout.write(name)
+        elif action == 'ensure':
+            since = self._month(options['since'], '--since') if options['since'] else None
+            names = StockHistoryPartitionService.ensure(options['months_ahead'], since=since)
+            self.stdout.write(self.style.SUCCESS(f'Partitions ready: {", ".join(names)}'))
+        elif action == 'detach':
+            if not options['before']:
+                raise CommandError('detach needs --before YYYY-MM')
+            month = self._month(options['before'], '--before')
+            names = StockHistoryPartitionService.detach_before(month, drop=options['drop'])
+            verb = 'Dropped' if options['drop'] else 'Detached'
+            self.stdout.write(self.style.SUCCESS(f'{verb} {len(names)} partitions'))
+        else:
+            if not options['table']:
+                raise CommandError('attach needs --table stock_history_YYYY_MM')
+            try:
+                StockHistoryPartitionService.attach(options['table'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'Attached {options["table"]}'))
+
+    @staticmethod
+    def _month(value, option):
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError(f'{option} must be YYYY-MM')
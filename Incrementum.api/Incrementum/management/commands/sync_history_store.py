@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Incrementum.history_store import get_history_store
+from Incrementum.models.stock import StockModel
+from Incrementum.stock_history_service import StockHistoryService
+
+
+class Command(BaseCommand):
+    help = 'Append new stock_history bars to the memory-mapped history store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'symbols',
+            nargs='*',
+            help='Only sync these symbols (default: all)',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Discard the stored series and copy them again',
+        )
+
+    def handle(self, *args, **options):
+        store = get_history_store()
+        if store is None:
+            raise CommandError('HISTORY_STORE_PATH is not set')
+        if connection.vendor != 'postgresql':
+            raise CommandError('sync_history_store needs PostgreSQL')
+
+        symbols = [s.upper() for s in options['symbols']] or list(
+            StockModel.objects.order_by('symbol').values_list('symbol', flat=True)
+        )
+        service = StockHistoryService()
+        count = 0
+        for symbol in symbols:
+            for is_hourly in (True, False):
+                count += service.sync_store(
+                    store, symbol, is_hourly, rebuild=options['rebuild']
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Synced {count} bars for {len(symbols)} symbols')
+        )
@@ -0,0 +1,150 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRES_SQL = """
+    CREATE TABLE IF NOT EXISTS latest_bar (
+        stock_symbol varchar(20) primary key
+            references stock(symbol) on delete cascade,
+        day_and_time timestamp not null,
+        open_price integer not null,
+        close_price integer not null,
+        high integer not null,
+        low integer not null,
+        volume integer not null
+    );
+
+    CREATE OR REPLACE FUNCTION refresh_latest_bar() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO latest_bar AS lb (
+            stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        )
+        SELECT DISTINCT ON (stock_symbol)
+            stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        FROM new_bars
+        ORDER BY stock_symbol, day_and_time DESC
+        ON CONFLICT (stock_symbol) DO UPDATE SET
+            day_and_time = EXCLUDED.day_and_time,
+            open_price = EXCLUDED.open_price,
+            close_price = EXCLUDED.close_price,
+            high = EXCLUDED.high,
+            low = EXCLUDED.low,
+            volume = EXCLUDED.volume
+        WHERE EXCLUDED.day_and_time >= lb.day_and_time;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_latest_bar ON stock_history;
+    CREATE TRIGGER stock_history_latest_bar
+        AFTER INSERT ON stock_history
+        REFERENCING NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_latest_bar();
+
+    INSERT INTO latest_bar (
+        stock_symbol, day_and_time, open_price, close_price, high, low, volume
+    )
+    SELECT DISTINCT ON (stock_symbol)
+        stock_symbol, day_and_time, open_price, close_price, high, low, volume
+    FROM stock_history
+    ORDER BY stock_symbol, day_and_time DESC
+    ON CONFLICT (stock_symbol) DO NOTHING;
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_latest_bar ON stock_history;
+    DROP FUNCTION IF EXISTS refresh_latest_bar();
+    DROP TABLE IF EXISTS latest_bar;
+"""
+
+SQLITE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS latest_bar (
+        stock_symbol varchar(20) primary key
+            references stock(symbol) on delete cascade,
+        day_and_time timestamp not null,
+        open_price integer not null,
+        close_price integer not null,
+        high integer not null,
+        low integer not null,
+        volume integer not null
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS stock_history_latest_bar
+    AFTER INSERT ON stock_history
+    BEGIN
+        INSERT INTO latest_bar (
+            stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        )
+        VALUES (
+            NEW.stock_symbol, NEW.day_and_time, NEW.open_price, NEW.close_price,
+            NEW.high, NEW.low, NEW.volume
+        )
+        ON CONFLICT (stock_symbol) DO UPDATE SET
+            day_and_time = excluded.day_and_time,
+            open_price = excluded.open_price,
+            close_price = excluded.close_price,
+            high = excluded.high,
+            low = excluded.low,
+            volume = excluded.volume
+        WHERE excluded.day_and_time >= latest_bar.day_and_time;
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_latest_bar",
+    "DROP TABLE IF EXISTS latest_bar",
+]
+
+
+def create_latest_bar(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_latest_bar(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0020_customscreener_is_private'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestBar',
+            fields=[
+                ('stock_symbol', models.OneToOneField(
+                    db_column='stock_symbol',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='latest_bar',
+                    serialize=False,
+                    to='Incrementum.stockmodel',
+                    to_field='symbol'
+                )),
+                ('day_and_time', models.DateTimeField()),
+                ('open_price', models.IntegerField()),
+                ('close_price', models.IntegerField()),
+                ('high', models.IntegerField()),
+                ('low', models.IntegerField()),
+                ('volume', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'latest_bar',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_latest_bar, drop_latest_bar),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0021_latest_bar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customscreener',
+            name='results_as_of',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='CustomScreenerResult',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('position', models.IntegerField()),
+                ('custom_screener', models.ForeignKey(
+                    db_column='custom_screener_id',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='results',
+                    to='Incrementum.customscreener'
+                )),
+                ('stock_symbol', models.ForeignKey(
+                    db_column='stock_symbol',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='custom_screener_results',
+                    to='Incrementum.stockmodel',
+                    to_field='symbol'
+                )),
+            ],
+            options={
+                'db_table': 'custom_screener_result',
+                'unique_together': {('custom_screener', 'stock_symbol')},
+                'indexes': [models.Index(
+                    fields=['custom_screener', 'position'],
+                    name='custom_screener_result_pos'
+                )],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+TRIGRAM_COLUMNS = ('symbol', 'company_name', 'sic_description')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm is PostgreSQL-only; other backends keep sequential LIKE scans.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS stock_{column}_trgm "
+            f"ON stock USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS stock_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0022_custom_screener_result'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,170 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRES_SQL = """
+    CREATE TABLE IF NOT EXISTS fifty_two_week_extrema (
+        stock_symbol varchar(20) primary key
+            references stock(symbol) on delete cascade,
+        high integer not null,
+        high_at timestamp not null,
+        low integer not null,
+        low_at timestamp not null
+    );
+
+    CREATE OR REPLACE FUNCTION refresh_fifty_two_week_extrema() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO fifty_two_week_extrema AS e (stock_symbol, high, high_at, low, low_at)
+        SELECT h.stock_symbol, h.high, h.day_and_time, l.low, l.day_and_time
+        FROM (
+            SELECT DISTINCT ON (stock_symbol) stock_symbol, high, day_and_time
+            FROM new_bars
+            WHERE day_and_time >= (now() AT TIME ZONE 'UTC') - interval '52 weeks'
+            ORDER BY stock_symbol, high DESC, day_and_time DESC
+        ) h
+        JOIN (
+            SELECT DISTINCT ON (stock_symbol) stock_symbol, low, day_and_time
+            FROM new_bars
+            WHERE day_and_time >= (now() AT TIME ZONE 'UTC') - interval '52 weeks'
+            ORDER BY stock_symbol, low ASC, day_and_time DESC
+        ) l ON l.stock_symbol = h.stock_symbol
+        ON CONFLICT (stock_symbol) DO UPDATE SET
+            high = CASE WHEN EXCLUDED.high > e.high
+                OR (EXCLUDED.high = e.high AND EXCLUDED.high_at >= e.high_at)
+                THEN EXCLUDED.high ELSE e.high END,
+            high_at = CASE WHEN EXCLUDED.high > e.high
+                OR (EXCLUDED.high = e.high AND EXCLUDED.high_at >= e.high_at)
+                THEN EXCLUDED.high_at ELSE e.high_at END,
+            low = CASE WHEN EXCLUDED.low < e.low
+                OR (EXCLUDED.low = e.low AND EXCLUDED.low_at >= e.low_at)
+                THEN EXCLUDED.low ELSE e.low END,
+            low_at = CASE WHEN EXCLUDED.low < e.low
+                OR (EXCLUDED.low = e.low AND EXCLUDED.low_at >= e.low_at)
+                THEN EXCLUDED.low_at ELSE e.low_at END;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_fifty_two_week ON stock_history;
+    CREATE TRIGGER stock_history_fifty_two_week
+        AFTER INSERT ON stock_history
+        REFERENCING NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_fifty_two_week_extrema();
+
+    INSERT INTO fifty_two_week_extrema (stock_symbol, high, high_at, low, low_at)
+    SELECT h.stock_symbol, h.high, h.day_and_time, l.low, l.day_and_time
+    FROM (
+        SELECT DISTINCT ON (stock_symbol) stock_symbol, high, day_and_time
+        FROM stock_history
+        WHERE day_and_time >= (now() AT TIME ZONE 'UTC') - interval '52 weeks'
+        ORDER BY stock_symbol, high DESC, day_and_time DESC
+    ) h
+    JOIN (
+        SELECT DISTINCT ON (stock_symbol) stock_symbol, low, day_and_time
+        FROM stock_history
+        WHERE day_and_time >= (now() AT TIME ZONE 'UTC') - interval '52 weeks'
+        ORDER BY stock_symbol, low ASC, day_and_time DESC
+    ) l ON l.stock_symbol = h.stock_symbol
+    ON CONFLICT (stock_symbol) DO NOTHING;
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_fifty_two_week ON stock_history;
+    DROP FUNCTION IF EXISTS refresh_fifty_two_week_extrema();
+    DROP TABLE IF EXISTS fifty_two_week_extrema;
+"""
+
+SQLITE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS fifty_two_week_extrema (
+        stock_symbol varchar(20) primary key
+            references stock(symbol) on delete cascade,
+        high integer not null,
+        high_at timestamp not null,
+        low integer not null,
+        low_at timestamp not null
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS stock_history_fifty_two_week
+    AFTER INSERT ON stock_history
+    WHEN NEW.day_and_time >= datetime('now', '-364 days')
+    BEGIN
+        INSERT INTO fifty_two_week_extrema (stock_symbol, high, high_at, low, low_at)
+        VALUES (
+            NEW.stock_symbol, NEW.high, NEW.day_and_time, NEW.low, NEW.day_and_time
+        )
+        ON CONFLICT (stock_symbol) DO UPDATE SET
+            high = CASE WHEN excluded.high > fifty_two_week_extrema.high
+                OR (excluded.high = fifty_two_week_extrema.high
+                    AND excluded.high_at >= fifty_two_week_extrema.high_at)
+                THEN excluded.high ELSE fifty_two_week_extrema.high END,
+            high_at = CASE WHEN excluded.high > fifty_two_week_extrema.high
+                OR (excluded.high = fifty_two_week_extrema.high
+                    AND excluded.high_at >= fifty_two_week_extrema.high_at)
+                THEN excluded.high_at ELSE fifty_two_week_extrema.high_at END,
+            low = CASE WHEN excluded.low < fifty_two_week_extrema.low
+                OR (excluded.low = fifty_two_week_extrema.low
+                    AND excluded.low_at >= fifty_two_week_extrema.low_at)
+                THEN excluded.low ELSE fifty_two_week_extrema.low END,
+            low_at = CASE WHEN excluded.low < fifty_two_week_extrema.low
+                OR (excluded.low = fifty_two_week_extrema.low
+                    AND excluded.low_at >= fifty_two_week_extrema.low_at)
+                THEN excluded.low_at ELSE fifty_two_week_extrema.low_at END;
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_fifty_two_week",
+    "DROP TABLE IF EXISTS fifty_two_week_extrema",
+]
+
+
+def create_fifty_two_week_extrema(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_fifty_two_week_extrema(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0023_stock_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiftyTwoWeekExtrema',
+            fields=[
+                ('stock_symbol', models.OneToOneField(
+                    db_column='stock_symbol',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='fifty_two_week',
+                    serialize=False,
+                    to='Incrementum.stockmodel',
+                    to_field='symbol'
+                )),
+                ('high', models.IntegerField()),
+                ('high_at', models.DateTimeField()),
+                ('low', models.IntegerField()),
+                ('low_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'fifty_two_week_extrema',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_fifty_two_week_extrema, drop_fifty_two_week_extrema),
+    ]
@@ -0,0 +1,157 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRES_SQL = """
+    CREATE TABLE IF NOT EXISTS daily_close (
+        stock_symbol varchar(20) not null
+            references stock(symbol) on delete cascade,
+        trading_date date not null,
+        close_price integer not null,
+        prev_close integer,
+        primary key (stock_symbol, trading_date)
+    );
+
+    CREATE OR REPLACE FUNCTION refresh_daily_close() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO daily_close (stock_symbol, trading_date, close_price)
+        SELECT DISTINCT ON (stock_symbol, day_and_time::date)
+            stock_symbol, day_and_time::date, close_price
+        FROM new_bars
+        WHERE EXTRACT(HOUR FROM day_and_time) = 17
+        ORDER BY stock_symbol, day_and_time::date, day_and_time DESC
+        ON CONFLICT (stock_symbol, trading_date) DO UPDATE SET
+            close_price = EXCLUDED.close_price;
+
+        UPDATE daily_close dc SET prev_close = (
+            SELECT p.close_price FROM daily_close p
+            WHERE p.stock_symbol = dc.stock_symbol
+            AND p.trading_date < dc.trading_date
+            ORDER BY p.trading_date DESC
+            LIMIT 1
+        )
+        FROM (
+            SELECT stock_symbol, min(day_and_time::date) AS since
+            FROM new_bars
+            WHERE EXTRACT(HOUR FROM day_and_time) = 17
+            GROUP BY stock_symbol
+        ) changed
+        WHERE dc.stock_symbol = changed.stock_symbol
+        AND dc.trading_date >= changed.since;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_daily_close ON stock_history;
+    CREATE TRIGGER stock_history_daily_close
+        AFTER INSERT ON stock_history
+        REFERENCING NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_daily_close();
+
+    INSERT INTO daily_close (stock_symbol, trading_date, close_price, prev_close)
+    SELECT stock_symbol, trading_date, close_price,
+        lag(close_price) OVER (PARTITION BY stock_symbol ORDER BY trading_date)
+    FROM (
+        SELECT DISTINCT ON (stock_symbol, day_and_time::date)
+            stock_symbol, day_and_time::date AS trading_date, close_price
+        FROM stock_history
+        WHERE EXTRACT(HOUR FROM day_and_time) = 17
+        ORDER BY stock_symbol, day_and_time::date, day_and_time DESC
+    ) closes
+    ON CONFLICT (stock_symbol, trading_date) DO NOTHING;
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_daily_close ON stock_history;
+    DROP FUNCTION IF EXISTS refresh_daily_close();
+    DROP TABLE IF EXISTS daily_close;
+"""
+
+SQLITE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_close (
+        stock_symbol varchar(20) not null
+            references stock(symbol) on delete cascade,
+        trading_date date not null,
+        close_price integer not null,
+        prev_close integer,
+        primary key (stock_symbol, trading_date)
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS stock_history_daily_close
+    AFTER INSERT ON stock_history
+    WHEN strftime('%H', NEW.day_and_time) = '17'
+    BEGIN
+        INSERT INTO daily_close (stock_symbol, trading_date, close_price)
+        VALUES (NEW.stock_symbol, date(NEW.day_and_time), NEW.close_price)
+        ON CONFLICT (stock_symbol, trading_date) DO UPDATE SET
+            close_price = excluded.close_price;
+
+        UPDATE daily_close SET prev_close = (
+            SELECT p.close_price FROM daily_close p
+            WHERE p.stock_symbol = daily_close.stock_symbol
+            AND p.trading_date < daily_close.trading_date
+            ORDER BY p.trading_date DESC
+            LIMIT 1
+        )
+        WHERE stock_symbol = NEW.stock_symbol
+        AND trading_date >= date(NEW.day_and_time);
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_daily_close",
+    "DROP TABLE IF EXISTS daily_close",
+]
+
+
+def create_daily_close(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_daily_close(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0024_fifty_two_week_extrema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyClose',
+            fields=[
+                ('pk', models.CompositePrimaryKey(
+                    'stock_symbol', 'trading_date',
+                    blank=True, editable=False, primary_key=True, serialize=False
+                )),
+                ('stock_symbol', models.ForeignKey(
+                    db_column='stock_symbol',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='daily_closes',
+                    to='Incrementum.stockmodel',
+                    to_field='symbol'
+                )),
+                ('trading_date', models.DateField()),
+                ('close_price', models.IntegerField()),
+                ('prev_close', models.IntegerField(null=True)),
+            ],
+            options={
+                'db_table': 'daily_close',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_daily_close, drop_daily_close),
+    ]
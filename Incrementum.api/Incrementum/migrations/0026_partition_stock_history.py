@@ -0,0 +1,167 @@
+from django.db import migrations
+
+
+HISTORY_COLUMNS = (
+    "stock_symbol, day_and_time, open_price, close_price, high, low, volume, is_hourly"
+)
+
+HISTORY_TRIGGERS = (
+    ('stock_history_latest_bar', 'refresh_latest_bar'),
+    ('stock_history_fifty_two_week', 'refresh_fifty_two_week_extrema'),
+    ('stock_history_daily_close', 'refresh_daily_close'),
+)
+
+CREATE_TRIGGERS_SQL = "".join(
+    f"""
+    CREATE TRIGGER {name}
+        AFTER INSERT ON stock_history
+        REFERENCING NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+    """
+    for name, function in HISTORY_TRIGGERS
+)
+
+# The partitioned table's primary key is (stock_symbol, day_and_time), which
+# the old table never enforced. Refuse to partition rather than pick one of
+# several bars for the same key and lose the rest with the old table.
+CHECK_DUPLICATES_SQL = """
+    DO $$
+    DECLARE
+        duplicates bigint;
+    BEGIN
+        SELECT count(*) INTO duplicates FROM (
+            SELECT 1 FROM stock_history
+            GROUP BY stock_symbol, day_and_time
+            HAVING count(*) > 1
+        ) duplicated;
+        IF duplicates > 0 THEN
+            RAISE EXCEPTION
+                'stock_history has % duplicated (stock_symbol, day_and_time) keys; '
+                'remove them before partitioning', duplicates;
+        END IF;
+    END;
+    $$;
+"""
+
+POSTGRES_SQL = f"""
+    {CHECK_DUPLICATES_SQL}
+
+    ALTER TABLE stock_history RENAME TO stock_history_unpartitioned;
+
+    CREATE TABLE stock_history (
+        id bigint generated by default as identity,
+        stock_symbol varchar(20) not null references stock(symbol),
+        day_and_time timestamp not null,
+        open_price integer not null,
+        close_price integer not null,
+        high integer not null,
+        low integer not null,
+        volume integer not null,
+        is_hourly boolean not null default true,
+        primary key (stock_symbol, day_and_time)
+    ) PARTITION BY RANGE (day_and_time);
+
+    CREATE TABLE stock_history_default PARTITION OF stock_history DEFAULT;
+
+    CREATE OR REPLACE FUNCTION create_stock_history_partition(month date) RETURNS text AS $$
+    DECLARE
+        start_at date := date_trunc('month', month)::date;
+        partition_name text := 'stock_history_' || to_char(start_at, 'YYYY_MM');
+    BEGIN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF stock_history '
+            'FOR VALUES FROM (%L) TO (%L)',
+            partition_name, start_at, (start_at + interval '1 month')::date
+        );
+        RETURN partition_name;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    SELECT create_stock_history_partition(month::date)
+    FROM generate_series(
+        date_trunc('month', coalesce(
+            (SELECT min(day_and_time) FROM stock_history_unpartitioned),
+            now() AT TIME ZONE 'UTC'
+        )),
+        date_trunc('month', now() AT TIME ZONE 'UTC') + interval '2 months',
+        interval '1 month'
+    ) AS month;
+
+    INSERT INTO stock_history ({HISTORY_COLUMNS})
+    SELECT {HISTORY_COLUMNS} FROM stock_history_unpartitioned;
+
+    DROP TABLE stock_history_unpartitioned;
+
+    CREATE INDEX stock_history_symbol_hourly_time
+        ON stock_history (stock_symbol, is_hourly, day_and_time);
+    CREATE INDEX stock_history_time_brin
+        ON stock_history USING brin (day_and_time);
+    {CREATE_TRIGGERS_SQL}
+"""
+
+POSTGRES_REVERSE_SQL = f"""
+    CREATE TABLE stock_history_unpartitioned (
+        id serial primary key,
+        stock_symbol varchar(20) not null references stock(symbol),
+        day_and_time timestamp not null,
+        open_price integer not null,
+        close_price integer not null,
+        high integer not null,
+        low integer not null,
+        volume integer not null,
+        is_hourly boolean default true,
+        unique (stock_symbol, day_and_time)
+    );
+
+    INSERT INTO stock_history_unpartitioned ({HISTORY_COLUMNS})
+    SELECT {HISTORY_COLUMNS} FROM stock_history;
+
+    DROP TABLE stock_history;
+    DROP FUNCTION IF EXISTS create_stock_history_partition(date);
+    ALTER TABLE stock_history_unpartitioned RENAME TO stock_history;
+
+    CREATE INDEX IF NOT EXISTS idx_stock_history_symbol_time
+        ON stock_history (stock_symbol, day_and_time);
+    {CREATE_TRIGGERS_SQL}
+"""
+
+# SQLite has no declarative partitioning; it gets the same access-path index.
+SQLITE_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS stock_history_symbol_hourly_time
+        ON stock_history (stock_symbol, is_hourly, day_and_time)
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS stock_history_symbol_hourly_time",
+]
+
+
+def partition_stock_history(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # params=None keeps the driver from treating format()'s %I/%L as
+        # placeholders.
+        schema_editor.execute(POSTGRES_SQL, params=None)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement)
+
+
+def unpartition_stock_history(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL, params=None)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0025_daily_close'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_stock_history, unpartition_stock_history),
+    ]
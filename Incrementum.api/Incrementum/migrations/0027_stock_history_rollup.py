@@ -0,0 +1,227 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# (interval, built from hourly bars?) - minute bars feed every interval,
+# hourly bars only the daily and weekly ones.
+ROLLUP_SOURCES = (
+    ('5m', False),
+    ('15m', False),
+    ('30m', False),
+    ('1h', False),
+    ('1d', False),
+    ('1wk', False),
+    ('1d', True),
+    ('1wk', True),
+)
+
+POSTGRES_SOURCES = ", ".join(
+    f"('{interval}', {str(is_hourly).lower()})" for interval, is_hourly in ROLLUP_SOURCES
+)
+
+SQLITE_SOURCES = " UNION ALL ".join(
+    f"SELECT '{interval}' AS bucket_interval, {int(is_hourly)} AS is_hourly"
+    for interval, is_hourly in ROLLUP_SOURCES
+)
+
+POSTGRES_UPSERT = """
+    INSERT INTO stock_history_rollup AS r (
+        stock_symbol, bucket_interval, is_hourly, bucket,
+        open_price, open_at, close_price, close_at, high, low, volume
+    )
+    SELECT
+        b.stock_symbol, i.bucket_interval, b.is_hourly,
+        stock_history_bucket(i.bucket_interval, b.day_and_time),
+        (array_agg(b.open_price ORDER BY b.day_and_time))[1], min(b.day_and_time),
+        (array_agg(b.close_price ORDER BY b.day_and_time DESC))[1], max(b.day_and_time),
+        max(b.high), min(b.low), sum(b.volume)
+    FROM {source} b
+    JOIN (VALUES {sources}) AS i(bucket_interval, is_hourly)
+        ON i.is_hourly = b.is_hourly
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (stock_symbol, bucket_interval, is_hourly, bucket) DO UPDATE SET
+        open_price = CASE WHEN EXCLUDED.open_at < r.open_at
+            THEN EXCLUDED.open_price ELSE r.open_price END,
+        open_at = least(r.open_at, EXCLUDED.open_at),
+        close_price = CASE WHEN EXCLUDED.close_at >= r.close_at
+            THEN EXCLUDED.close_price ELSE r.close_price END,
+        close_at = greatest(r.close_at, EXCLUDED.close_at),
+        high = greatest(r.high, EXCLUDED.high),
+        low = least(r.low, EXCLUDED.low),
+        volume = r.volume + EXCLUDED.volume;
+"""
+
+POSTGRES_SQL = f"""
+    CREATE TABLE IF NOT EXISTS stock_history_rollup (
+        stock_symbol varchar(20) not null
+            references stock(symbol) on delete cascade,
+        bucket_interval varchar(4) not null,
+        is_hourly boolean not null,
+        bucket timestamp not null,
+        open_price integer not null,
+        open_at timestamp not null,
+        close_price integer not null,
+        close_at timestamp not null,
+        high integer not null,
+        low integer not null,
+        volume bigint not null,
+        primary key (stock_symbol, bucket_interval, is_hourly, bucket)
+    );
+
+    CREATE OR REPLACE FUNCTION stock_history_bucket(bucket_interval text, ts timestamp)
+    RETURNS timestamp AS $$
+        SELECT CASE bucket_interval
+            WHEN '5m' THEN date_trunc('hour', ts)
+                + floor(extract(minute FROM ts) / 5) * interval '5 minutes'
+            WHEN '15m' THEN date_trunc('hour', ts)
+                + floor(extract(minute FROM ts) / 15) * interval '15 minutes'
+            WHEN '30m' THEN date_trunc('hour', ts)
+                + floor(extract(minute FROM ts) / 30) * interval '30 minutes'
+            WHEN '1h' THEN date_trunc('hour', ts)
+            WHEN '1d' THEN date_trunc('day', ts)
+            WHEN '1wk' THEN date_trunc('week', ts) + interval '6 days'
+        END
+    $$ LANGUAGE sql IMMUTABLE;
+
+    CREATE OR REPLACE FUNCTION refresh_stock_history_rollup() RETURNS trigger AS $$
+    BEGIN
+        {POSTGRES_UPSERT.format(source='new_bars', sources=POSTGRES_SOURCES)}
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_rollup ON stock_history;
+    CREATE TRIGGER stock_history_rollup
+        AFTER INSERT ON stock_history
+        REFERENCING NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_stock_history_rollup();
+
+    {POSTGRES_UPSERT.format(source='stock_history', sources=POSTGRES_SOURCES)}
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_rollup ON stock_history;
+    DROP FUNCTION IF EXISTS refresh_stock_history_rollup();
+    DROP FUNCTION IF EXISTS stock_history_bucket(text, timestamp);
+    DROP TABLE IF EXISTS stock_history_rollup;
+"""
+
+SQLITE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS stock_history_rollup (
+        stock_symbol varchar(20) not null
+            references stock(symbol) on delete cascade,
+        bucket_interval varchar(4) not null,
+        is_hourly boolean not null,
+        bucket timestamp not null,
+        open_price integer not null,
+        open_at timestamp not null,
+        close_price integer not null,
+        close_at timestamp not null,
+        high integer not null,
+        low integer not null,
+        volume bigint not null,
+        primary key (stock_symbol, bucket_interval, is_hourly, bucket)
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stock_history_rollup
+    AFTER INSERT ON stock_history
+    BEGIN
+        INSERT INTO stock_history_rollup (
+            stock_symbol, bucket_interval, is_hourly, bucket,
+            open_price, open_at, close_price, close_at, high, low, volume
+        )
+        SELECT
+            NEW.stock_symbol, i.bucket_interval, NEW.is_hourly,
+            CASE i.bucket_interval
+                WHEN '5m' THEN strftime('%Y-%m-%d %H:', NEW.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', NEW.day_and_time) AS integer) / 5 * 5)
+                WHEN '15m' THEN strftime('%Y-%m-%d %H:', NEW.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', NEW.day_and_time) AS integer) / 15 * 15)
+                WHEN '30m' THEN strftime('%Y-%m-%d %H:', NEW.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', NEW.day_and_time) AS integer) / 30 * 30)
+                WHEN '1h' THEN strftime('%Y-%m-%d %H:00:00', NEW.day_and_time)
+                WHEN '1d' THEN date(NEW.day_and_time) || ' 00:00:00'
+                WHEN '1wk' THEN date(NEW.day_and_time, 'weekday 0') || ' 00:00:00'
+            END,
+            NEW.open_price, NEW.day_and_time, NEW.close_price, NEW.day_and_time,
+            NEW.high, NEW.low, NEW.volume
+        FROM ({SQLITE_SOURCES}) AS i
+        WHERE i.is_hourly = NEW.is_hourly
+        ON CONFLICT (stock_symbol, bucket_interval, is_hourly, bucket) DO UPDATE SET
+            open_price = CASE WHEN excluded.open_at < stock_history_rollup.open_at
+                THEN excluded.open_price ELSE stock_history_rollup.open_price END,
+            open_at = min(stock_history_rollup.open_at, excluded.open_at),
+            close_price = CASE WHEN excluded.close_at >= stock_history_rollup.close_at
+                THEN excluded.close_price ELSE stock_history_rollup.close_price END,
+            close_at = max(stock_history_rollup.close_at, excluded.close_at),
+            high = max(stock_history_rollup.high, excluded.high),
+            low = min(stock_history_rollup.low, excluded.low),
+            volume = stock_history_rollup.volume + excluded.volume;
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_rollup",
+    "DROP TABLE IF EXISTS stock_history_rollup",
+]
+
+
+def create_stock_history_rollup(apps, schema_editor):
+    # params=None: the SQL contains literal % (strftime/printf formats).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL, params=None)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement, params=None)
+
+
+def drop_stock_history_rollup(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0026_partition_stock_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHistoryRollup',
+            fields=[
+                ('pk', models.CompositePrimaryKey(
+                    'stock_symbol', 'bucket_interval', 'is_hourly', 'bucket',
+                    blank=True, editable=False, primary_key=True, serialize=False
+                )),
+                ('stock_symbol', models.ForeignKey(
+                    db_column='stock_symbol',
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='history_rollups',
+                    to='Incrementum.stockmodel',
+                    to_field='symbol'
+                )),
+                ('bucket_interval', models.CharField(max_length=4)),
+                ('is_hourly', models.BooleanField()),
+                ('bucket', models.DateTimeField()),
+                ('open_price', models.IntegerField()),
+                ('open_at', models.DateTimeField()),
+                ('close_price', models.IntegerField()),
+                ('close_at', models.DateTimeField()),
+                ('high', models.IntegerField()),
+                ('low', models.IntegerField()),
+                ('volume', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'stock_history_rollup',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_stock_history_rollup, drop_stock_history_rollup),
+    ]
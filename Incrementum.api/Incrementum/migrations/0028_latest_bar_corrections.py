@@ -0,0 +1,147 @@
+from django.db import migrations
+
+
+# latest_bar was only maintained on insert, so deleting or correcting the
+# newest bar left it stale. These triggers rebuild the row of any symbol
+# whose newest bar was deleted or updated (or that an update moved a bar
+# to), with one index probe per symbol.
+POSTGRES_SQL = """
+    CREATE OR REPLACE FUNCTION resync_latest_bar(symbols varchar[]) RETURNS void AS $$
+        DELETE FROM latest_bar WHERE stock_symbol = ANY(symbols);
+
+        INSERT INTO latest_bar (
+            stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        )
+        SELECT s.symbol, b.day_and_time, b.open_price, b.close_price, b.high, b.low, b.volume
+        FROM unnest(symbols) AS s(symbol)
+        CROSS JOIN LATERAL (
+            SELECT day_and_time, open_price, close_price, high, low, volume
+            FROM stock_history
+            WHERE stock_symbol = s.symbol
+            ORDER BY day_and_time DESC
+            LIMIT 1
+        ) b;
+    $$ LANGUAGE sql;
+
+    CREATE OR REPLACE FUNCTION latest_bar_after_delete() RETURNS trigger AS $$
+    BEGIN
+        PERFORM resync_latest_bar(ARRAY(
+            SELECT DISTINCT o.stock_symbol
+            FROM old_bars o
+            JOIN latest_bar lb ON lb.stock_symbol = o.stock_symbol
+            WHERE o.day_and_time >= lb.day_and_time
+        ));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION latest_bar_after_update() RETURNS trigger AS $$
+    BEGIN
+        PERFORM resync_latest_bar(ARRAY(
+            SELECT o.stock_symbol
+            FROM old_bars o
+            JOIN latest_bar lb ON lb.stock_symbol = o.stock_symbol
+            WHERE o.day_and_time >= lb.day_and_time
+            UNION
+            SELECT n.stock_symbol
+            FROM new_bars n
+            LEFT JOIN latest_bar lb ON lb.stock_symbol = n.stock_symbol
+            WHERE lb.day_and_time IS NULL OR n.day_and_time >= lb.day_and_time
+        ));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_latest_bar_delete ON stock_history;
+    CREATE TRIGGER stock_history_latest_bar_delete
+        AFTER DELETE ON stock_history
+        REFERENCING OLD TABLE AS old_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION latest_bar_after_delete();
+
+    DROP TRIGGER IF EXISTS stock_history_latest_bar_update ON stock_history;
+    CREATE TRIGGER stock_history_latest_bar_update
+        AFTER UPDATE ON stock_history
+        REFERENCING OLD TABLE AS old_bars NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION latest_bar_after_update();
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_latest_bar_update ON stock_history;
+    DROP TRIGGER IF EXISTS stock_history_latest_bar_delete ON stock_history;
+    DROP FUNCTION IF EXISTS latest_bar_after_update();
+    DROP FUNCTION IF EXISTS latest_bar_after_delete();
+    DROP FUNCTION IF EXISTS resync_latest_bar(varchar[]);
+"""
+
+SQLITE_RESYNC = """
+        INSERT OR IGNORE INTO latest_bar (
+            stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        )
+        SELECT stock_symbol, day_and_time, open_price, close_price, high, low, volume
+        FROM stock_history
+        WHERE stock_symbol = {row}.stock_symbol
+        ORDER BY day_and_time DESC
+        LIMIT 1;
+"""
+
+SQLITE_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stock_history_latest_bar_delete
+    AFTER DELETE ON stock_history
+    WHEN OLD.day_and_time >= (
+        SELECT day_and_time FROM latest_bar WHERE stock_symbol = OLD.stock_symbol
+    )
+    BEGIN
+        DELETE FROM latest_bar WHERE stock_symbol = OLD.stock_symbol;
+        {SQLITE_RESYNC.format(row='OLD')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stock_history_latest_bar_update
+    AFTER UPDATE ON stock_history
+    WHEN OLD.day_and_time >= (
+        SELECT day_and_time FROM latest_bar WHERE stock_symbol = OLD.stock_symbol
+    )
+    OR NEW.day_and_time >= COALESCE(
+        (SELECT day_and_time FROM latest_bar WHERE stock_symbol = NEW.stock_symbol),
+        NEW.day_and_time
+    )
+    BEGIN
+        DELETE FROM latest_bar WHERE stock_symbol IN (OLD.stock_symbol, NEW.stock_symbol);
+        {SQLITE_RESYNC.format(row='OLD')}
+        {SQLITE_RESYNC.format(row='NEW')}
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_latest_bar_update",
+    "DROP TRIGGER IF EXISTS stock_history_latest_bar_delete",
+]
+
+
+def create_latest_bar_corrections(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_latest_bar_corrections(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0027_stock_history_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_latest_bar_corrections, drop_latest_bar_corrections),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0028_latest_bar_corrections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customscreenerresult',
+            name='market_cap',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customscreenerresult',
+            name='price',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customscreenerresult',
+            name='day_percent_change',
+            field=models.DecimalField(
+                blank=True, decimal_places=6, max_digits=12, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name='customscreenerresult',
+            name='volume',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customscreenerresult',
+            index=models.Index(
+                fields=['custom_screener', 'market_cap'],
+                name='custom_screener_result_cap'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='customscreenerresult',
+            index=models.Index(
+                fields=['custom_screener', 'price'],
+                name='custom_screener_result_price'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='customscreenerresult',
+            index=models.Index(
+                fields=['custom_screener', 'day_percent_change'],
+                name='custom_screener_result_pct'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='customscreenerresult',
+            index=models.Index(
+                fields=['custom_screener', 'volume'],
+                name='custom_screener_result_vol'
+            ),
+        ),
+    ]
@@ -0,0 +1,81 @@
+from django.db import migrations
+
+
+# A month's partition cannot be created while stock_history_default holds
+# rows for that month, so the 0026 version of this function failed for any
+# month that had already received data. This version detaches the default
+# partition, creates the month with PARTITION OF (so it shares the parent's
+# columns and identity), moves the month's rows out of the detached default
+# straight into it and re-attaches the default. Detaching locks
+# stock_history for the rest of the transaction, so no row can land in
+# between. Writing to partitions directly does not fire the statement
+# triggers on stock_history, which is right for rows that only move.
+POSTGRES_SQL = """
+    CREATE OR REPLACE FUNCTION create_stock_history_partition(month date) RETURNS text AS $$
+    DECLARE
+        start_at date := date_trunc('month', month)::date;
+        end_at date := (date_trunc('month', month) + interval '1 month')::date;
+        partition_name text := 'stock_history_' || to_char(start_at, 'YYYY_MM');
+    BEGIN
+        IF to_regclass(partition_name) IS NOT NULL THEN
+            RETURN partition_name;
+        END IF;
+
+        ALTER TABLE stock_history DETACH PARTITION stock_history_default;
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF stock_history FOR VALUES FROM (%L) TO (%L)',
+            partition_name, start_at, end_at
+        );
+        EXECUTE format(
+            'WITH moved AS ('
+            '    DELETE FROM stock_history_default'
+            '    WHERE day_and_time >= %L AND day_and_time < %L'
+            '    RETURNING *'
+            ') INSERT INTO %I SELECT * FROM moved',
+            start_at, end_at, partition_name
+        );
+        ALTER TABLE stock_history ATTACH PARTITION stock_history_default DEFAULT;
+        RETURN partition_name;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+POSTGRES_REVERSE_SQL = """
+    CREATE OR REPLACE FUNCTION create_stock_history_partition(month date) RETURNS text AS $$
+    DECLARE
+        start_at date := date_trunc('month', month)::date;
+        partition_name text := 'stock_history_' || to_char(start_at, 'YYYY_MM');
+    BEGIN
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF stock_history '
+            'FOR VALUES FROM (%L) TO (%L)',
+            partition_name, start_at, (start_at + interval '1 month')::date
+        );
+        RETURN partition_name;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+
+def replace_partition_function(apps, schema_editor):
+    # SQLite has no partitions, so there is nothing to replace.
+    if schema_editor.connection.vendor == 'postgresql':
+        # params=None keeps the driver from treating format()'s %I/%L as
+        # placeholders.
+        schema_editor.execute(POSTGRES_SQL, params=None)
+
+
+def restore_partition_function(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0029_custom_screener_result_sort_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_partition_function, restore_partition_function),
+    ]
@@ -0,0 +1,214 @@
+from django.db import migrations
+
+
+# (interval, built from hourly bars?), as in 0027.
+ROLLUP_SOURCES = (
+    ('5m', False),
+    ('15m', False),
+    ('30m', False),
+    ('1h', False),
+    ('1d', False),
+    ('1wk', False),
+    ('1d', True),
+    ('1wk', True),
+)
+
+POSTGRES_SOURCES = ", ".join(
+    f"('{interval}', {str(is_hourly).lower()})" for interval, is_hourly in ROLLUP_SOURCES
+)
+
+SQLITE_SOURCES = " UNION ALL ".join(
+    f"SELECT '{interval}' AS bucket_interval, {int(is_hourly)} AS is_hourly"
+    for interval, is_hourly in ROLLUP_SOURCES
+)
+
+# stock_history_rollup was only maintained on insert, so corrected or
+# deleted bars left stale buckets behind. Every bucket nests inside one
+# Monday-to-Sunday week (the 1wk bucket is labelled with its Sunday), so
+# these triggers rebuild every bucket of each (symbol, source, week) that a
+# deleted or updated bar was in, or that an update moved a bar to.
+POSTGRES_SQL = f"""
+    CREATE OR REPLACE FUNCTION resync_stock_history_rollup(
+        symbols varchar[], hourly boolean[], weeks timestamp[]
+    ) RETURNS void AS $$
+        DELETE FROM stock_history_rollup r
+        USING unnest(symbols, hourly, weeks) AS w(stock_symbol, is_hourly, week)
+        WHERE r.stock_symbol = w.stock_symbol
+            AND r.is_hourly = w.is_hourly
+            AND r.bucket >= w.week
+            AND r.bucket < w.week + interval '7 days';
+
+        INSERT INTO stock_history_rollup (
+            stock_symbol, bucket_interval, is_hourly, bucket,
+            open_price, open_at, close_price, close_at, high, low, volume
+        )
+        SELECT
+            b.stock_symbol, i.bucket_interval, b.is_hourly,
+            stock_history_bucket(i.bucket_interval, b.day_and_time),
+            (array_agg(b.open_price ORDER BY b.day_and_time))[1], min(b.day_and_time),
+            (array_agg(b.close_price ORDER BY b.day_and_time DESC))[1], max(b.day_and_time),
+            max(b.high), min(b.low), sum(b.volume)
+        FROM unnest(symbols, hourly, weeks) AS w(stock_symbol, is_hourly, week)
+        JOIN stock_history b
+            ON b.stock_symbol = w.stock_symbol
+            AND b.is_hourly = w.is_hourly
+            AND b.day_and_time >= w.week
+            AND b.day_and_time < w.week + interval '7 days'
+        JOIN (VALUES {POSTGRES_SOURCES}) AS i(bucket_interval, is_hourly)
+            ON i.is_hourly = b.is_hourly
+        GROUP BY 1, 2, 3, 4;
+    $$ LANGUAGE sql;
+
+    CREATE OR REPLACE FUNCTION stock_history_rollup_after_delete() RETURNS trigger AS $$
+    BEGIN
+        PERFORM resync_stock_history_rollup(
+            array_agg(stock_symbol), array_agg(is_hourly), array_agg(week)
+        )
+        FROM (
+            SELECT DISTINCT stock_symbol, is_hourly, date_trunc('week', day_and_time) AS week
+            FROM old_bars
+        ) changed;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION stock_history_rollup_after_update() RETURNS trigger AS $$
+    BEGIN
+        PERFORM resync_stock_history_rollup(
+            array_agg(stock_symbol), array_agg(is_hourly), array_agg(week)
+        )
+        FROM (
+            SELECT stock_symbol, is_hourly, date_trunc('week', day_and_time) AS week
+            FROM old_bars
+            UNION
+            SELECT stock_symbol, is_hourly, date_trunc('week', day_and_time) AS week
+            FROM new_bars
+        ) changed;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS stock_history_rollup_delete ON stock_history;
+    CREATE TRIGGER stock_history_rollup_delete
+        AFTER DELETE ON stock_history
+        REFERENCING OLD TABLE AS old_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION stock_history_rollup_after_delete();
+
+    DROP TRIGGER IF EXISTS stock_history_rollup_update ON stock_history;
+    CREATE TRIGGER stock_history_rollup_update
+        AFTER UPDATE ON stock_history
+        REFERENCING OLD TABLE AS old_bars NEW TABLE AS new_bars
+        FOR EACH STATEMENT EXECUTE FUNCTION stock_history_rollup_after_update();
+"""
+
+POSTGRES_REVERSE_SQL = """
+    DROP TRIGGER IF EXISTS stock_history_rollup_update ON stock_history;
+    DROP TRIGGER IF EXISTS stock_history_rollup_delete ON stock_history;
+    DROP FUNCTION IF EXISTS stock_history_rollup_after_update();
+    DROP FUNCTION IF EXISTS stock_history_rollup_after_delete();
+    DROP FUNCTION IF EXISTS resync_stock_history_rollup(varchar[], boolean[], timestamp[]);
+"""
+
+SQLITE_BUCKET = """
+            CASE i.bucket_interval
+                WHEN '5m' THEN strftime('%Y-%m-%d %H:', b.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', b.day_and_time) AS integer) / 5 * 5)
+                WHEN '15m' THEN strftime('%Y-%m-%d %H:', b.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', b.day_and_time) AS integer) / 15 * 15)
+                WHEN '30m' THEN strftime('%Y-%m-%d %H:', b.day_and_time)
+                    || printf('%02d:00', CAST(strftime('%M', b.day_and_time) AS integer) / 30 * 30)
+                WHEN '1h' THEN strftime('%Y-%m-%d %H:00:00', b.day_and_time)
+                WHEN '1d' THEN date(b.day_and_time) || ' 00:00:00'
+                WHEN '1wk' THEN date(b.day_and_time, 'weekday 0') || ' 00:00:00'
+            END"""
+
+# Rebuilds the week {row} falls in by replaying its bars through the same
+# merge the insert trigger uses.
+SQLITE_RESYNC = """
+        DELETE FROM stock_history_rollup
+        WHERE stock_symbol = {row}.stock_symbol
+            AND is_hourly = {row}.is_hourly
+            AND bucket >= date({row}.day_and_time, 'weekday 0', '-6 days')
+            AND bucket < date({row}.day_and_time, 'weekday 0', '+1 day');
+
+        INSERT INTO stock_history_rollup (
+            stock_symbol, bucket_interval, is_hourly, bucket,
+            open_price, open_at, close_price, close_at, high, low, volume
+        )
+        SELECT
+            b.stock_symbol, i.bucket_interval, b.is_hourly,{bucket},
+            b.open_price, b.day_and_time, b.close_price, b.day_and_time,
+            b.high, b.low, b.volume
+        FROM stock_history b, ({sources}) AS i
+        WHERE i.is_hourly = b.is_hourly
+            AND b.stock_symbol = {row}.stock_symbol
+            AND b.is_hourly = {row}.is_hourly
+            AND b.day_and_time >= date({row}.day_and_time, 'weekday 0', '-6 days')
+            AND b.day_and_time < date({row}.day_and_time, 'weekday 0', '+1 day')
+        ON CONFLICT (stock_symbol, bucket_interval, is_hourly, bucket) DO UPDATE SET
+            open_price = CASE WHEN excluded.open_at < stock_history_rollup.open_at
+                THEN excluded.open_price ELSE stock_history_rollup.open_price END,
+            open_at = min(stock_history_rollup.open_at, excluded.open_at),
+            close_price = CASE WHEN excluded.close_at >= stock_history_rollup.close_at
+                THEN excluded.close_price ELSE stock_history_rollup.close_price END,
+            close_at = max(stock_history_rollup.close_at, excluded.close_at),
+            high = max(stock_history_rollup.high, excluded.high),
+            low = min(stock_history_rollup.low, excluded.low),
+            volume = stock_history_rollup.volume + excluded.volume;
+"""
+
+
+def _sqlite_resync(row):
+    return SQLITE_RESYNC.format(row=row, bucket=SQLITE_BUCKET, sources=SQLITE_SOURCES)
+
+
+SQLITE_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stock_history_rollup_delete
+    AFTER DELETE ON stock_history
+    BEGIN
+        {_sqlite_resync('OLD')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stock_history_rollup_update
+    AFTER UPDATE ON stock_history
+    BEGIN
+        {_sqlite_resync('OLD')}
+        {_sqlite_resync('NEW')}
+    END
+    """,
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS stock_history_rollup_update",
+    "DROP TRIGGER IF EXISTS stock_history_rollup_delete",
+]
+
+
+def create_rollup_corrections(apps, schema_editor):
+    # params=None: the SQLite SQL contains literal % (strftime/printf formats).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_SQL)
+    else:
+        for statement in SQLITE_SQL:
+            schema_editor.execute(statement, params=None)
+
+
+def drop_rollup_corrections(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_REVERSE_SQL)
+    else:
+        for statement in SQLITE_REVERSE_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0030_stock_history_partition_moves_default_rows'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_rollup_corrections, drop_rollup_corrections),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Incrementum', '0031_stock_history_rollup_corrections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customscreener',
+            name='results_stale',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -5,10 +5,15 @@ from .categorical_filter import CategoricalFilter
 from .custom_screener import CustomScreener
 from .custom_screener_categorical import CustomScreenerCategorical
 from .custom_screener_numeric import CustomScreenerNumeric
+from .custom_screener_result import CustomScreenerResult
+from .daily_close import DailyClose
+from .fifty_two_week_extrema import FiftyTwoWeekExtrema
+from .latest_bar import LatestBar
 from .numeric_filter import NumericFilter
 from .screener import Screener
 from .stock import StockModel, Stock
 from .stock_history import StockHistory
+from .stock_history_rollup import StockHistoryRollup
 from .user_stock_potential import UserStockPotential
 
 __all__ = [
@@ -18,10 +23,15 @@ __all__ = [
     'CustomScreener',
     'CustomScreenerCategorical',
     'CustomScreenerNumeric',
+    'CustomScreenerResult',
+    'DailyClose',
+    'FiftyTwoWeekExtrema',
+    'LatestBar',
     'NumericFilter',
     'Screener',
     'Stock',
     'StockModel',
     'StockHistory',
+    'StockHistoryRollup',
     'UserStockPotential',
 ]
@@ -13,6 +13,12 @@ class CustomScreener(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_private = models.BooleanField(default=True)
     filters = FlexibleJSONField(default=list, blank=True)
+    # When the precomputed CustomScreenerResult rows were last written;
+    # None until the first evaluation.
+    results_as_of = models.DateTimeField(null=True, blank=True)
+    # Set when the filters change; the stored rows still answer reads until
+    # ``evaluate_saved_screeners --stale`` rewrites them.
+    results_stale = models.BooleanField(default=True)
 
     class Meta:
         db_table = 'custom_screener'
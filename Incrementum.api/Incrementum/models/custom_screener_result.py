@@ -0,0 +1,61 @@
+from django.db import models
+
+
+class CustomScreenerResult(models.Model):
+    """
+    One stock matching a saved screener as of its last evaluation.
+    ``position`` is the row's place in the screener's default order, so a
+    page of results is a single index range scan on (screener, position).
+    The sort keys the screener UI offers are copied onto the row as of the
+    same evaluation, so other orders are an index scan on (screener, key)
+    rather than a join back to stock and latest_bar.
+    """
+    id = models.AutoField(primary_key=True)
+    custom_screener = models.ForeignKey(
+        'CustomScreener',
+        on_delete=models.CASCADE,
+        db_column='custom_screener_id',
+        related_name='results'
+    )
+    stock_symbol = models.ForeignKey(
+        'StockModel',
+        on_delete=models.CASCADE,
+        db_column='stock_symbol',
+        to_field='symbol',
+        related_name='custom_screener_results'
+    )
+    position = models.IntegerField()
+    market_cap = models.BigIntegerField(null=True, blank=True)
+    # Effective price in cents: stock.price, else the latest bar's close.
+    price = models.IntegerField(null=True, blank=True)
+    day_percent_change = models.DecimalField(
+        max_digits=12, decimal_places=6, null=True, blank=True
+    )
+    # Latest bar volume.
+    volume = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'custom_screener_result'
+        unique_together = (('custom_screener', 'stock_symbol'),)
+        indexes = [
+            models.Index(
+                fields=['custom_screener', 'position'],
+                name='custom_screener_result_pos',
+            ),
+            models.Index(
+                fields=['custom_screener', 'market_cap'],
+                name='custom_screener_result_cap',
+            ),
+            models.Index(
+                fields=['custom_screener', 'price'],
+                name='custom_screener_result_price',
+            ),
+            models.Index(
+                fields=['custom_screener', 'day_percent_change'],
+                name='custom_screener_result_pct',
+            ),
+            models.Index(
+                fields=['custom_screener', 'volume'],
+                name='custom_screener_result_vol',
+            ),
+        ]
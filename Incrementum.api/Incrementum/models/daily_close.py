@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class DailyClose(models.Model):
+    """
+    Session close per symbol and trading date (the 17:00 stock_history bar)
+    together with the previous session's close. Maintained by insert
+    triggers on stock_history so day-over-day change is a keyed lookup
+    rather than a scan of every 17:00 bar.
+    """
+    pk = models.CompositePrimaryKey('stock_symbol', 'trading_date')
+    stock_symbol = models.ForeignKey(
+        'StockModel',
+        on_delete=models.CASCADE,
+        db_column='stock_symbol',
+        to_field='symbol',
+        related_name='daily_closes'
+    )
+    trading_date = models.DateField()
+    close_price = models.IntegerField()
+    prev_close = models.IntegerField(null=True)
+
+    class Meta:
+        db_table = 'daily_close'
+        managed = False
+
+    def __str__(self):
+        return f"{self.stock_symbol_id} {self.trading_date}: {self.close_price}"
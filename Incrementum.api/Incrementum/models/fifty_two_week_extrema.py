@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class FiftyTwoWeekExtrema(models.Model):
+    """
+    Highest high and lowest low per symbol over the trailing 52 weeks, with
+    the bar time of each. Insert triggers on stock_history raise or lower
+    them as bars arrive; FiftyTwoWeekService recomputes a side once its
+    extreme ages out of the window.
+    """
+    stock_symbol = models.OneToOneField(
+        'StockModel',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='stock_symbol',
+        to_field='symbol',
+        related_name='fifty_two_week'
+    )
+    high = models.IntegerField()
+    high_at = models.DateTimeField()
+    low = models.IntegerField()
+    low_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'fifty_two_week_extrema'
+        managed = False
+
+    def __str__(self):
+        return f"{self.stock_symbol_id} {self.low}-{self.high}"
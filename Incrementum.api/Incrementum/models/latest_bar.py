@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class LatestBar(models.Model):
+    """
+    Most recent stock_history bar per symbol, maintained by database
+    triggers on stock_history (inserts, plus deletes and updates that touch
+    the newest bar) so readers never need a per-row subquery.
+    """
+    stock_symbol = models.OneToOneField(
+        'StockModel',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='stock_symbol',
+        to_field='symbol',
+        related_name='latest_bar'
+    )
+    day_and_time = models.DateTimeField()
+    open_price = models.IntegerField()
+    close_price = models.IntegerField()
+    high = models.IntegerField()
+    low = models.IntegerField()
+    volume = models.IntegerField()
+
+    class Meta:
+        db_table = 'latest_bar'
+        managed = False
+
+    def __str__(self):
+        return f"{self.stock_symbol_id} @ {self.day_and_time}"
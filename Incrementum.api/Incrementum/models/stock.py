@@ -102,73 +102,96 @@ class StockModel(models.Model):
     def __str__(self):
         return f"{self.symbol} - {self.company_name}"
 
-    def to_dict(self):
-        return {
-            'symbol': self.symbol,
-            'company_name': self.company_name,
-            'updated_at': (
-                self.updated_at.isoformat() if self.updated_at else None
-            ),
-            'percent_change': (
-                float(self.day_percent_change)
-                if self.day_percent_change is not None
-                else None
-            ),
-            'day_percent_change': (
-                float(self.day_percent_change)
-                if self.day_percent_change is not None
-                else None
-            ),
-            'dayPercentChange': (
-                float(self.day_percent_change)
-                if self.day_percent_change is not None
-                else None
-            ),
-            'price': self.price,
-            'high52': self.high52,
-            'low52': self.low52,
-            'description': self.description,
-            'market_cap': self.market_cap,
-            'primary_exchange': self.primary_exchange,
-            'type': self.type,
-            'currency_name': self.currency_name,
-            'cik': self.cik,
-            'composite_figi': self.composite_figi,
-            'share_class_figi': self.share_class_figi,
-            'outstanding_shares': self.outstanding_shares,
-            'eps': (float(self.eps) if self.eps is not None else None),
-            'homepage_url': self.homepage_url,
-            'total_employees': self.total_employees,
-            'list_date': (
-                self.list_date.isoformat() if self.list_date else None
-            ),
-            'locale': self.locale,
-            'sic_code': self.sic_code,
-            'sic_description': self.sic_description,
-            'debt_to_equity': (
-                float(self.debt_to_equity)
-                if self.debt_to_equity is not None
-                else None
-            ),
-            'annual_eps_growth_rate': self.annual_eps_growth_rate,
-            'price_per_earnings': self.price_per_earnings,
-            'pe_per_growth': self.pe_per_growth,
-            'revenue_per_share': (
-                float(self.revenue_per_share)
-                if self.revenue_per_share is not None
-                else None
-            ),
-            'price_per_sales': (
-                float(self.price_per_sales)
-                if self.price_per_sales is not None
-                else None
-            ),
-        }
+    def to_dict(self, fields=None):
+        """
+        Serialize the stock. ``fields`` restricts the output to those keys
+        (see STOCK_DICT_FIELDS) and reads only their columns, so it is safe
+        on a queryset narrowed with ``.only(*stock_columns(fields))``.
+        """
+        keys = STOCK_DICT_FIELDS if fields is None else fields
+        data = {}
+        for key in keys:
+            attname, convert = STOCK_DICT_FIELDS[key]
+            value = getattr(self, attname)
+            data[key] = convert(value) if convert and value is not None else value
+        return data
 
     @classmethod
     def fetch_all(cls):
         return cls.objects.all()
 
 
+def _isoformat(value):
+    return value.isoformat()
+
+
+# to_dict() key -> (model attribute, converter applied to non-NULL values)
+STOCK_DICT_FIELDS = {
+    'symbol': ('symbol', None),
+    'company_name': ('company_name', None),
+    'updated_at': ('updated_at', _isoformat),
+    'percent_change': ('day_percent_change', float),
+    'day_percent_change': ('day_percent_change', float),
+    'dayPercentChange': ('day_percent_change', float),
+    'price': ('price', None),
+    'high52': ('high52', None),
+    'low52': ('low52', None),
+    'description': ('description', None),
+    'market_cap': ('market_cap', None),
+    'primary_exchange': ('primary_exchange', None),
+    'type': ('type', None),
+    'currency_name': ('currency_name', None),
+    'cik': ('cik', None),
+    'composite_figi': ('composite_figi', None),
+    'share_class_figi': ('share_class_figi', None),
+    'outstanding_shares': ('outstanding_shares', None),
+    'eps': ('eps', float),
+    'homepage_url': ('homepage_url', None),
+    'total_employees': ('total_employees', None),
+    'list_date': ('list_date', _isoformat),
+    'locale': ('locale', None),
+    'sic_code': ('sic_code', None),
+    'sic_description': ('sic_description', None),
+    'debt_to_equity': ('debt_to_equity', float),
+    'annual_eps_growth_rate': ('annual_eps_growth_rate', None),
+    'price_per_earnings': ('price_per_earnings', None),
+    'pe_per_growth': ('pe_per_growth', None),
+    'revenue_per_share': ('revenue_per_share', float),
+    'price_per_sales': ('price_per_sales', float),
+}
+
+
+def parse_stock_fields(raw):
+    """
+    Parse a ``fields=`` value (comma-separated string or list) into a list
+    of to_dict() keys, or None when absent. Raises ValueError on unknown keys.
+    """
+    if raw is None or raw == '' or raw == []:
+        return None
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    if not isinstance(raw, (list, tuple)):
+        raise ValueError("fields must be a comma-separated string or a list")
+    fields = []
+    for field in raw:
+        field = str(field).strip()
+        if field and field not in fields:
+            fields.append(field)
+    unknown = [f for f in fields if f not in STOCK_DICT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {unknown}")
+    return fields or None
+
+
+def stock_columns(fields):
+    """Model attributes backing ``fields``, for QuerySet.only()."""
+    columns = ['symbol']
+    for field in fields:
+        attname = STOCK_DICT_FIELDS[field][0]
+        if attname not in columns:
+            columns.append(attname)
+    return columns
+
+
 # Alias for backward compatibility
 Stock = StockModel
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class StockHistoryRollup(models.Model):
+    """
+    OHLCV buckets of stock_history at the chart intervals (5m through 1wk),
+    maintained incrementally by insert triggers on stock_history. Buckets
+    built from hourly and from minute bars are kept apart (``is_hourly``),
+    mirroring the two raw sources history() reads from.
+    """
+    pk = models.CompositePrimaryKey('stock_symbol', 'bucket_interval', 'is_hourly', 'bucket')
+    stock_symbol = models.ForeignKey(
+        'StockModel',
+        on_delete=models.CASCADE,
+        db_column='stock_symbol',
+        to_field='symbol',
+        related_name='history_rollups'
+    )
+    bucket_interval = models.CharField(max_length=4)
+    is_hourly = models.BooleanField()
+    bucket = models.DateTimeField()
+    open_price = models.IntegerField()
+    open_at = models.DateTimeField()
+    close_price = models.IntegerField()
+    close_at = models.DateTimeField()
+    high = models.IntegerField()
+    low = models.IntegerField()
+    volume = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'stock_history_rollup'
+        managed = False
+
+    def __str__(self):
+        return f"{self.stock_symbol_id} {self.bucket_interval} @ {self.bucket}"
@@ -1,28 +1,523 @@
+from datetime import date, datetime
+from decimal import Decimal
 from typing import List
-import re
-from django.db.models import Q, OuterRef, Subquery
+import hashlib
+import json
+from django.core import signing
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import CharField, Count, F, Q, TextField
 from django.db.models.functions import Coalesce
 from Incrementum.DTOs.ifilterdata import FilterData
-from Incrementum.models.stock import StockModel
-from Incrementum.models.stock_history import StockHistory
+from Incrementum.data_generation import get_data_generation, screener_cache_alias
+from Incrementum.lookups import screener_contains_pattern
+from Incrementum.models.stock import StockModel, stock_columns
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Normalize UI sort keys to ORM/annotation field names.
+SORT_FIELD_MAPPING = {
+    'percent_change': 'day_percent_change',
+    'dayPercentChange': 'day_percent_change',
+    'volume': 'latest_volume',
+    'pps': 'effective_price',
+}
+
+FILTER_FIELD_MAPPING = {
+    'ticker': 'symbol',
+    'market_cap': 'market_cap',
+    'pps': 'effective_price',
+    'price': 'price',
+    'high52': 'high52',
+    'low52': 'low52',
+    'industry': 'sic_description',
+    'volume': 'latest_volume',
+    'percent_change': 'day_percent_change',
+    'dayPercentChange': 'day_percent_change',
+    'debt_to_equity': 'debt_to_equity',
+    'annual_eps_growth_rate': 'annual_eps_growth_rate',
+    'price_per_earnings': 'price_per_earnings',
+    'pe_per_growth': 'pe_per_growth',
+    'revenue_per_share': 'revenue_per_share',
+    'price_per_sales': 'price_per_sales',
+}
+
+# String columns that support the ``ilike`` lookup.
+TEXT_FIELDS = {
+    field.name
+    for field in StockModel._meta.concrete_fields
+    if isinstance(field, (CharField, TextField))
+}
+
+# Keys a screen can be sorted by: stock columns, the latest-bar annotations
+# build_queryset() adds, and their UI aliases.
+SORT_FIELDS = (
+    {field.name for field in StockModel._meta.concrete_fields}
+    | {'latest_close', 'effective_price', 'latest_volume'}
+    | set(SORT_FIELD_MAPPING)
+)
+
+# Operands whose UI decimal values are stored as integers (x100).
+SCALED_OPERANDS = {
+    'pps',
+    'price',
+    'high52',
+    'low52',
+    'annual_eps_growth_rate',
+    'price_per_earnings',
+    'pe_per_growth',
+}
+
+
+def scale_filter_value(operand: str, value):
+    """Convert a UI decimal value to the stored integer scale (x100)."""
+    if operand in SCALED_OPERANDS and value is not None:
+        return int(float(value) * 100)
+    return value
+
+
+COUNT_MODES = {'exact', 'estimated', 'cached', 'none'}
+EXPORT_CHUNK_SIZE = 2000
+COUNT_CACHE_TIMEOUT_SECONDS = 60 * 60
+
+CURSOR_SALT = "screener-keyset-cursor"
+
+# Facets returned next to screener results: value counts per category and
+# bucket counts per numeric operand. Histogram edges are in UI units.
+FACET_CATEGORIES = ('sic_description', 'primary_exchange', 'type')
+FACET_HISTOGRAMS = {
+    'market_cap': [300_000_000, 2_000_000_000, 10_000_000_000, 200_000_000_000],
+    'price_per_earnings': [0, 10, 20, 30, 50],
+}
+FACET_VALUE_LIMIT = 50
+
+
+def histogram_bounds(operand: str) -> list:
+    """[low, high) bounds per bucket in stored units; None is unbounded."""
+    edges = [scale_filter_value(operand, edge) for edge in FACET_HISTOGRAMS[operand]]
+    return list(zip([None] + edges, edges + [None]))
+
+
+def histogram_facet(operand: str, counts) -> list:
+    edges = FACET_HISTOGRAMS[operand]
+    return [
+        {'min': low, 'max': high, 'count': int(count)}
+        for (low, high), count in zip(zip([None] + edges, edges + [None]), counts)
+    ]
+
+
+def category_facet(value_counts) -> list:
+    """Format (value, count) pairs, most frequent first."""
+    ordered = sorted(value_counts, key=lambda item: (-item[1], item[0]))
+    return [
+        {'value': value, 'count': int(count)}
+        for value, count in ordered[:FACET_VALUE_LIMIT]
+    ]
+
+
+def canonical_filters_key(filters: List[FilterData]) -> str:
+    """
+    Stable hash of a filter set. Screener semantics depend only on which
+    filters are present (grouping is by operand), not on their order.
+    """
+    canonical = sorted(
+        json.dumps(
+            [f.operand, f.operator, f.filter_type, f.value],
+            sort_keys=True,
+            default=str,
+        )
+        for f in filters
+    )
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+def _cursor_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(stock: StockModel, sort_field: str, sort_order: str, direction: str,
+                  filters_key: str) -> str:
+    """
+    Opaque, signed cursor for the row after (or before) ``stock``, bound to
+    the sort and the filter set (``canonical_filters_key``) it was issued for.
+    """
+    payload = {
+        'k': _cursor_value(getattr(stock, sort_field)),
+        's': stock.symbol,
+        'f': sort_field,
+        'o': sort_order,
+        'q': filters_key,
+        'd': direction,
+    }
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError("invalid cursor")
+    if not isinstance(payload, dict) or payload.get('d') not in {'next', 'prev'}:
+        raise ValueError("invalid cursor")
+    return payload
+
 
 class Screener:
+    def __init__(self, engine=None, result_cache=None, fields=None):
+        # Optional in-memory engine (see screener_engine.ColumnarScreenerEngine).
+        # When it cannot serve a request, the database path below is used.
+        self.engine = engine
+        # Optional screener_cache.ScreenerResultCache consulted by query_page.
+        self.result_cache = result_cache
+        # Optional to_dict() keys; database queries then load only their columns.
+        self.fields = fields
+
     def query(self, filters: List[FilterData],
               sort_by: str = None, sort_order: str = 'asc',
               page: int = 1, page_size: int | None = None) -> tuple[List[StockModel], int]:
+        result = self.query_page(
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            page_size=page_size,
+        )
+        return result['stocks'], result['total_count']
+
+    def query_page(self, filters: List[FilterData],
+                   sort_by: str = None, sort_order: str = 'asc',
+                   page: int = 1, page_size: int | None = None,
+                   count_mode: str = 'exact', facets: bool = False) -> dict:
+        """
+        Run a screen and return one page plus its total under ``count_mode``:
+
+        - ``exact``: a full COUNT(*) of the filtered set.
+        - ``estimated``: the planner's row estimate from EXPLAIN (PostgreSQL
+          only; other databases fall back to ``exact``).
+        - ``cached``: an exact count memoized per canonical filter set until
+          the next data-generation bump.
+        - ``none``: no count; ``has_next`` comes from fetching one extra row.
+
+        The returned ``count_mode`` is the mode that produced ``total_count``.
+        With ``facets`` the result also carries a ``facets`` block for the
+        whole filtered set (see facets()), built from the same match set as
+        the page. On the database path the facet GROUP BY also gives the
+        total, so ``count_mode`` is then always ``exact``.
+        """
+        if count_mode not in COUNT_MODES:
+            raise ValueError(f"count_mode must be one of {sorted(COUNT_MODES)}")
+
+        def compute():
+            return self._query_page(
+                filters, sort_by, sort_order, page, page_size, count_mode, facets
+            )
+
+        if self.result_cache is not None:
+            key = self.result_cache.make_key(
+                filters, sort_by, sort_order, page, page_size, count_mode,
+                self.fields, facets,
+            )
+            return self.result_cache.get_or_compute(key, compute)
+        return compute()
+
+    def facets(self, filters: List[FilterData], sort_by: str = None) -> dict:
+        """
+        Value counts for FACET_CATEGORIES and bucket counts for
+        FACET_HISTOGRAMS over every stock matching ``filters``. The engine
+        computes them with bincounts over its snapshot; the database path
+        uses a single GROUP BY (see _facet_summary()).
+        """
+        if self.engine is not None:
+            result = self.engine.facets(filters, sort_by=sort_by)
+            if result is not None:
+                return result
+        return self._facet_summary(self.build_queryset(filters, sort_by=sort_by))[1]
+
+    def _facet_summary(self, qs) -> tuple[int, dict]:
+        """
+        (match count, facets) for ``qs`` from one GROUP BY over all the
+        category columns together, with the histogram buckets as filtered
+        counts in the same statement. Each category's counts are then summed
+        over the other columns, and the row counts add up to the total, so
+        a facet request needs no separate COUNT(*).
+        """
+        aggregates = {'facet_count': Count('symbol')}
+        for operand in FACET_HISTOGRAMS:
+            field_name = FILTER_FIELD_MAPPING.get(operand, operand)
+            for index, (low, high) in enumerate(histogram_bounds(operand)):
+                condition = Q()
+                if low is not None:
+                    condition &= Q(**{f'{field_name}__gte': low})
+                if high is not None:
+                    condition &= Q(**{f'{field_name}__lt': high})
+                aggregates[f'{operand}_{index}'] = Count('symbol', filter=condition)
+
+        total = 0
+        category_counts = {field: {} for field in FACET_CATEGORIES}
+        bucket_counts = {key: 0 for key in aggregates if key != 'facet_count'}
+        for row in qs.order_by().values(*FACET_CATEGORIES).annotate(**aggregates):
+            total += row['facet_count']
+            for field, counts in category_counts.items():
+                if row[field] is not None:
+                    counts[row[field]] = counts.get(row[field], 0) + row['facet_count']
+            for key in bucket_counts:
+                bucket_counts[key] += row[key]
 
-        # Normalize UI sort keys to ORM/annotation field names.
-        sort_field_mapping = {
-            'percent_change': 'day_percent_change',
-            'dayPercentChange': 'day_percent_change',
-            'volume': 'latest_volume',
-            'pps': 'effective_price',
+        result = {
+            field: category_facet(counts.items())
+            for field, counts in category_counts.items()
         }
-        sort_by = sort_field_mapping.get(sort_by, sort_by)
+        for operand in FACET_HISTOGRAMS:
+            counts = [
+                bucket_counts[f'{operand}_{index}']
+                for index in range(len(histogram_bounds(operand)))
+            ]
+            result[operand] = histogram_facet(operand, counts)
+        return total, result
+
+    def _query_page(self, filters: List[FilterData], sort_by: str, sort_order: str,
+                    page: int, page_size: int | None, count_mode: str,
+                    facets: bool = False) -> dict:
+        if self.engine is not None:
+            if facets:
+                result = self.engine.query_with_facets(
+                    filters,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    page=page,
+                    page_size=page_size,
+                )
+                if result is not None:
+                    stocks, total, facet_counts = result
+                    return {
+                        **self._page_result(stocks, total, page, page_size),
+                        'facets': facet_counts,
+                    }
+            else:
+                result = self.engine.query(
+                    filters,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    page=page,
+                    page_size=page_size,
+                )
+                if result is not None:
+                    stocks, total = result
+                    return self._page_result(stocks, total, page, page_size)
+
+        qs = self.build_queryset(filters, sort_by=sort_by, sort_order=sort_order)
+        facet_counts = None
+        if count_mode == 'estimated' and connection.vendor != 'postgresql':
+            count_mode = 'exact'
+
+        if facets:
+            # The facet GROUP BY already counts every match exactly.
+            total, facet_counts = self._facet_summary(qs)
+            count_mode = 'exact'
+        elif count_mode == 'exact':
+            total = qs.count()
+        elif count_mode == 'cached':
+            total = self._cached_count(qs, filters, sort_by)
+        elif count_mode == 'estimated':
+            total = self._estimated_count(qs)
+        else:
+            total = None
+
+        has_next = False
+        if page_size:
+            offset = (max(page, 1) - 1) * page_size
+            if count_mode in {'exact', 'cached'}:
+                result = list(qs[offset: offset + page_size])
+                has_next = offset + page_size < total
+            else:
+                result = list(qs[offset: offset + page_size + 1])
+                has_next = len(result) > page_size
+                result = result[:page_size]
+        else:
+            result = list(qs)
+            if total is None:
+                total = len(result)
+                count_mode = 'exact'
+        logger.info(f"Query returned {len(result)} stocks (total {total}, {count_mode})")
+        page_result = {
+            'stocks': result,
+            'total_count': total,
+            'count_mode': count_mode,
+            'has_next': has_next,
+        }
+        if facet_counts is not None:
+            page_result['facets'] = facet_counts
+        return page_result
+
+    def query_batch(self, requests: List[dict]) -> List[dict]:
+        """
+        Evaluate several screens in one pass. Each request is a dict of
+        query() keyword arguments (filters, sort_by, sort_order, page,
+        page_size); results come back in the same order, shaped like
+        query_page() with exact counts.
+
+        With an engine, every request shares one snapshot. Otherwise all
+        totals come from a single aggregate over the stock table (one
+        filtered COUNT per request) and only the page fetches run
+        separately.
+        """
+        results = [None] * len(requests)
+        if self.engine is not None:
+            for index, result in enumerate(self.engine.query_batch(requests)):
+                if result is not None:
+                    stocks, total = result
+                    results[index] = self._page_result(
+                        stocks, total, requests[index].get('page', 1),
+                        requests[index].get('page_size'),
+                    )
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        totals = self._batch_counts([requests[index] for index in pending])
+        for index, total in zip(pending, totals):
+            request = requests[index]
+            page = request.get('page', 1)
+            page_size = request.get('page_size')
+            qs = self.build_queryset(
+                request.get('filters', []),
+                sort_by=request.get('sort_by'),
+                sort_order=request.get('sort_order', 'asc'),
+            )
+            if page_size:
+                offset = (max(page, 1) - 1) * page_size
+                qs = qs[offset: offset + page_size]
+            results[index] = self._page_result(list(qs), total, page, page_size)
+        return results
+
+    def _page_result(self, stocks, total: int, page: int, page_size: int | None) -> dict:
+        return {
+            'stocks': stocks,
+            'total_count': total,
+            'count_mode': 'exact',
+            'has_next': bool(page_size) and max(page, 1) * page_size < total,
+        }
+
+    def _batch_counts(self, requests: List[dict]) -> List[int]:
+        if not requests:
+            return []
+        qs = StockModel.objects.annotate(
+            latest_close=F('latest_bar__close_price'),
+            effective_price=Coalesce('price', 'latest_bar__close_price'),
+            latest_volume=F('latest_bar__volume'),
+        )
+        aggregates = {}
+        for index, request in enumerate(requests):
+            condition = Q()
+            filters = request.get('filters', [])
+            if filters:
+                condition &= self._combine_filters(filters)
+            sort_by = SORT_FIELD_MAPPING.get(request.get('sort_by'), request.get('sort_by'))
+            if sort_by:
+                condition &= Q(**{f'{sort_by}__isnull': False})
+            if condition:
+                aggregates[f'set_{index}'] = Count('symbol', filter=condition)
+            else:
+                aggregates[f'set_{index}'] = Count('symbol')
+        totals = qs.aggregate(**aggregates)
+        return [totals[f'set_{index}'] for index in range(len(requests))]
+
+    def _cached_count(self, qs, filters: List[FilterData], sort_by: str = None) -> int:
+        # sort_by matters because sorting excludes NULL sort keys.
+        key = 'screener-count:{}:{}:{}'.format(
+            get_data_generation(),
+            canonical_filters_key(filters),
+            SORT_FIELD_MAPPING.get(sort_by, sort_by) or '',
+        )
+        cache = caches[screener_cache_alias()]
+        total = cache.get(key)
+        if total is None:
+            total = qs.count()
+            cache.set(key, total, timeout=COUNT_CACHE_TIMEOUT_SECONDS)
+        return total
+
+    def _estimated_count(self, qs) -> int:
+        sql, params = qs.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def query_keyset(self, filters: List[FilterData],
+                     sort_by: str = None, sort_order: str = 'asc',
+                     page_size: int = 25, cursor: str | None = None) -> dict:
+        """
+        Cursor-paginated variant of query(). Instead of an OFFSET it seeks
+        past the (sort key, symbol) pair encoded in ``cursor``, so every page
+        costs the same regardless of depth. Returns the page of stocks along
+        with ``next_cursor``/``prev_cursor`` (None at either end).
+        Raises ValueError for a cursor that is invalid or was issued for a
+        different sort or filter set.
+        """
+        sort_field = SORT_FIELD_MAPPING.get(sort_by, sort_by) or 'symbol'
+        filters_key = canonical_filters_key(filters)
+        position = decode_cursor(cursor) if cursor else None
+        if position and (position['f'] != sort_field or position['o'] != sort_order):
+            raise ValueError("cursor was issued for a different sort")
+        if position and position.get('q') != filters_key:
+            raise ValueError("cursor was issued for different filters")
+
+        direction = position['d'] if position else 'next'
+        forward = direction == 'next'
+        key_ascending = (sort_order == 'asc') == forward
+        key_prefix = '' if key_ascending else '-'
+        symbol_prefix = '' if forward else '-'
+
+        qs = self.build_queryset(filters, sort_by=sort_by, sort_order=sort_order)
+        qs = qs.order_by(f'{key_prefix}{sort_field}', f'{symbol_prefix}symbol')
+        if position:
+            key_op = 'gt' if key_ascending else 'lt'
+            symbol_op = 'gt' if forward else 'lt'
+            qs = qs.filter(
+                Q(**{f'{sort_field}__{key_op}': position['k']})
+                | Q(**{sort_field: position['k'], f'symbol__{symbol_op}': position['s']})
+            )
+
+        rows = list(qs[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        next_cursor = prev_cursor = None
+        if rows:
+            if has_more or not forward:
+                next_cursor = encode_cursor(rows[-1], sort_field, sort_order, 'next', filters_key)
+            if (has_more and not forward) or (forward and position):
+                prev_cursor = encode_cursor(rows[0], sort_field, sort_order, 'prev', filters_key)
+
+        return {
+            'stocks': rows,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+        }
+
+    def iterate(self, filters: List[FilterData],
+                sort_by: str = None, sort_order: str = 'asc',
+                chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Yield every matching stock in screener order without materializing
+        the result. On PostgreSQL this reads from a named server-side cursor
+        ``chunk_size`` rows at a time, so memory stays flat and there is no
+        count or OFFSET.
+        """
+        qs = self.build_queryset(filters, sort_by=sort_by, sort_order=sort_order)
+        return qs.iterator(chunk_size=chunk_size)
+
+    def build_queryset(self, filters: List[FilterData],
+                       sort_by: str = None, sort_order: str = 'asc'):
+        """Filtered, annotated and ordered StockModel queryset for a screen."""
+        sort_by = SORT_FIELD_MAPPING.get(sort_by, sort_by)
 
         needs_latest_pps = (
             any(f.operand in {'pps', 'effective_price'} for f in filters)
@@ -33,40 +528,41 @@ class Screener:
             or sort_by == 'latest_volume'
         )
 
-        base_qs = StockModel.objects
-        if needs_latest_pps or needs_latest_volume:
-            latest_history_qs = StockHistory.objects.filter(
-                stock_symbol__symbol=OuterRef('symbol')
-            ).order_by('-day_and_time')
-
-            if needs_latest_pps:
-                latest_close_subq = Subquery(latest_history_qs.values('close_price')[:1])
-                base_qs = base_qs.annotate(
-                    latest_close=latest_close_subq,
-                    effective_price=Coalesce('price', latest_close_subq),
-                )
+        # Latest-bar values come from the trigger-maintained latest_bar
+        # table, a single LEFT JOIN instead of a subquery per stock.
+        qs = StockModel.objects.all()
+        if self.fields:
+            # Keep the sort column loaded too; keyset cursors read it.
+            columns = stock_columns(self.fields)
+            model_fields = {f.name for f in StockModel._meta.concrete_fields}
+            if sort_by in model_fields and sort_by not in columns:
+                columns.append(sort_by)
+            qs = qs.only(*columns)
+        if needs_latest_pps:
+            qs = qs.annotate(
+                latest_close=F('latest_bar__close_price'),
+                effective_price=Coalesce('price', 'latest_bar__close_price'),
+            )
 
-            if needs_latest_volume:
-                latest_volume_subq = Subquery(latest_history_qs.values('volume')[:1])
-                base_qs = base_qs.annotate(latest_volume=latest_volume_subq)
+        if needs_latest_volume:
+            qs = qs.annotate(latest_volume=F('latest_bar__volume'))
 
-        if not filters:
-            if sort_by:
-                # Exclude NULL values when sorting by a nullable field
-                base_qs = base_qs.exclude(**{f'{sort_by}__isnull': True})
-                order = '' if sort_order == 'asc' else '-'
-                base_qs = base_qs.order_by(f'{order}{sort_by}')
-            else:
-                base_qs = base_qs.order_by('symbol')
+        if filters:
+            combined_q = self._combine_filters(filters)
+            logger.info(f"Final query: {combined_q}")
+            qs = qs.filter(combined_q)
 
-            total = base_qs.count()
-            if page_size:
-                offset = (max(page, 1) - 1) * page_size
-                qs = base_qs[offset: offset + page_size]
-            else:
-                qs = base_qs
-            return list(qs), total
+        if sort_by:
+            # Exclude NULL values when sorting by a nullable field
+            qs = qs.exclude(**{f'{sort_by}__isnull': True})
+            order = '' if sort_order == 'asc' else '-'
+            # symbol breaks ties so pages never overlap or skip rows
+            qs = qs.order_by(f'{order}{sort_by}', 'symbol')
+        else:
+            qs = qs.order_by('symbol')
+        return qs
 
+    def _combine_filters(self, filters: List[FilterData]) -> Q:
         grouped_filters = {}
         for filter_data in filters:
             operand = filter_data.operand
@@ -100,61 +596,15 @@ class Screener:
                             logger.error(or_q)
                     if or_q:
                         combined_q &= or_q
-
-        logger.info(f"Final query: {combined_q}")
-        qs = base_qs.filter(combined_q)
-
-        if sort_by:
-            qs = qs.exclude(**{f'{sort_by}__isnull': True})
-            order = '' if sort_order == 'asc' else '-'
-            qs = qs.order_by(f'{order}{sort_by}')
-        else:
-            qs = qs.order_by('symbol')
-        total = qs.count()
-        if page_size:
-            offset = (max(page, 1) - 1) * page_size
-            qs = qs[offset: offset + page_size]
-        result = list(qs)
-        logger.info(f"Query returned {len(result)} stocks (total {total})")
-        return result, total
+        return combined_q
 
     def _build_q_object(self, filter_data: FilterData) -> Q:
         operand = filter_data.operand
         operator = filter_data.operator
         value = filter_data.value
 
-        field_mapping = {
-            'ticker': 'symbol',
-            'market_cap': 'market_cap',
-            'pps': 'effective_price',
-            'price': 'price',
-            'high52': 'high52',
-            'low52': 'low52',
-            'industry': 'sic_description',
-            'volume': 'latest_volume',
-            'percent_change': 'day_percent_change',
-            'dayPercentChange': 'day_percent_change',
-            'debt_to_equity': 'debt_to_equity',
-            'annual_eps_growth_rate': 'annual_eps_growth_rate',
-            'price_per_earnings': 'price_per_earnings',
-            'pe_per_growth': 'pe_per_growth',
-            'revenue_per_share': 'revenue_per_share',
-            'price_per_sales': 'price_per_sales',
-        }
-
-        field_name = field_mapping.get(operand, operand)
-
-        # Convert UI decimal values to stored integer scale (x100).
-        if operand in {
-            'pps',
-            'price',
-            'high52',
-            'low52',
-            'annual_eps_growth_rate',
-            'price_per_earnings',
-            'pe_per_growth',
-        } and value is not None:
-            value = int(float(value) * 100)
+        field_name = FILTER_FIELD_MAPPING.get(operand, operand)
+        value = scale_filter_value(operand, value)
 
         if operator == 'equals':
             if filter_data.filter_type in ['categoric', 'string']:
@@ -175,10 +625,9 @@ class Screener:
             return Q(**{f'{field_name}__lte': value})
 
         elif operator == 'contains':
-            if isinstance(value, str) and '*' in value:
-                parts = [re.escape(part) for part in value.split('*')]
-                pattern = '^' + '.*'.join(parts) + '$'
-                return Q(**{f'{field_name}__iregex': pattern})
+            if isinstance(value, str) and field_name in TEXT_FIELDS:
+                # Bare ILIKE so the pg_trgm indexes on stock can be used.
+                return Q(**{f'{field_name}__ilike': screener_contains_pattern(value)})
             return Q(**{f'{field_name}__icontains': value})
 
         return Q()
@@ -0,0 +1,100 @@
+"""
+Result cache in front of Screener.query_page.
+
+Entries are keyed by a canonical hash of the request (filter set, sort,
+page, count mode) plus the current data generation, so a write to stock or
+stock_history data orphans every cached screen at once. Storage is Django's
+cache framework under the ``SCREENER_CACHE_ALIAS`` alias; with the locmem
+backend, eviction is least-recently-used once MAX_ENTRIES is reached.
+"""
+import hashlib
+import json
+import logging
+import pickle
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.data_generation import (
+    data_generation_is_shared,
+    get_data_generation,
+    screener_cache_alias,
+)
+from Incrementum.screener import SORT_FIELD_MAPPING, canonical_filters_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRY_BYTES = 1024 * 1024
+DEFAULT_TIMEOUT_SECONDS = 300
+
+
+class ScreenerResultCache:
+    def __init__(self, alias: Optional[str] = None,
+                 max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+                 timeout: Optional[int] = DEFAULT_TIMEOUT_SECONDS):
+        self.cache = caches[alias or screener_cache_alias()]
+        self.max_entry_bytes = max_entry_bytes
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, filters: List[FilterData], sort_by: str = None,
+                 sort_order: str = 'asc', page: int = 1,
+                 page_size: int | None = None, count_mode: str = 'exact',
+                 fields: List[str] | None = None, facets: bool = False) -> str:
+        request = json.dumps([
+            canonical_filters_key(filters),
+            SORT_FIELD_MAPPING.get(sort_by, sort_by),
+            sort_order if sort_by else None,
+            max(page, 1) if page_size else None,
+            page_size,
+            count_mode,
+            fields,
+            facets,
+        ])
+        digest = hashlib.sha256(request.encode()).hexdigest()
+        return f'screener-result:{get_data_generation()}:{digest}'
+
+    def get_or_compute(self, key: str, compute: Callable[[], dict]) -> dict:
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = compute()
+        payload_size = len(pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        if payload_size <= self.max_entry_bytes:
+            self.cache.set(key, result, timeout=self.timeout)
+        else:
+            logger.info(
+                f"Not caching screener result of {payload_size} bytes "
+                f"(limit {self.max_entry_bytes})"
+            )
+        return result
+
+
+def get_screener_result_cache() -> Optional[ScreenerResultCache]:
+    """
+    Result cache configured from settings, or None when disabled. It is
+    also None on a process-local backend, where a bump_data_generation from
+    the ingest job would never reach the web workers' cached pages.
+    """
+    if not getattr(settings, 'SCREENER_RESULT_CACHE_ENABLED', False):
+        return None
+    if not data_generation_is_shared():
+        logger.warning(
+            "SCREENER_RESULT_CACHE_ENABLED is ignored: the "
+            f"'{screener_cache_alias()}' cache is local to each process"
+        )
+        return None
+    return ScreenerResultCache(
+        max_entry_bytes=getattr(
+            settings, 'SCREENER_RESULT_CACHE_MAX_ENTRY_BYTES', DEFAULT_MAX_ENTRY_BYTES
+        ),
+        timeout=getattr(
+            settings, 'SCREENER_RESULT_CACHE_TIMEOUT', DEFAULT_TIMEOUT_SECONDS
+        ),
+    )
@@ -0,0 +1,505 @@
+"""
+In-memory columnar engine for Screener.query.
+
+Holds the StockModel numeric and categorical columns as NumPy arrays and
+evaluates the screener filter vocabulary as vectorized boolean masks, so a
+screener request never has to build a Q object or touch Postgres. The arrays
+are a snapshot: they reload when the data generation is bumped, when
+``invalidate()`` is called, or after ``max_age_seconds``.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import F
+
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.data_generation import get_data_generation
+from Incrementum.lookups import like_regex, screener_contains_pattern
+from Incrementum.models.stock import StockModel
+from Incrementum.screener import (
+    FACET_CATEGORIES,
+    FACET_HISTOGRAMS,
+    FILTER_FIELD_MAPPING,
+    SORT_FIELD_MAPPING,
+    category_facet,
+    histogram_bounds,
+    histogram_facet,
+    scale_filter_value,
+)
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_INTERNAL_TYPES = {'IntegerField', 'BigIntegerField', 'DecimalField'}
+STRING_INTERNAL_TYPES = {'CharField'}
+
+DEFAULT_MAX_AGE_SECONDS = 300
+
+# Low-cardinality categorical columns that get a bitmap index per value.
+BITMAP_COLUMNS = ('sic_description', 'primary_exchange', 'type', 'locale')
+
+
+class UnsupportedQuery(Exception):
+    """Raised when a request uses something the engine cannot evaluate."""
+
+
+class _StringColumn:
+    """
+    Dictionary-encoded string column: one code per row, -1 for NULL.
+    Category masks carry one extra trailing slot that stands for NULL.
+    """
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        self.codes = codes.astype(np.int32)
+        self.categories = np.asarray(uniques, dtype=object)
+        self.lowered = np.array([c.lower() for c in self.categories], dtype=object)
+        order = np.argsort(self.categories) if len(self.categories) else np.array([], dtype=int)
+        self.ranks = np.empty(len(self.categories), dtype=np.int64)
+        self.ranks[order] = np.arange(len(self.categories))
+        self.bitmaps: Optional[np.ndarray] = None
+
+    def build_bitmaps(self):
+        """
+        One packed bitset per category (plus NULL) over the snapshot's row
+        ordinals, so a multi-value filter is an OR of a few bitsets.
+        """
+        size = len(self.codes)
+        slots = np.where(self.codes < 0, len(self.categories), self.codes)
+        onehot = np.zeros((len(self.categories) + 1, size), dtype=bool)
+        onehot[slots, np.arange(size)] = True
+        self.bitmaps = np.packbits(onehot, axis=1)
+
+    def mask_from_categories(self, category_mask: np.ndarray) -> np.ndarray:
+        # Code -1 (NULL) indexes the trailing NULL slot.
+        return category_mask[self.codes]
+
+    def bits_from_categories(self, category_mask: np.ndarray) -> np.ndarray:
+        selected = self.bitmaps[category_mask]
+        if not len(selected):
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(selected, axis=0)
+
+
+class _Snapshot:
+    def __init__(self, stocks: List[StockModel], version: int, generation: int):
+        self.version = version
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        self.size = len(stocks)
+        self.stocks = np.empty(self.size, dtype=object)
+        self.stocks[:] = stocks
+
+        self.numeric = {}
+        self.strings = {}
+        for field in StockModel._meta.concrete_fields:
+            internal_type = field.get_internal_type()
+            values = [getattr(stock, field.attname) for stock in stocks]
+            if internal_type in NUMERIC_INTERNAL_TYPES:
+                self.numeric[field.attname] = _to_float_array(values)
+            elif internal_type in STRING_INTERNAL_TYPES:
+                self.strings[field.attname] = _StringColumn(values)
+
+        for name in ('latest_close', 'latest_volume'):
+            self.numeric[name] = _to_float_array(
+                [getattr(stock, name, None) for stock in stocks]
+            )
+        price = self.numeric['price']
+        self.numeric['effective_price'] = np.where(
+            np.isnan(price), self.numeric['latest_close'], price
+        )
+
+        self.symbol_rank = self.strings['symbol'].ranks[self.strings['symbol'].codes]
+        for name in BITMAP_COLUMNS:
+            self.strings[name].build_bitmaps()
+
+
+def _to_float_array(values) -> np.ndarray:
+    return np.array(
+        [np.nan if v is None else float(v) for v in values],
+        dtype=np.float64,
+    )
+
+
+class ColumnarScreenerEngine:
+    """Evaluates Screener.query requests against an in-memory snapshot."""
+
+    def __init__(self, max_age_seconds: Optional[int] = DEFAULT_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self.version = 0
+        self._snapshot: Optional[_Snapshot] = None
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Reload the column arrays from the database and bump the version."""
+        with self._lock:
+            generation = get_data_generation()
+            stocks = self._load_stocks()
+            self.version += 1
+            self._snapshot = _Snapshot(stocks, self.version, generation)
+            self._stale = False
+        logger.info(
+            f"Screener engine loaded {len(stocks)} stocks (version {self.version})"
+        )
+        return self.version
+
+    def invalidate(self):
+        """Mark the snapshot stale so the next query reloads it."""
+        self._stale = True
+
+    def snapshot(self) -> _Snapshot:
+        snapshot = self._snapshot
+        expired = (
+            snapshot is not None
+            and self.max_age_seconds is not None
+            and time.monotonic() - snapshot.loaded_at > self.max_age_seconds
+        )
+        if (
+            snapshot is None
+            or self._stale
+            or expired
+            or snapshot.generation != get_data_generation()
+        ):
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def _load_stocks(self) -> List[StockModel]:
+        stocks = list(
+            StockModel.objects.annotate(
+                latest_close=F('latest_bar__close_price'),
+                latest_volume=F('latest_bar__volume'),
+            ).order_by('symbol')
+        )
+        for stock in stocks:
+            stock.effective_price = (
+                stock.price if stock.price is not None else stock.latest_close
+            )
+        return stocks
+
+    def query(self, filters: List[FilterData],
+              sort_by: str = None, sort_order: str = 'asc',
+              page: int = 1, page_size: int | None = None):
+        """
+        Same contract as Screener.query. Returns None when the request uses
+        a field or operator the engine does not hold, so the caller can fall
+        back to the database.
+        """
+        return self._query_snapshot(
+            self.snapshot(), None, filters, sort_by, sort_order, page, page_size
+        )
+
+    def query_batch(self, requests: List[dict]) -> list:
+        """
+        Run several Screener.query requests (dicts of query() keyword
+        arguments) against one snapshot, evaluating each distinct filter
+        once. Entries are None where the engine cannot serve the request.
+        """
+        snapshot = self.snapshot()
+        mask_cache = {}
+        return [
+            self._query_snapshot(
+                snapshot,
+                mask_cache,
+                request.get('filters', []),
+                request.get('sort_by'),
+                request.get('sort_order', 'asc'),
+                request.get('page', 1),
+                request.get('page_size'),
+            )
+            for request in requests
+        ]
+
+    def query_with_facets(self, filters: List[FilterData],
+                          sort_by: str = None, sort_order: str = 'asc',
+                          page: int = 1, page_size: int | None = None):
+        """
+        query() and facets() for the same request from a single evaluation
+        of the filters: (stocks, total, facets), or None to use the database.
+        """
+        snapshot = self.snapshot()
+        indices = self._sorted_matches(snapshot, None, filters, sort_by, sort_order)
+        if indices is None:
+            return None
+        stocks, total = self._page(snapshot, indices, page, page_size)
+        return stocks, total, self._facet_counts(snapshot, indices)
+
+    def _query_snapshot(self, snapshot: _Snapshot, mask_cache: Optional[dict],
+                        filters, sort_by, sort_order, page, page_size):
+        indices = self._sorted_matches(snapshot, mask_cache, filters, sort_by, sort_order)
+        if indices is None:
+            return None
+        return self._page(snapshot, indices, page, page_size)
+
+    def _sorted_matches(self, snapshot: _Snapshot, mask_cache: Optional[dict],
+                        filters, sort_by, sort_order='asc') -> Optional[np.ndarray]:
+        try:
+            indices = self.matching_indices(snapshot, filters, mask_cache)
+            return self.sort_indices(snapshot, indices, sort_by, sort_order)
+        except (UnsupportedQuery, ValueError, TypeError, re.error) as e:
+            logger.info(f"Screener engine falling back to database: {e}")
+            return None
+
+    def _page(self, snapshot: _Snapshot, indices: np.ndarray, page, page_size):
+        total = len(indices)
+        if page_size:
+            offset = (max(page, 1) - 1) * page_size
+            indices = indices[offset: offset + page_size]
+        return list(snapshot.stocks[indices]), total
+
+    def facets(self, filters: List[FilterData], sort_by: str = None) -> Optional[dict]:
+        """Screener.facets from the snapshot, or None to use the database."""
+        snapshot = self.snapshot()
+        indices = self._sorted_matches(snapshot, None, filters, sort_by)
+        if indices is None:
+            return None
+        return self._facet_counts(snapshot, indices)
+
+    def _facet_counts(self, snapshot: _Snapshot, indices: np.ndarray) -> dict:
+        result = {}
+        for field in FACET_CATEGORIES:
+            column = snapshot.strings[field]
+            codes = column.codes[indices]
+            counts = np.bincount(codes[codes >= 0], minlength=len(column.categories))
+            present = np.flatnonzero(counts)
+            result[field] = category_facet(
+                zip(column.categories[present], counts[present])
+            )
+
+        for operand in FACET_HISTOGRAMS:
+            field_name = FILTER_FIELD_MAPPING.get(operand, operand)
+            values = snapshot.numeric[field_name][indices]
+            values = values[~np.isnan(values)]
+            bounds = histogram_bounds(operand)
+            interior = [high for _, high in bounds[:-1]]
+            buckets = np.searchsorted(interior, values, side='right')
+            result[operand] = histogram_facet(
+                operand, np.bincount(buckets, minlength=len(bounds))
+            )
+        return result
+
+    def matching_indices(self, snapshot: _Snapshot, filters: List[FilterData],
+                         mask_cache: Optional[dict] = None) -> np.ndarray:
+        """
+        Row indices matching ``filters`` with Screener.query grouping rules.
+        Groups on bitmap-indexed columns are combined first as packed
+        bitsets; if they already exclude every row the remaining filters
+        are skipped. Pass the same ``mask_cache`` dict across calls on one
+        snapshot to evaluate each distinct predicate only once.
+        """
+        grouped_filters = {}
+        for filter_data in filters:
+            grouped_filters.setdefault(filter_data.operand, []).append(filter_data)
+
+        bits = None
+        row_groups = []
+        for filter_list in grouped_filters.values():
+            if not all(self._has_bitmap(snapshot, f) for f in filter_list):
+                row_groups.append(filter_list)
+                continue
+            group_bits = self._combine_group(
+                filter_list,
+                [self._cached(mask_cache, 'bits', snapshot, f, self.filter_bits)
+                 for f in filter_list],
+                np.bitwise_and,
+                np.bitwise_or,
+            )
+            if group_bits is not None:
+                bits = group_bits if bits is None else bits & group_bits
+
+        if bits is not None:
+            mask = np.unpackbits(bits, count=snapshot.size).astype(bool)
+            if not mask.any():
+                return np.flatnonzero(mask)
+        else:
+            mask = np.ones(snapshot.size, dtype=bool)
+
+        for filter_list in row_groups:
+            group_mask = self._combine_group(
+                filter_list,
+                [self._cached(mask_cache, 'mask', snapshot, f, self.filter_mask)
+                 for f in filter_list],
+                np.logical_and,
+                np.logical_or,
+            )
+            if group_mask is not None:
+                mask &= group_mask
+        return np.flatnonzero(mask)
+
+    def _combine_group(self, filter_list: List[FilterData], parts, and_op, or_op):
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return None
+        all_numeric = all(
+            getattr(f, 'filter_type', None) == 'numeric' for f in filter_list
+        )
+        if len(filter_list) == 1 or all_numeric:
+            return and_op.reduce(parts)
+        return or_op.reduce(parts)
+
+    def _cached(self, mask_cache: Optional[dict], kind: str, snapshot: _Snapshot,
+                filter_data: FilterData, compute):
+        if mask_cache is None:
+            return compute(snapshot, filter_data)
+        key = json.dumps(
+            [kind, filter_data.operand, filter_data.operator,
+             filter_data.filter_type, filter_data.value],
+            default=str,
+        )
+        if key not in mask_cache:
+            mask_cache[key] = compute(snapshot, filter_data)
+        return mask_cache[key]
+
+    def _has_bitmap(self, snapshot: _Snapshot, filter_data: FilterData) -> bool:
+        field_name = FILTER_FIELD_MAPPING.get(filter_data.operand, filter_data.operand)
+        column = snapshot.strings.get(field_name)
+        return column is not None and column.bitmaps is not None
+
+    def filter_bits(self, snapshot: _Snapshot, filter_data: FilterData) -> Optional[np.ndarray]:
+        """Packed-bitset counterpart of filter_mask for bitmap-indexed columns."""
+        operand = filter_data.operand
+        column = snapshot.strings[FILTER_FIELD_MAPPING.get(operand, operand)]
+        categories = self._string_categories(
+            column,
+            filter_data.operator,
+            filter_data.filter_type,
+            scale_filter_value(operand, filter_data.value),
+        )
+        return None if categories is None else column.bits_from_categories(categories)
+
+    def filter_mask(self, snapshot: _Snapshot, filter_data: FilterData) -> Optional[np.ndarray]:
+        """
+        Boolean mask for a single filter, mirroring Screener._build_q_object.
+        Returns None for operators the database path also ignores.
+        """
+        operand = filter_data.operand
+        operator = filter_data.operator
+        field_name = FILTER_FIELD_MAPPING.get(operand, operand)
+        value = scale_filter_value(operand, filter_data.value)
+
+        if field_name in snapshot.numeric:
+            return self._numeric_mask(
+                snapshot.numeric[field_name], operator, filter_data.filter_type, value
+            )
+        if field_name in snapshot.strings:
+            return self._string_mask(
+                snapshot.strings[field_name], operator, filter_data.filter_type, value
+            )
+        raise UnsupportedQuery(f"field {field_name!r} is not loaded")
+
+    def _numeric_mask(self, column: np.ndarray, operator, filter_type, value):
+        if operator == 'equals':
+            if filter_type in ['categoric', 'string']:
+                raise UnsupportedQuery("iexact on a numeric column")
+            if value is None:
+                return np.isnan(column)
+            return column == float(value)
+
+        comparisons = {
+            'greater_than': np.greater,
+            'less_than': np.less,
+            'greater_than_or_equal': np.greater_equal,
+            'less_than_or_equal': np.less_equal,
+        }
+        if operator in comparisons:
+            if value is None:
+                raise UnsupportedQuery("comparison against None")
+            return comparisons[operator](column, float(value))
+
+        if operator == 'contains':
+            raise UnsupportedQuery("contains on a numeric column")
+        return None
+
+    def _string_mask(self, column: _StringColumn, operator, filter_type, value):
+        categories = self._string_categories(column, operator, filter_type, value)
+        return None if categories is None else column.mask_from_categories(categories)
+
+    def _string_categories(self, column: _StringColumn, operator, filter_type, value):
+        """Boolean mask over the column's categories plus the NULL slot."""
+        if operator == 'equals':
+            if value is None:
+                return np.append(np.zeros(len(column.categories), dtype=bool), True)
+            if filter_type in ['categoric', 'string']:
+                matches = column.lowered == str(value).lower()
+            else:
+                matches = column.categories == str(value)
+            return np.append(matches, False)
+
+        if operator == 'contains':
+            if value is None:
+                raise UnsupportedQuery("contains with None")
+            # The same LIKE pattern the database path sends to ILIKE.
+            pattern = like_regex(screener_contains_pattern(str(value)))
+            matches = [pattern.fullmatch(c) is not None for c in column.categories]
+            return np.append(np.array(matches, dtype=bool), False)
+
+        if operator in {
+            'greater_than',
+            'less_than',
+            'greater_than_or_equal',
+            'less_than_or_equal',
+        }:
+            raise UnsupportedQuery("range comparison on a string column")
+        return None
+
+    def sort_indices(self, snapshot: _Snapshot, indices: np.ndarray,
+                     sort_by: str = None, sort_order: str = 'asc') -> np.ndarray:
+        """Order ``indices`` like the database path, with symbol as tiebreaker."""
+        sort_by = SORT_FIELD_MAPPING.get(sort_by, sort_by)
+        tiebreak = snapshot.symbol_rank[indices]
+        if not sort_by:
+            return indices[np.argsort(tiebreak, kind='stable')]
+
+        if sort_by in snapshot.numeric:
+            keys = snapshot.numeric[sort_by][indices]
+            present = ~np.isnan(keys)
+        elif sort_by in snapshot.strings:
+            column = snapshot.strings[sort_by]
+            codes = column.codes[indices]
+            present = codes >= 0
+            keys = np.where(present, column.ranks[codes], 0)
+        else:
+            raise UnsupportedQuery(f"sort field {sort_by!r} is not loaded")
+
+        indices, keys, tiebreak = indices[present], keys[present], tiebreak[present]
+        if sort_order != 'asc':
+            keys = -keys
+        return indices[np.lexsort((tiebreak, keys))]
+
+
+_engine: Optional[ColumnarScreenerEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_screener_engine() -> Optional[ColumnarScreenerEngine]:
+    """
+    Process-wide engine when ``SCREENER_ENGINE = 'columnar'``, else None so
+    Screener keeps querying the database.
+    """
+    global _engine
+    if getattr(settings, 'SCREENER_ENGINE', 'database') != 'columnar':
+        return None
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ColumnarScreenerEngine(
+                    max_age_seconds=getattr(
+                        settings,
+                        'SCREENER_ENGINE_MAX_AGE_SECONDS',
+                        DEFAULT_MAX_AGE_SECONDS,
+                    )
+                )
+    return _engine
+
+
+def invalidate_screener_engine(**kwargs):
+    """Signal-friendly hook: drop the current snapshot after a data update."""
+    if _engine is not None:
+        _engine.invalidate()
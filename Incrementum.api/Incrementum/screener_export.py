@@ -0,0 +1,44 @@
+"""
+Streaming serializers for full screener exports.
+
+Each generator consumes an iterator of StockModel rows and yields encoded
+lines one at a time, so a StreamingHttpResponse can send an arbitrarily
+large result set while holding only one database chunk in memory.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from Incrementum.models.stock import STOCK_DICT_FIELDS
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_ndjson(stocks, fields=None):
+    for stock in stocks:
+        yield json.dumps(stock.to_dict(fields), cls=DjangoJSONEncoder) + "\n"
+
+
+def stream_csv(stocks, fields=None):
+    fieldnames = list(fields or STOCK_DICT_FIELDS)
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for stock in stocks:
+        yield writer.writerow(stock.to_dict(fields))
+
+
+EXPORT_STREAMS = {
+    'ndjson': stream_ndjson,
+    'csv': stream_csv,
+}
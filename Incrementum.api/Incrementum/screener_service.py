@@ -202,6 +202,9 @@ class ScreenerService:
                     })
 
             custom_screener.filters = filters_to_store
+            # The stored results keep answering reads until the scheduled
+            # evaluate_saved_screeners --stale run replaces them.
+            custom_screener.results_stale = True
             custom_screener.save()
 
         logging.info(f"Updated custom screener {screener_id} for user {user_id}")
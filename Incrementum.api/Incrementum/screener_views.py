@@ -1,13 +1,18 @@
-from Incrementum.models.stock import StockModel
+from Incrementum.models.stock import StockModel, parse_stock_fields
 from django.db.models import Q, Case, When, Value, IntegerField
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.core import signing
 from django.core.exceptions import PermissionDenied
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from Incrementum.screener_service import ScreenerService
-from Incrementum.screener import Screener
+from Incrementum.screener import COUNT_MODES, SORT_FIELDS, Screener
+from Incrementum.screener_cache import get_screener_result_cache
+from Incrementum.screener_export import EXPORT_CONTENT_TYPES, EXPORT_STREAMS
+from Incrementum.screener_engine import get_screener_engine
+from Incrementum.services.saved_screener_service import get_saved_screener_results
 from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.lookups import contains_pattern, prefix_pattern
 from Incrementum.models.custom_screener import CustomScreener
 from Incrementum.models.account import Account
 import json
@@ -124,6 +129,66 @@ def get_shared_custom_screener(request, token):
     return JsonResponse(screener, status=200)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def get_custom_screener_results(request, screener_id):
+    """
+    Stocks matching a saved screener, read from its precomputed result set
+    (see evaluate_saved_screeners), optionally ordered by a stored sort key
+    (``sort_by``/``sort_order``). ``as_of`` is when that set was computed,
+    or null while the screener is waiting for its first evaluation;
+    ``stale`` is true while a filter change is waiting to be evaluated.
+    Private screeners are only visible to their owner.
+    """
+    api_key = (get_user_from_request(request) or "").strip() or None
+    try:
+        screener = CustomScreener.objects.select_related('account').get(id=screener_id)
+    except CustomScreener.DoesNotExist:
+        return JsonResponse({"error": "Screener not found"}, status=404)
+    if screener.is_private and screener.account.api_key != api_key:
+        return JsonResponse({"error": "Screener not found"}, status=404)
+
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+        per_page = max(1, min(500, int(request.GET.get('per_page', 25))))
+    except (ValueError, TypeError):
+        return JsonResponse({"error": "page and per_page must be integers"}, status=400)
+
+    sort_order = request.GET.get('sort_order', 'asc')
+    if sort_order not in ('asc', 'desc'):
+        return JsonResponse({"error": "sort_order must be 'asc' or 'desc'"}, status=400)
+    try:
+        result = get_saved_screener_results(
+            screener,
+            page=page,
+            page_size=per_page,
+            sort_by=request.GET.get('sort_by') or None,
+            sort_order=sort_order,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    total_count = result['total_count']
+    stocks_dict = [stock.to_dict() for stock in result['stocks']]
+
+    return JsonResponse(
+        {
+            "stocks": stocks_dict,
+            "count": len(stocks_dict),
+            "as_of": result['as_of'].isoformat() if result['as_of'] else None,
+            "stale": result['stale'],
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total_count": total_count,
+                "total_pages": (total_count + per_page - 1) // per_page,
+                "has_next": result['has_next'],
+                "has_prev": page > 1
+            }
+        },
+        status=200
+    )
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def list_custom_screeners(request):
@@ -215,13 +280,49 @@ def update_screener_privacy(request, screener_id):
     }, status=200)
 
 
+def parse_filters(filters_payload):
+    """Build FilterData objects from a request's filter list, or raise ValueError."""
+    if not isinstance(filters_payload, list):
+        raise ValueError("filters must be a list")
+
+    filters = []
+    for index, item in enumerate(filters_payload):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item at index {index} is not an object")
+
+        required_keys = {"operator", "operand", "filter_type"}
+        missing = required_keys - item.keys()
+        if missing:
+            raise ValueError(f"Item {index} missing keys: {sorted(missing)}")
+
+        operator = item.get("operator")
+        operand = item.get("operand")
+        filter_type = item.get("filter_type")
+        value = item.get("value")
+
+        filters.append(FilterData(operator, operand, filter_type, value))
+    return filters
+
+
+def parse_flag(value) -> bool:
+    """A boolean option from JSON (true/1) or a query string ("true"/"1"/"yes")."""
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return value is True or (isinstance(value, int) and value == 1)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def run_database_screener(request):
     """
     Run screener using database queries with the new Screener class.
     Accepts a list of FilterData objects and returns matching stocks from the database.
-    Supports pagination with page and per_page parameters.
+    Supports pagination with page and per_page parameters (count_mode picks
+    how total_count is produced: exact, estimated, cached or none), or keyset
+    pagination when a ``cursor`` key is sent (null/empty for the first page):
+    the response then carries next_cursor/prev_cursor instead of page numbers.
+    ``fields`` (comma-separated or a list) limits each stock to those keys,
+    and ``facets`` adds category and histogram counts for the whole match set.
     Query parameters override body parameters.
     """
     try:
@@ -229,6 +330,11 @@ def run_database_screener(request):
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
 
+    cursor_mode = False
+    cursor = None
+    count_mode = 'exact'
+    fields = None
+    include_facets = False
     if isinstance(payload, list):
         filters_payload = payload
         sort_by = None
@@ -241,6 +347,12 @@ def run_database_screener(request):
         sort_order = payload.get('sort_order', 'asc')
         page = payload.get('page', 1)
         per_page = payload.get('per_page', 12)
+        count_mode = payload.get('count_mode', 'exact')
+        fields = payload.get('fields')
+        include_facets = parse_flag(payload.get('facets', False))
+        if 'cursor' in payload:
+            cursor_mode = True
+            cursor = payload.get('cursor')
     else:
         return JsonResponse({"error": "Body must be a JSON array or object"}, status=400)
 
@@ -253,6 +365,26 @@ def run_database_screener(request):
         page = request.GET.get('page', 1)
     if 'page_size' in request.GET:
         per_page = request.GET.get('page_size', 25)
+    if 'cursor' in request.GET:
+        cursor_mode = True
+        cursor = request.GET.get('cursor')
+    if 'count_mode' in request.GET:
+        count_mode = request.GET.get('count_mode')
+    if 'fields' in request.GET:
+        fields = request.GET.get('fields')
+    if 'facets' in request.GET:
+        include_facets = parse_flag(request.GET.get('facets', ''))
+
+    try:
+        fields = parse_stock_fields(fields)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if count_mode not in COUNT_MODES:
+        return JsonResponse(
+            {"error": f"count_mode must be one of {sorted(COUNT_MODES)}"},
+            status=400
+        )
 
     try:
         page = max(1, int(page))
@@ -260,57 +392,221 @@ def run_database_screener(request):
     except (ValueError, TypeError):
         return JsonResponse({"error": "page and per_page must be integers"}, status=400)
 
-    filters = []
-    for index, item in enumerate(filters_payload):
-        if not isinstance(item, dict):
-            return JsonResponse(
-                {"error": f"Item at index {index} is not an object"},
-                status=400
-            )
-
-        required_keys = {"operator", "operand", "filter_type"}
-        missing = required_keys - item.keys()
-        if missing:
-            return JsonResponse(
-                {"error": f"Item {index} missing keys: {sorted(missing)}"},
-                status=400
+    try:
+        filters = parse_filters(filters_payload)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if cursor_mode:
+        if cursor is not None and not isinstance(cursor, str):
+            return JsonResponse({"error": "cursor must be a string"}, status=400)
+        try:
+            result = Screener(fields=fields).query_keyset(
+                filters,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page_size=per_page,
+                cursor=cursor or None,
             )
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
 
-        operator = item.get("operator")
-        operand = item.get("operand")
-        filter_type = item.get("filter_type")
-        value = item.get("value")
-
-        filters.append(FilterData(operator, operand, filter_type, value))
+        stocks_dict = [stock.to_dict(fields) for stock in result['stocks']]
+        return JsonResponse(
+            {
+                "stocks": stocks_dict,
+                "count": len(stocks_dict),
+                "pagination": {
+                    "mode": "cursor",
+                    "per_page": per_page,
+                    "next_cursor": result['next_cursor'],
+                    "prev_cursor": result['prev_cursor'],
+                    "has_next": result['next_cursor'] is not None,
+                    "has_prev": result['prev_cursor'] is not None,
+                }
+            },
+            status=200
+        )
 
-    screener = Screener()
-    stocks, total_count = screener.query(
+    screener = Screener(
+        engine=get_screener_engine(),
+        result_cache=get_screener_result_cache(),
+        fields=fields,
+    )
+    result = screener.query_page(
         filters,
         sort_by=sort_by,
         sort_order=sort_order,
         page=page,
         page_size=per_page,
+        count_mode=count_mode,
+        facets=include_facets,
+    )
+
+    total_count = result['total_count']
+    total_pages = (
+        (total_count + per_page - 1) // per_page
+        if total_count is not None else None
     )
 
-    total_pages = (total_count + per_page - 1) // per_page
+    stocks_dict = [stock.to_dict(fields) for stock in result['stocks']]
+
+    response = {
+        "stocks": stocks_dict,
+        "count": len(stocks_dict),
+        "pagination": {
+            "page": page,
+            "per_page": per_page,
+            "total_count": total_count,
+            "total_pages": total_pages,
+            "count_mode": result['count_mode'],
+            "has_next": result['has_next'],
+            "has_prev": page > 1
+        }
+    }
+    if include_facets:
+        response["facets"] = result['facets']
+    return JsonResponse(response, status=200)
 
-    stocks_dict = [stock.to_dict() for stock in stocks]
 
-    return JsonResponse(
-        {
+@csrf_exempt
+@require_http_methods(["POST"])
+def export_database_screener(request):
+    """
+    Stream the complete result of a screen, unpaginated, as NDJSON (one
+    stock object per line) or CSV. Takes the same body as
+    run_database_screener; ``format`` comes from the query string or body.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    if isinstance(payload, list):
+        payload = {'filters': payload}
+    elif not isinstance(payload, dict):
+        return JsonResponse({"error": "Body must be a JSON array or object"}, status=400)
+
+    export_format = request.GET.get('format', payload.get('format', 'ndjson'))
+    if export_format not in EXPORT_STREAMS:
+        return JsonResponse(
+            {"error": f"format must be one of {sorted(EXPORT_STREAMS)}"},
+            status=400
+        )
+
+    try:
+        filters = parse_filters(payload.get('filters', []))
+        fields = parse_stock_fields(request.GET.get('fields', payload.get('fields')))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    stocks = Screener(fields=fields).iterate(
+        filters,
+        sort_by=request.GET.get('sort_by', payload.get('sort_by')),
+        sort_order=request.GET.get('sort_order', payload.get('sort_order', 'asc')),
+    )
+    response = StreamingHttpResponse(
+        EXPORT_STREAMS[export_format](stocks, fields),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="screener.{export_format}"'
+    return response
+
+
+MAX_BATCH_SCREENERS = 20
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def run_database_screener_batch(request):
+    """
+    Run several screens in one request, e.g. all panels of a dashboard.
+    Body: {"screeners": [{"name", "filters", "sort_by", "sort_order",
+    "page", "per_page"}, ...]}. Every screen is evaluated in one shared pass
+    and answered in the same order with its own page and exact total_count.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    screeners_payload = payload.get('screeners') if isinstance(payload, dict) else None
+    if not isinstance(screeners_payload, list) or not screeners_payload:
+        return JsonResponse({"error": "screeners must be a non-empty list"}, status=400)
+    try:
+        fields = parse_stock_fields(payload.get('fields'))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if len(screeners_payload) > MAX_BATCH_SCREENERS:
+        return JsonResponse(
+            {"error": f"At most {MAX_BATCH_SCREENERS} screeners per batch"},
+            status=400
+        )
+
+    names = []
+    batch = []
+    for index, item in enumerate(screeners_payload):
+        if not isinstance(item, dict):
+            return JsonResponse(
+                {"error": f"Screener at index {index} is not an object"},
+                status=400
+            )
+        try:
+            filters = parse_filters(item.get('filters', []))
+        except ValueError as e:
+            return JsonResponse({"error": f"Screener {index}: {e}"}, status=400)
+        try:
+            page = max(1, int(item.get('page', 1)))
+            per_page = max(1, min(500, int(item.get('per_page', 12))))
+        except (ValueError, TypeError):
+            return JsonResponse(
+                {"error": f"Screener {index}: page and per_page must be integers"},
+                status=400
+            )
+        sort_by = item.get('sort_by') or None
+        sort_order = item.get('sort_order', 'asc')
+        if sort_by is not None and (not isinstance(sort_by, str) or sort_by not in SORT_FIELDS):
+            return JsonResponse(
+                {"error": f"Screener {index}: sort_by must be one of {sorted(SORT_FIELDS)}"},
+                status=400
+            )
+        if sort_order not in ('asc', 'desc'):
+            return JsonResponse(
+                {"error": f"Screener {index}: sort_order must be 'asc' or 'desc'"},
+                status=400
+            )
+        names.append(item.get('name', str(index)))
+        batch.append({
+            'filters': filters,
+            'sort_by': sort_by,
+            'sort_order': sort_order,
+            'page': page,
+            'page_size': per_page,
+        })
+
+    results = Screener(engine=get_screener_engine(), fields=fields).query_batch(batch)
+
+    response = []
+    for name, request_data, result in zip(names, batch, results):
+        per_page = request_data['page_size']
+        total_count = result['total_count']
+        stocks_dict = [stock.to_dict(fields) for stock in result['stocks']]
+        response.append({
+            "name": name,
             "stocks": stocks_dict,
             "count": len(stocks_dict),
             "pagination": {
-                "page": page,
+                "page": request_data['page'],
                 "per_page": per_page,
                 "total_count": total_count,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_prev": page > 1
+                "total_pages": (total_count + per_page - 1) // per_page,
+                "count_mode": result['count_mode'],
+                "has_next": result['has_next'],
+                "has_prev": request_data['page'] > 1
             }
-        },
-        status=200
-    )
+        })
+
+    return JsonResponse({"results": response}, status=200)
 
 
 @csrf_exempt
@@ -321,13 +617,15 @@ def industry_autocomplete(request):
     if not query:
         return JsonResponse({"industries": []}, status=200)
 
+    # ILIKE patterns rather than icontains/istartswith so the trigram
+    # index on sic_description serves each keystroke.
     stocks = StockModel.objects.filter(
-        Q(sic_description__icontains=query) &
+        Q(sic_description__ilike=contains_pattern(query)) &
         Q(sic_description__isnull=False) &
         ~Q(sic_description='')
     ).annotate(
         match_rank=Case(
-            When(sic_description__istartswith=query, then=Value(0)),
+            When(sic_description__ilike=prefix_pattern(query), then=Value(0)),
             default=Value(1),
             output_field=IntegerField(),
         )
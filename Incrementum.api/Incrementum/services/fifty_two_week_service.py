@@ -0,0 +1,110 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from Incrementum.models.fifty_two_week_extrema import FiftyTwoWeekExtrema
+from Incrementum.models.stock_history import StockHistory
+
+WINDOW = timedelta(weeks=52)
+
+# One GROUP BY over the window for every expired symbol, upserted in the
+# same statement. The bar time of each extreme is the newest bar at that
+# price, so a recomputed extreme stays valid for as long as possible.
+# Unqualified table names resolve through the connection's search_path.
+# The outer WHERE lets SQLite tell ON CONFLICT apart from a join constraint.
+RECOMPUTE_SQL = """
+    INSERT INTO fifty_two_week_extrema (stock_symbol, high, high_at, low, low_at)
+    SELECT w.stock_symbol,
+        w.high,
+        (SELECT MAX(h.day_and_time) FROM stock_history h
+         WHERE h.stock_symbol = w.stock_symbol
+           AND h.day_and_time >= %s AND h.high = w.high),
+        w.low,
+        (SELECT MAX(l.day_and_time) FROM stock_history l
+         WHERE l.stock_symbol = w.stock_symbol
+           AND l.day_and_time >= %s AND l.low = w.low)
+    FROM (
+        SELECT stock_symbol, MAX(high) AS high, MIN(low) AS low
+        FROM stock_history
+        WHERE day_and_time >= %s
+          AND stock_symbol IN (
+              SELECT stock_symbol FROM fifty_two_week_extrema
+              WHERE (high_at < %s OR low_at < %s){symbol_filter}
+          )
+        GROUP BY stock_symbol
+    ) w
+    WHERE true
+    ON CONFLICT (stock_symbol) DO UPDATE SET
+        high = EXCLUDED.high,
+        high_at = EXCLUDED.high_at,
+        low = EXCLUDED.low,
+        low_at = EXCLUDED.low_at
+"""
+
+
+class FiftyTwoWeekService:
+    @staticmethod
+    def extrema(symbols, now=None):
+        """
+        {symbol: FiftyTwoWeekExtrema} for ``symbols`` with history inside the
+        trailing 52 weeks. Rows whose high or low has aged out of the window
+        are recomputed together and re-read; everything else is read as stored.
+        A symbol without a row has no bar inside the window (the insert
+        trigger creates the row for any bar that lands in it) and needs no
+        recompute.
+        """
+        now = now or timezone.now()
+        cutoff = now - WINDOW
+        rows = {
+            row.stock_symbol_id: row
+            for row in FiftyTwoWeekExtrema.objects.filter(stock_symbol__in=symbols)
+        }
+        expired = [
+            symbol for symbol, row in rows.items()
+            if row.high_at < cutoff or row.low_at < cutoff
+        ]
+        if expired:
+            FiftyTwoWeekService.recompute_expired(now, expired)
+            for symbol in expired:
+                rows.pop(symbol)
+            rows.update(
+                (row.stock_symbol_id, row)
+                for row in FiftyTwoWeekExtrema.objects.filter(stock_symbol__in=expired)
+            )
+        return rows
+
+    @staticmethod
+    def recompute_expired(now=None, symbols=None):
+        """
+        Rebuild every row (optionally limited to ``symbols``) with an extreme
+        older than 52 weeks: one grouped upsert for the symbols that still
+        have bars in the window and one delete for those that do not.
+        Returns the number of rows updated or removed.
+        """
+        cutoff = (now or timezone.now()) - WINDOW
+        # Raw parameters compare against the naive-UTC day_and_time column.
+        naive_cutoff = timezone.make_naive(cutoff, dt_timezone.utc)
+        expired = FiftyTwoWeekExtrema.objects.filter(Q(high_at__lt=cutoff) | Q(low_at__lt=cutoff))
+        symbol_filter = ''
+        params = [naive_cutoff] * 5
+        if symbols is not None:
+            expired = expired.filter(stock_symbol__in=symbols)
+            symbol_filter = ' AND stock_symbol IN ({})'.format(', '.join(['%s'] * len(symbols)))
+            params.extend(symbols)
+
+        deleted, _ = expired.exclude(
+            Exists(StockHistory.objects.filter(
+                stock_symbol=OuterRef('stock_symbol'), day_and_time__gte=cutoff
+            ))
+        ).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(RECOMPUTE_SQL.format(symbol_filter=symbol_filter), params)
+            updated = max(cursor.rowcount, 0)
+        return deleted + updated
+
+    @staticmethod
+    def refresh_expired(now=None):
+        """Recompute every row with an extreme older than 52 weeks."""
+        return FiftyTwoWeekService.recompute_expired(now)
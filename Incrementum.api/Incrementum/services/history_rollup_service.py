@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import connection
+
+# Intervals with a maintained rollup, finest first.
+ROLLUP_INTERVALS = ('5m', '15m', '30m', '1h', '1d', '1wk')
+
+# Raw bar sources each interval is built from, in the order history() tries
+# them: daily and weekly charts prefer hourly bars, falling back to minute.
+ROLLUP_SOURCES = {
+    '5m': (False,),
+    '15m': (False,),
+    '30m': (False,),
+    '1h': (False,),
+    '1d': (True, False),
+    '1wk': (True, False),
+}
+
+# How far a bucket starts before its label. 1wk buckets are labelled with the
+# Sunday that ends the week (as pandas' 'W' resample does), so a week that is
+# still in progress has a label after today.
+ROLLUP_LABEL_OFFSETS = {
+    '1wk': timedelta(days=6),
+}
+
+
+class HistoryRollupService:
+    @staticmethod
+    def rebuild(symbols=None):
+        """
+        Recompute stock_history_rollup from stock_history (PostgreSQL). The
+        insert, update and delete triggers keep rollups current as bars
+        change; this covers backfills loaded with the triggers disabled.
+        Returns the number of rollup rows written.
+        """
+        sources = ", ".join(
+            f"('{interval}', {str(is_hourly).lower()})"
+            for interval, hourly_sources in ROLLUP_SOURCES.items()
+            for is_hourly in hourly_sources
+        )
+        where = ""
+        params = []
+        if symbols:
+            where = "WHERE b.stock_symbol = ANY(%s)"
+            params.append(list(symbols))
+        delete = "DELETE FROM stock_history_rollup"
+        if symbols:
+            delete += " WHERE stock_symbol = ANY(%s)"
+        query = f"""
+            INSERT INTO stock_history_rollup (
+                stock_symbol, bucket_interval, is_hourly, bucket,
+                open_price, open_at, close_price, close_at, high, low, volume
+            )
+            SELECT
+                b.stock_symbol, i.bucket_interval, b.is_hourly,
+                stock_history_bucket(i.bucket_interval, b.day_and_time),
+                (array_agg(b.open_price ORDER BY b.day_and_time))[1], min(b.day_and_time),
+                (array_agg(b.close_price ORDER BY b.day_and_time DESC))[1], max(b.day_and_time),
+                max(b.high), min(b.low), sum(b.volume)
+            FROM stock_history b
+            JOIN (VALUES {sources}) AS i(bucket_interval, is_hourly)
+                ON i.is_hourly = b.is_hourly
+            {where}
+            GROUP BY 1, 2, 3, 4
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(delete, params)
+            cursor.execute(query, params)
+            return cursor.rowcount
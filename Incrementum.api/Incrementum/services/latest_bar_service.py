@@ -0,0 +1,37 @@
+from django.db import connection
+
+
+class LatestBarService:
+    @staticmethod
+    def refresh(symbols=None):
+        """
+        Rebuild latest_bar rows from stock_history. The insert, update and
+        delete triggers keep the table current as bars change; this covers
+        backfills and databases created before the triggers existed.
+        Returns the number of rows written.
+        """
+        query = """
+            INSERT INTO latest_bar AS lb (
+                stock_symbol, day_and_time, open_price, close_price, high, low, volume
+            )
+            SELECT DISTINCT ON (stock_symbol)
+                stock_symbol, day_and_time, open_price, close_price, high, low, volume
+            FROM stock_history
+        """
+        params = []
+        if symbols:
+            query += " WHERE stock_symbol = ANY(%s)"
+            params.append(list(symbols))
+        query += """
+            ORDER BY stock_symbol, day_and_time DESC
+            ON CONFLICT (stock_symbol) DO UPDATE SET
+                day_and_time = EXCLUDED.day_and_time,
+                open_price = EXCLUDED.open_price,
+                close_price = EXCLUDED.close_price,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                volume = EXCLUDED.volume
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.rowcount
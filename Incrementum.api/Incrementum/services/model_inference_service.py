@@ -81,25 +81,23 @@ class ModelInferenceService:
         """
         ticker_upper = ticker.upper()
 
-        # Fetch 24 hourly records
-        df = self.history_service.get_db_history(
+        # Fetch only the most recent lookback (24) hourly records
+        lookback = self.metadata.get('lookback', 24)
+        df = self.history_service.get_last_bars(
             ticker_upper,
+            lookback,
             is_hourly=True
         )
 
         if df is None or df.empty:
             raise ValueError(f"No data available for {ticker}")
 
-        # Ensure we have exactly 24 records (lookback)
-        lookback = self.metadata.get('lookback', 24)
+        # Ensure we have exactly lookback records
         if len(df) < lookback:
             raise ValueError(
                 f"Insufficient data for {ticker}: got {len(df)} records, need {lookback}"
             )
 
-        # Use the most recent lookback records
-        df = df.tail(lookback).reset_index(drop=True)
-
         try:
             # Prepare inputs
             feature_input = self._prepare_features(df)
@@ -0,0 +1,113 @@
+from datetime import timezone as dt_timezone
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from Incrementum.models.daily_close import DailyClose
+from Incrementum.models.fifty_two_week_extrema import FiftyTwoWeekExtrema
+from Incrementum.models.stock import StockModel
+from Incrementum.services.fifty_two_week_service import WINDOW, FiftyTwoWeekService
+
+
+def _cents_to_dollars(value):
+    return value / 100 if value else None
+
+
+def _related(stock, name):
+    try:
+        return getattr(stock, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+class QuoteService:
+    """
+    Quote snapshots (price, day OHLC, previous close, change and 52-week
+    range) read in a single query: the stock row joined to its latest_bar
+    and fifty_two_week_extrema rows, with the most recent daily_close row
+    pulled in as correlated subqueries on its primary key.
+    """
+
+    @staticmethod
+    def annotate(queryset):
+        """Attach everything quote() needs to ``queryset`` without extra queries."""
+        last_close = DailyClose.objects.filter(
+            stock_symbol=OuterRef('symbol')
+        ).order_by('-trading_date')
+        return queryset.select_related('latest_bar', 'fifty_two_week').annotate(
+            session_date=Subquery(last_close.values('trading_date')[:1]),
+            session_close=Subquery(last_close.values('close_price')[:1]),
+            session_prev_close=Subquery(last_close.values('prev_close')[:1]),
+        )
+
+    @staticmethod
+    def quotes(symbols):
+        """{symbol: quote dict} for the given symbols, in one query."""
+        stocks = list(QuoteService.annotate(StockModel.objects.filter(symbol__in=symbols)))
+        QuoteService.refresh_expired_ranges(stocks)
+        return {stock.symbol: QuoteService.quote(stock) for stock in stocks}
+
+    @staticmethod
+    def quote(stock):
+        """
+        Quote dict (dollars) for a stock loaded through annotate(). The
+        previous close is the last session close before the latest bar's
+        date, so the change is measured against the prior session.
+        """
+        bar = _related(stock, 'latest_bar')
+        extrema = _related(stock, 'fifty_two_week')
+
+        previous_close = None
+        session_date = getattr(stock, 'session_date', None)
+        if bar is not None and session_date is not None:
+            bar_date = bar.day_and_time
+            if timezone.is_aware(bar_date):
+                bar_date = bar_date.astimezone(dt_timezone.utc)
+            if session_date >= bar_date.date():
+                previous_close = stock.session_prev_close
+            else:
+                previous_close = stock.session_close
+
+        current_price = _cents_to_dollars(bar.close_price) if bar else None
+        previous_close = _cents_to_dollars(previous_close)
+        change = None
+        change_percent = None
+        if current_price is not None and previous_close:
+            change = current_price - previous_close
+            change_percent = change / previous_close * 100
+
+        return {
+            'currentPrice': current_price,
+            'open': _cents_to_dollars(bar.open_price) if bar else None,
+            'high': _cents_to_dollars(bar.high) if bar else None,
+            'low': _cents_to_dollars(bar.low) if bar else None,
+            'previousClose': previous_close,
+            'change': change,
+            'changePercent': change_percent,
+            'high52Week': _cents_to_dollars(extrema.high) if extrema else None,
+            'low52Week': _cents_to_dollars(extrema.low) if extrema else None,
+        }
+
+    @staticmethod
+    def refresh_expired_ranges(stocks):
+        """
+        Recompute 52-week rows whose extreme has aged out of the window,
+        for all of ``stocks`` in one grouped upsert plus one re-read.
+        """
+        now = timezone.now()
+        cutoff = now - WINDOW
+        expired = {
+            stock.symbol: stock for stock in stocks
+            if (extrema := _related(stock, 'fifty_two_week')) is not None
+            and (extrema.high_at < cutoff or extrema.low_at < cutoff)
+        }
+        if not expired:
+            return
+        FiftyTwoWeekService.recompute_expired(now, list(expired))
+        refreshed = {
+            row.stock_symbol_id: row
+            for row in FiftyTwoWeekExtrema.objects.filter(stock_symbol__in=list(expired))
+        }
+        for symbol, stock in expired.items():
+            stock.fifty_two_week = refreshed.get(symbol)
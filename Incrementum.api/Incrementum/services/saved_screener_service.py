@@ -0,0 +1,181 @@
+import logging
+import re
+from typing import Iterable, List
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.custom_screener import CustomScreener
+from Incrementum.models.custom_screener_result import CustomScreenerResult
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine, UnsupportedQuery
+
+logger = logging.getLogger(__name__)
+
+
+def saved_filters_to_filter_data(filters: Iterable[dict]) -> List[FilterData]:
+    """
+    Translate CustomScreener.filters rows into the FilterData list the
+    screener runs. Range rows (value_low/value_high) become a pair of
+    inclusive bounds on the same operand.
+    """
+    result = []
+    for f in filters or []:
+        operand = f.get('operand')
+        if not operand:
+            continue
+        filter_type = 'categoric' if f.get('filter_type') == 'categorical' else f.get('filter_type')
+        value_low = f.get('value_low')
+        value_high = f.get('value_high')
+        if value_low is not None or value_high is not None:
+            if value_low is not None:
+                result.append(
+                    FilterData('greater_than_or_equal', operand, filter_type, value_low)
+                )
+            if value_high is not None:
+                result.append(
+                    FilterData('less_than_or_equal', operand, filter_type, value_high)
+                )
+            continue
+        result.append(FilterData(f.get('operator'), operand, filter_type, f.get('value')))
+    return result
+
+
+# Sort keys stored on each CustomScreenerResult row, by the names the
+# screener endpoints accept (see SORT_FIELD_MAPPING) and the row field.
+SAVED_SORT_FIELDS = {
+    'symbol': 'stock_symbol',
+    'market_cap': 'market_cap',
+    'price': 'price',
+    'pps': 'price',
+    'percent_change': 'day_percent_change',
+    'dayPercentChange': 'day_percent_change',
+    'day_percent_change': 'day_percent_change',
+    'volume': 'volume',
+}
+
+
+def _engine_row(stock) -> tuple:
+    """(symbol, market_cap, price, day_percent_change, volume) of a snapshot stock."""
+    return (
+        stock.symbol,
+        stock.market_cap,
+        stock.effective_price,
+        stock.day_percent_change,
+        stock.latest_volume,
+    )
+
+
+class SavedScreenerEvaluator:
+    """
+    Evaluates saved screeners in bulk and stores their matches, with the
+    sort keys the screener endpoints offer, in custom_screener_result. All
+    screeners share one columnar snapshot and each distinct predicate is
+    evaluated once across the batch; screeners the engine cannot serve fall
+    back to a database query.
+
+    Runs after each data refresh (``bump_data_generation``) and, for
+    screeners whose filters were saved since, from the scheduled
+    ``evaluate_saved_screeners --stale``; never from a request.
+    """
+
+    def __init__(self, engine: ColumnarScreenerEngine = None):
+        self.engine = engine
+
+    def evaluate_all(self, screeners=None) -> int:
+        """Re-evaluate ``screeners`` (default: all). Returns how many were written."""
+        if screeners is None:
+            screeners = CustomScreener.objects.all()
+        # Clear the stale flags before the filters are read, so a screener
+        # edited while this runs stays stale for the next run.
+        ids = list(screeners.values_list('id', flat=True))
+        CustomScreener.objects.filter(id__in=ids).update(results_stale=False)
+        screeners = CustomScreener.objects.filter(id__in=ids)
+        engine = self.engine or ColumnarScreenerEngine(max_age_seconds=None)
+        snapshot = engine.snapshot()
+        mask_cache = {}
+        count = 0
+        for screener in screeners:
+            filters = saved_filters_to_filter_data(screener.filters)
+            try:
+                indices = engine.matching_indices(snapshot, filters, mask_cache)
+                indices = engine.sort_indices(snapshot, indices)
+                rows = [_engine_row(stock) for stock in snapshot.stocks[indices]]
+            except (UnsupportedQuery, ValueError, TypeError, re.error) as e:
+                logger.info(f"Saved screener {screener.id} evaluated in the database: {e}")
+                rows = self._query_rows(filters)
+            self._store(screener, rows)
+            count += 1
+        logger.info(f"Evaluated {count} saved screeners")
+        return count
+
+    def _query_rows(self, filters: List[FilterData]) -> List[tuple]:
+        return list(
+            Screener().build_queryset(filters)
+            .annotate(
+                saved_price=Coalesce('price', 'latest_bar__close_price'),
+                saved_volume=F('latest_bar__volume'),
+            )
+            .values_list(
+                'symbol', 'market_cap', 'saved_price', 'day_percent_change', 'saved_volume'
+            )
+        )
+
+    def _store(self, screener: CustomScreener, rows: List[tuple]):
+        with transaction.atomic():
+            CustomScreenerResult.objects.filter(custom_screener=screener).delete()
+            CustomScreenerResult.objects.bulk_create(
+                CustomScreenerResult(
+                    custom_screener=screener,
+                    stock_symbol_id=symbol,
+                    position=position,
+                    market_cap=market_cap,
+                    price=price,
+                    day_percent_change=day_percent_change,
+                    volume=volume,
+                )
+                for position, (symbol, market_cap, price, day_percent_change, volume)
+                in enumerate(rows)
+            )
+            screener.results_as_of = timezone.now()
+            CustomScreener.objects.filter(id=screener.id).update(
+                results_as_of=screener.results_as_of
+            )
+
+
+def get_saved_screener_results(screener: CustomScreener, page: int = 1,
+                               page_size: int = 25, sort_by: str = None,
+                               sort_order: str = 'asc') -> dict:
+    """
+    Page of a saved screener's precomputed matches, in the default order or
+    by one of SAVED_SORT_FIELDS (rows without that key sort last). Read
+    only: a screener that has not been evaluated yet returns no rows and a
+    None ``as_of``; after a filter change the previous rows are returned,
+    with their ``as_of`` and ``stale`` set, until the next evaluation.
+    """
+    if sort_by is not None and sort_by not in SAVED_SORT_FIELDS:
+        raise ValueError(f"sort_by must be one of {sorted(SAVED_SORT_FIELDS)}")
+
+    results = CustomScreenerResult.objects.filter(custom_screener=screener)
+    if sort_by is None:
+        ordering = ['position']
+    else:
+        key = F(SAVED_SORT_FIELDS[sort_by])
+        key = key.asc(nulls_last=True) if sort_order == 'asc' else key.desc(nulls_last=True)
+        ordering = [key, 'stock_symbol']
+    offset = (max(page, 1) - 1) * page_size
+    rows = (
+        results.select_related('stock_symbol')
+        .order_by(*ordering)[offset: offset + page_size]
+    )
+    total = results.count()
+    return {
+        'stocks': [row.stock_symbol for row in rows],
+        'total_count': total,
+        'has_next': offset + page_size < total,
+        'as_of': screener.results_as_of,
+        'stale': screener.results_stale,
+    }
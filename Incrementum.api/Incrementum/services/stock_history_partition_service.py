@@ -0,0 +1,109 @@
+import re
+from datetime import date
+
+from django.db import connection
+from django.utils import timezone
+
+PARTITION_NAME = re.compile(r'^stock_history_(\d{4})_(\d{2})$')
+
+
+def partition_name(month: date) -> str:
+    return f'stock_history_{month.year:04d}_{month.month:02d}'
+
+
+def partition_month(name: str):
+    """First day of the month a stock_history_YYYY_MM partition covers, or None."""
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class StockHistoryPartitionService:
+    """
+    Monthly range partitions of stock_history (PostgreSQL). Partitions are
+    named stock_history_YYYY_MM; rows outside every month land in
+    stock_history_default.
+    """
+
+    @staticmethod
+    def partitions():
+        """Names of the monthly partitions currently attached, oldest first."""
+        query = """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'stock_history'
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+            names = [row[0] for row in cursor.fetchall()]
+        return sorted(name for name in names if partition_month(name))
+
+    @staticmethod
+    def ensure(months_ahead=2, today=None, since=None):
+        """
+        Create partitions from this month (or from ``since``, for backfills)
+        through ``months_ahead`` months out, plus one for every month with
+        rows stranded in stock_history_default; creating a partition moves
+        its month's rows out of the default one.
+        """
+        today = today or timezone.now().date()
+        current = today.replace(day=1)
+        month = min(since.replace(day=1), current) if since else current
+        last = _add_months(current, months_ahead)
+        months = set()
+        while month <= last:
+            months.add(month)
+            month = _add_months(month, 1)
+
+        created = []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT date_trunc('month', day_and_time)::date "
+                "FROM stock_history_default"
+            )
+            months.update(row[0] for row in cursor.fetchall())
+            for month in sorted(months):
+                cursor.execute("SELECT create_stock_history_partition(%s)", [month])
+                created.append(cursor.fetchone()[0])
+        return created
+
+    @staticmethod
+    def detach_before(month: date, drop=False):
+        """
+        Detach every monthly partition for a month before ``month`` so it can
+        be archived (or dropped with ``drop``). Returns the names.
+        """
+        cutoff = month.replace(day=1)
+        expired = [
+            name for name in StockHistoryPartitionService.partitions()
+            if partition_month(name) < cutoff
+        ]
+        with connection.cursor() as cursor:
+            for name in expired:
+                table = connection.ops.quote_name(name)
+                cursor.execute(f"ALTER TABLE stock_history DETACH PARTITION {table}")
+                if drop:
+                    cursor.execute(f"DROP TABLE {table}")
+        return expired
+
+    @staticmethod
+    def attach(name: str):
+        """Re-attach a detached stock_history_YYYY_MM table for its month."""
+        month = partition_month(name)
+        if month is None:
+            raise ValueError(f"Not a monthly stock_history partition: {name}")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE stock_history ATTACH PARTITION "
+                f"{connection.ops.quote_name(name)} FOR VALUES FROM (%s) TO (%s)",
+                [month, _add_months(month, 1)],
+            )
+        return name
@@ -1,4 +1,5 @@
 from Incrementum.models import Stock
+from Incrementum.models.stock import stock_columns
 
 
 class StockService:
@@ -10,5 +11,8 @@ class StockService:
             return None
 
     @staticmethod
-    def get_stocks_by_symbols(symbols):
-        return list(Stock.objects.filter(symbol__in=symbols))
+    def get_stocks_by_symbols(symbols, fields=None):
+        stocks = Stock.objects.filter(symbol__in=symbols)
+        if fields:
+            stocks = stocks.only(*stock_columns(fields))
+        return list(stocks)
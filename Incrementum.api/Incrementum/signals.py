@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Incrementum.data_generation import bump_data_generation
+from Incrementum.models.stock import StockModel
+from Incrementum.screener_engine import invalidate_screener_engine
+
+
+@receiver(post_save, sender=StockModel)
+@receiver(post_delete, sender=StockModel)
+def stock_data_changed(sender, **kwargs):
+    bump_data_generation()
+    invalidate_screener_engine()
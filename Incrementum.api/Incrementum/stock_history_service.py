@@ -1,10 +1,81 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone as dt_timezone
 from logging import Logger
 from typing import Optional, Tuple
+import numpy as np
 import pandas as pd
 from django.db import connection
 from django.utils import timezone
 
+from Incrementum.history_cache import (
+    BAR_COLUMNS,
+    COLUMN_DTYPES,
+    TIME_DTYPE,
+    HistoryCache,
+    HistorySeries,
+    get_history_cache,
+)
+from Incrementum.history_store import HistoryStore, get_history_store
+from Incrementum.models.stock_history_rollup import StockHistoryRollup
+from Incrementum.services.history_rollup_service import (
+    ROLLUP_INTERVALS,
+    ROLLUP_LABEL_OFFSETS,
+    ROLLUP_SOURCES,
+)
+
+HISTORY_COLUMNS = [
+    "stock_symbol",
+    "day_and_time",
+    "open_price",
+    "close_price",
+    "high",
+    "low",
+    "volume",
+    "is_hourly",
+]
+
+# Rows per cursor.fetchmany() when filling history arrays. Queries name
+# stock_history unqualified: production connections put incrementum on the
+# search_path, and the same SQL then runs against the sqlite test database.
+FETCH_CHUNK_ROWS = 10_000
+
+
+def _as_datetime64(value) -> Optional[np.datetime64]:
+    """A start/end bound as naive-UTC datetime64, matching stock_history's column."""
+    if value is None or value == "":
+        return None
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert("UTC").tz_localize(None)
+    return stamp.to_datetime64().astype("datetime64[us]")
+
+
+def _as_datetime(value: Optional[np.datetime64]) -> Optional[datetime]:
+    return None if value is None else pd.Timestamp(value).to_pydatetime()
+
+
+def _bar_record(columns) -> np.dtype:
+    """Row layout of a history fetch selecting day_and_time, ``columns``, is_hourly."""
+    return np.dtype(
+        [("day_and_time", TIME_DTYPE)]
+        + [(column, COLUMN_DTYPES[column]) for column in columns]
+        + [("is_hourly", np.bool_)]
+    )
+
+
+def _bar_series(bars: np.ndarray, columns) -> HistorySeries:
+    """
+    Split fetched records into one compact array per column. Field views
+    would keep the whole fetch buffer (every column plus growth slack)
+    alive behind arrays whose nbytes only counts their own field, which
+    would break the array cache's byte budget.
+    """
+    return HistorySeries(
+        start=None,
+        times=np.ascontiguousarray(bars["day_and_time"]),
+        columns={column: np.ascontiguousarray(bars[column]) for column in columns},
+        is_hourly=np.ascontiguousarray(bars["is_hourly"]),
+    )
+
 
 class StockHistoryService:
     def __init__(self):
@@ -18,53 +89,312 @@ class StockHistoryService:
         is_hourly: Optional[bool] = None
     ) -> Optional[pd.DataFrame]:
         try:
-            query = """
-                SELECT
-                    stock_symbol,
-                    day_and_time,
-                    open_price,
-                    close_price,
-                    high,
-                    low,
-                    volume,
-                    is_hourly
-                FROM incrementum.stock_history
-                WHERE stock_symbol = %s
-            """
-            params = [ticker]
+            df = None
+            store = get_history_store()
+            if store is not None and is_hourly is not None:
+                df = self._stored_history(store, ticker, start_date, end_date, is_hourly)
+
+            if df is None:
+                cache = get_history_cache()
+                if cache is None:
+                    df = self.fetch_history_arrays(
+                        ticker, is_hourly, start_date, end_date
+                    ).window(ticker)
+                else:
+                    df = self._cached_history(cache, ticker, start_date, end_date, is_hourly)
+
+            if df is None or df.empty:
+                self.logger.info(
+                    f"No database history found for ticker {ticker}"
+                )
+                return None
 
-            if start_date:
-                query += " AND day_and_time >= %s"
-                params.append(start_date)
+            self.logger.info(f"Retrieved {len(df)} records from database for {ticker}")
+            return df
 
-            if end_date:
-                query += " AND day_and_time < %s"
-                params.append(end_date)
+        except Exception as e:
+            self.logger.error(
+                f"Error fetching database history for {ticker}: {str(e)}"
+            )
+            return None
+
+    def fetch_history_arrays(
+        self,
+        ticker: str,
+        is_hourly: Optional[bool] = None,
+        start_date=None,
+        end_date=None,
+        after=None,
+        columns=BAR_COLUMNS,
+        chunk_size: int = FETCH_CHUNK_ROWS
+    ) -> HistorySeries:
+        """
+        Raw bars from stock_history as typed arrays; ``after`` is an
+        exclusive lower bound and ``columns`` a subset of BAR_COLUMNS. Rows
+        are fetched ``chunk_size`` at a time straight into one preallocated
+        record array (grown by doubling), so no per-cell Python objects or
+        DataFrame outlive a chunk. Each column is then copied out compactly;
+        ``series.window(ticker)`` wraps them as a DataFrame without copying.
+        """
+        columns = tuple(columns)
+        query = f"""
+            SELECT day_and_time, {"".join(f"{c}, " for c in columns)}
+                coalesce(is_hourly, true)
+            FROM stock_history
+            WHERE stock_symbol = %s
+        """
+        params = [ticker]
+
+        if start_date:
+            query += " AND day_and_time >= %s"
+            params.append(start_date)
+
+        if after is not None:
+            query += " AND day_and_time > %s"
+            params.append(after)
+
+        if end_date:
+            query += " AND day_and_time < %s"
+            params.append(end_date)
+
+        if is_hourly is not None:
+            query += " AND is_hourly = %s"
+            params.append(is_hourly)
+
+        query += " ORDER BY day_and_time ASC"
+
+        bars = self._fetch_bars(query, params, _bar_record(columns), chunk_size)
+        return _bar_series(bars, columns)
+
+    def get_last_bars(
+        self,
+        ticker: str,
+        n: int,
+        is_hourly: Optional[bool] = None,
+        columns=BAR_COLUMNS
+    ) -> Optional[pd.DataFrame]:
+        """
+        The ``n`` most recent bars in ascending time order, in
+        get_db_history's shape. Reads only ``n`` rows off the end of the
+        (stock_symbol, is_hourly, day_and_time) index however long the
+        listing's history is.
+        """
+        columns = tuple(columns)
+        query = f"""
+            SELECT day_and_time, {"".join(f"{c}, " for c in columns)}
+                coalesce(is_hourly, true)
+            FROM stock_history
+            WHERE stock_symbol = %s
+        """
+        params = [ticker]
+        if is_hourly is not None:
+            query += " AND is_hourly = %s"
+            params.append(is_hourly)
+        query += " ORDER BY day_and_time DESC LIMIT %s"
+        params.append(n)
+
+        try:
+            bars = self._fetch_bars(query, params, _bar_record(columns), max(n, 1))
+        except Exception as e:
+            self.logger.error(f"Error fetching last {n} bars for {ticker}: {str(e)}")
+            return None
+        if not len(bars):
+            return None
+        return _bar_series(bars[::-1], columns).window(ticker)
+
+    def get_last_bars_many(
+        self,
+        tickers,
+        n: int,
+        is_hourly: Optional[bool] = None,
+        columns=BAR_COLUMNS
+    ) -> dict:
+        """
+        get_last_bars for several symbols in one round trip: a LATERAL
+        ``ORDER BY day_and_time DESC LIMIT n`` per symbol. Symbols without
+        bars are left out of the returned {symbol: DataFrame}.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        columns = tuple(columns)
+        hourly_filter = "" if is_hourly is None else "AND h.is_hourly = %s"
+        query = f"""
+            SELECT s.symbol, b.*
+            FROM unnest(%s::varchar[]) AS s(symbol)
+            CROSS JOIN LATERAL (
+                SELECT h.day_and_time, {"".join(f"h.{c}, " for c in columns)}
+                    coalesce(h.is_hourly, true)
+                FROM stock_history h
+                WHERE h.stock_symbol = s.symbol {hourly_filter}
+                ORDER BY h.day_and_time DESC
+                LIMIT %s
+            ) AS b
+            ORDER BY s.symbol, b.day_and_time ASC
+        """
+        params = [tickers] + ([] if is_hourly is None else [is_hourly]) + [n]
+        record = np.dtype([("stock_symbol", object)] + _bar_record(columns).descr)
+
+        try:
+            bars = self._fetch_bars(query, params, record, FETCH_CHUNK_ROWS)
+        except Exception as e:
+            self.logger.error(f"Error fetching last {n} bars for {len(tickers)} symbols: {e}")
+            return {}
+
+        if not len(bars):
+            return {}
+        symbols = bars["stock_symbol"]
+        starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+        ends = np.append(starts[1:], len(bars))
+        return {
+            symbols[start]: _bar_series(bars[start:end], columns).window(symbols[start])
+            for start, end in zip(starts, ends)
+        }
+
+    def _fetch_bars(self, query: str, params, record: np.dtype, chunk_size: int) -> np.ndarray:
+        """
+        Run ``query`` and read its rows ``chunk_size`` at a time straight
+        into a preallocated ``record`` array, doubled whenever it fills.
+        """
+        bars = np.empty(chunk_size, dtype=record)
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if count + len(rows) > len(bars):
+                    grown = np.empty(max(2 * len(bars), count + len(rows)), dtype=record)
+                    grown[:count] = bars[:count]
+                    bars = grown
+                bars[count:count + len(rows)] = rows
+                count += len(rows)
+        return bars[:count]
+
+    def _cached_history(
+        self,
+        cache: HistoryCache,
+        ticker: str,
+        start_date,
+        end_date,
+        is_hourly: Optional[bool]
+    ) -> pd.DataFrame:
+        """
+        Serve the window from the per-process array cache. A cached series
+        that reaches back far enough only fetches bars newer than its tail;
+        otherwise the series is reloaded from ``start_date`` onwards.
+        """
+        start = _as_datetime64(start_date)
+        end = _as_datetime64(end_date)
+        key = (ticker, is_hourly)
+
+        series = cache.get(key)
+        if series is None or not series.covers(start):
+            series = self.fetch_history_arrays(ticker, is_hourly, start_date=start_date)
+            series.start = start
+        else:
+            newer = self.fetch_history_arrays(
+                ticker,
+                is_hourly,
+                start_date=None if series.tail is not None else _as_datetime(series.start),
+                after=_as_datetime(series.tail),
+            )
+            if len(newer.times):
+                series = series.append(newer)
+        cache.put(key, series)
+        return series.window(ticker, start, end)
 
-            if is_hourly is not None:
-                query += " AND is_hourly = %s"
-                params.append(is_hourly)
+    def _stored_history(
+        self,
+        store: HistoryStore,
+        ticker: str,
+        start_date,
+        end_date,
+        is_hourly: bool
+    ) -> Optional[pd.DataFrame]:
+        """
+        Serve the window from the memory-mapped store, topped up from the
+        database with any bars synced after the store's tail. None when the
+        symbol is not in the store.
+        """
+        series = store.read(ticker, is_hourly)
+        if series is None:
+            return None
+        start = _as_datetime64(start_date)
+        end = _as_datetime64(end_date)
+        df = series.window(ticker, start, end)
 
-            query += " ORDER BY day_and_time ASC"
+        if end is None or end > series.tail:
+            newer = self.fetch_history_arrays(
+                ticker, is_hourly, end_date=end_date, after=_as_datetime(series.tail)
+            )
+            if len(newer.times):
+                df = pd.concat([df, newer.window(ticker, start, end)], ignore_index=True)
+        return df
 
-            with connection.cursor() as cursor:
-                cursor.execute(query, params)
-                columns = [col[0] for col in cursor.description]
-                rows = cursor.fetchall()
+    def sync_store(
+        self,
+        store: HistoryStore,
+        ticker: str,
+        is_hourly: bool,
+        rebuild: bool = False
+    ) -> int:
+        """Append bars newer than the store's tail; returns how many were added."""
+        if rebuild:
+            store.clear(ticker, is_hourly)
+        stored = store.read(ticker, is_hourly)
+        newer = self.fetch_history_arrays(
+            ticker, is_hourly, after=_as_datetime(stored.tail) if stored else None
+        )
+        store.append(ticker, is_hourly, newer)
+        return len(newer.times)
+
+    def get_rollup_history(
+        self,
+        ticker: str,
+        interval: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        is_hourly: bool = True
+    ) -> Optional[pd.DataFrame]:
+        """
+        Pre-aggregated bars for ``interval`` from stock_history_rollup, in
+        the same shape _aggregate_to_interval produces (bucket start, or the
+        week's Sunday for 1wk, as day_and_time).
+        """
+        try:
+            rows = StockHistoryRollup.objects.filter(
+                stock_symbol_id=ticker,
+                bucket_interval=interval,
+                is_hourly=is_hourly,
+            )
+            if start_date:
+                rows = rows.filter(bucket__gte=start_date)
+            if end_date:
+                # Keep buckets that start before end_date, e.g. this week's 1wk
+                # bucket, which is labelled with the coming Sunday.
+                offset = ROLLUP_LABEL_OFFSETS.get(interval, timedelta(0))
+                rows = rows.filter(bucket__lt=end_date + offset)
+            rows = list(rows.order_by('bucket').values_list(
+                'stock_symbol', 'bucket', 'open_price', 'close_price',
+                'high', 'low', 'volume',
+            ))
 
             if not rows:
                 self.logger.info(
-                    f"No database history found for ticker {ticker}"
+                    f"No {interval} rollup found for ticker {ticker}"
                 )
                 return None
 
-            df = pd.DataFrame(rows, columns=columns)
-            self.logger.info(f"Retrieved {len(df)} records from database for {ticker}")
+            df = pd.DataFrame(rows, columns=HISTORY_COLUMNS[:-1])
+            df["is_hourly"] = interval in ["1h", "1d", "1wk"]
+            self.logger.info(f"Retrieved {len(df)} {interval} buckets for {ticker}")
             return df
 
         except Exception as e:
             self.logger.error(
-                f"Error fetching database history for {ticker}: {str(e)}"
+                f"Error fetching {interval} rollup for {ticker}: {str(e)}"
             )
             return None
 
@@ -176,44 +506,28 @@ class StockHistoryService:
         end_date = datetime.now()
         start_date = self.calculate_start_date(period, end_date)
 
-        # Determine if we need minute-level or hourly/daily data
-        hourly_intervals = ["1h"]
-        daily_intervals = ["1d", "1wk"]
-
-        if interval in daily_intervals:
-            # For daily/weekly intervals, try hourly data first
-            db_history = self.get_db_history(
-                ticker,
-                start_date=start_date.strftime("%Y-%m-%d"),
-                end_date=end_date.strftime("%Y-%m-%d"),
-                is_hourly=True,
+        db_history = None
+        if interval in ROLLUP_INTERVALS:
+            # Served from the maintained rollup; no resampling per request.
+            start_day = datetime.combine(
+                start_date.date(), datetime.min.time(), tzinfo=dt_timezone.utc
             )
-            if db_history is None or db_history.empty:
-                self.logger.info(f"No hourly data found, fetching minute data for {ticker}")
-                db_history = self.get_db_history(
-                    ticker,
-                    start_date=start_date.strftime("%Y-%m-%d"),
-                    end_date=end_date.strftime("%Y-%m-%d"),
-                    is_hourly=False,
-                )
-
-            # Aggregate to requested interval
-            if db_history is not None and not db_history.empty:
-                db_history = self._aggregate_to_interval(db_history, interval)
-
-        elif interval in hourly_intervals:
-            # For hourly intervals, get minute data and aggregate
-            db_history = self.get_db_history(
-                ticker,
-                start_date=start_date.strftime("%Y-%m-%d"),
-                end_date=end_date.strftime("%Y-%m-%d"),
-                is_hourly=False,
+            end_day = datetime.combine(
+                end_date.date(), datetime.min.time(), tzinfo=dt_timezone.utc
             )
-            if db_history is not None and not db_history.empty:
-                db_history = self._aggregate_to_interval(db_history, interval)
+            for is_hourly in ROLLUP_SOURCES[interval]:
+                db_history = self.get_rollup_history(
+                    ticker, interval, start_day, end_day, is_hourly=is_hourly
+                )
+                if db_history is not None and not db_history.empty:
+                    break
+                self.logger.info(
+                    f"No {interval} rollup from "
+                    f"{'hourly' if is_hourly else 'minute'} data for {ticker}"
+                )
 
         else:
-            # For minute intervals (5m, 15m, etc.), get minute data and aggregate
+            # Intervals without a rollup (e.g. 1m): aggregate minute data
             db_history = self.get_db_history(
                 ticker,
                 start_date=start_date.strftime("%Y-%m-%d"),
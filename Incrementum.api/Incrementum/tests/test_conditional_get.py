@@ -0,0 +1,107 @@
+import json
+import pandas as pd
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import Client
+from django.utils.http import parse_http_date
+from django.utils import timezone
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+
+pytestmark = pytest.mark.django_db
+
+
+def _bar(stock, when, close=10000):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=100,
+    )
+
+
+@pytest.fixture
+def stock(db):
+    stock = StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+    _bar(stock, timezone.now().replace(microsecond=0) - timedelta(hours=2))
+    return stock
+
+
+def test_metadata_revalidates_with_etag(stock, django_assert_num_queries):
+    client = Client()
+    response = client.get('/stock/AAPL/metadata/')
+
+    assert response.status_code == 200
+    assert 'public' in response['Cache-Control']
+    assert 'max-age=' in response['Cache-Control']
+    etag = response['ETag']
+
+    with django_assert_num_queries(1):
+        response = client.get('/stock/aapl/metadata/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+    _bar(stock, timezone.now().replace(microsecond=0) - timedelta(hours=1), close=11000)
+    response = client.get('/stock/AAPL/metadata/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert json.loads(response.content)['currentPrice'] == 110.0
+
+
+@patch('Incrementum.controllers.stocks_controller.StockHistoryService')
+def test_graph_skips_history_on_not_modified(mock_service, stock):
+    mock_service.return_value.history.return_value = (
+        pd.DataFrame({
+            "day_and_time": pd.date_range("2024-01-01", periods=3, freq="D"),
+            "open_price": [100, 101, 102],
+            "close_price": [101, 102, 103],
+            "high": [102, 103, 104],
+            "low": [99, 100, 101],
+        }),
+        {},
+    )
+    client = Client()
+    response = client.get('/getStocks/AAPL/', {'period': '1mo'})
+    assert response.status_code == 200
+
+    response = client.get(
+        '/getStocks/AAPL/', {'period': '1mo'},
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert response.status_code == 304
+    assert mock_service.return_value.history.call_count == 1
+
+    other = client.get('/getStocks/AAPL/', {'period': '1y'})
+    assert other.status_code == 200
+    assert other['ETag'] != response['ETag']
+
+
+def test_last_modified_rolls_over_with_the_day(stock):
+    client = Client()
+    today = timezone.now()
+    response = client.get('/stock/AAPL/metadata/')
+    last_modified = response['Last-Modified']
+
+    assert parse_http_date(last_modified) >= int(
+        today.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    )
+    assert client.get(
+        '/stock/AAPL/metadata/', HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304
+
+    tomorrow = today + timedelta(days=1)
+    with patch('Incrementum.conditional.timezone.now', return_value=tomorrow):
+        response = client.get('/stock/AAPL/metadata/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200
+    assert parse_http_date(response['Last-Modified']) > parse_http_date(last_modified)
+
+
+def test_unknown_symbol_has_no_validators(db):
+    response = Client().get('/stock/NOPE/metadata/')
+
+    assert response.status_code == 404
+    assert not response.has_header('ETag')
@@ -0,0 +1,79 @@
+import pytest
+from datetime import date, datetime, timezone as dt_timezone
+from Incrementum.models.daily_close import DailyClose
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.yrhilo import day_percent_change
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+def _bar(stock, when, close):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=100,
+    )
+
+
+def _at(day, hour):
+    return datetime(2026, 3, day, hour, 0, tzinfo=dt_timezone.utc)
+
+
+def _closes():
+    return list(
+        DailyClose.objects.filter(stock_symbol_id="AAPL")
+        .order_by('trading_date')
+        .values_list('trading_date', 'close_price', 'prev_close')
+    )
+
+
+def test_session_close_bars_maintain_daily_close(stock):
+    _bar(stock, _at(2, 16), 90)
+    _bar(stock, _at(2, 17), 100)
+    _bar(stock, _at(3, 17), 110)
+
+    assert _closes() == [
+        (date(2026, 3, 2), 100, None),
+        (date(2026, 3, 3), 110, 100),
+    ]
+
+
+def test_backfilled_session_relinks_following_close(stock):
+    _bar(stock, _at(2, 17), 100)
+    _bar(stock, _at(4, 17), 120)
+    _bar(stock, _at(3, 17), 110)
+
+    assert _closes() == [
+        (date(2026, 3, 2), 100, None),
+        (date(2026, 3, 3), 110, 100),
+        (date(2026, 3, 4), 120, 110),
+    ]
+
+
+def test_day_percent_change_reads_latest_session_row(
+    stock, django_assert_num_queries
+):
+    flat = StockModel.objects.create(symbol="MSFT", company_name="Microsoft Corporation")
+    _bar(stock, _at(2, 17), 100)
+    _bar(stock, _at(3, 17), 110)
+    _bar(stock, _at(4, 17), 99)
+    _bar(flat, _at(4, 17), 300)
+
+    # Cache read, one lookup of the newest daily_close rows, bulk update.
+    with django_assert_num_queries(3):
+        changes = day_percent_change(stocks=["AAPL", "MSFT", "NOPE"])
+
+    assert changes == {"AAPL": pytest.approx(-10.0)}
+    assert _closes()[-1] == (date(2026, 3, 4), 99, 110)
+    flat.refresh_from_db()
+    assert flat.day_percent_change is None
@@ -0,0 +1,109 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from django.test import Client
+from Incrementum.downsampling import lttb_indices, ohlc_downsample
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    values = np.zeros(1000)
+    values[437] = 50.0
+    values[812] = -40.0
+
+    rows = lttb_indices(values, 20)
+
+    assert len(rows) == 20
+    assert rows[0] == 0 and rows[-1] == 999
+    assert np.all(np.diff(rows) > 0)
+    assert 437 in rows and 812 in rows
+
+
+def test_lttb_returns_everything_when_under_limit():
+    assert lttb_indices(np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_ohlc_downsample_preserves_extremes():
+    open_ = np.arange(10.0)
+    close = open_ + 0.5
+    high = open_ + 1
+    low = open_ - 1
+    high[3] = np.nan
+
+    starts, o, h, lo, c = ohlc_downsample(open_, high, low, close, 3)
+
+    assert starts.tolist() == [0, 3, 6]
+    assert o.tolist() == [0.0, 3.0, 6.0]
+    assert h.tolist() == [3.0, 6.0, 10.0]
+    assert lo.tolist() == [-1.0, 2.0, 5.0]
+    assert c.tolist() == [2.5, 5.5, 9.5]
+
+
+def _history(points):
+    prices = 10000 + (np.sin(np.linspace(0, 20, points)) * 1000).astype(int)
+    return pd.DataFrame({
+        "day_and_time": pd.date_range("2024-01-01", periods=points, freq="h"),
+        "open_price": prices,
+        "close_price": prices,
+        "high": prices + 5,
+        "low": prices - 5,
+        "volume": 1,
+    })
+
+
+@pytest.mark.django_db
+@patch('Incrementum.controllers.stocks_controller.StockHistoryService')
+def test_stock_graph_max_points(mock_service):
+    history = _history(5000)
+    mock_service.return_value.history.return_value = (history, {})
+    client = Client()
+
+    data = json.loads(client.get('/getStocks/AAPL/', {'max_points': 200}).content)
+    assert data['downsampled'] is True
+    assert data['original_count'] == 5000
+    assert data['count'] == len(data['dates']) == len(data['close']) == 200
+    assert data['dates'][0] == "2024-01-01T00:00:00"
+
+    data = json.loads(
+        client.get('/getStocks/AAPL/', {'max_points': 100, 'downsample': 'ohlc'}).content
+    )
+    assert data['count'] == 100
+    assert data['downsample'] == 'ohlc'
+    assert max(data['high']) == history['high'].max() / 100
+    assert min(data['low']) == history['low'].min() / 100
+
+    data = json.loads(client.get('/getStocks/AAPL/').content)
+    assert data['downsampled'] is False
+    assert data['count'] == 5000
+
+    assert client.get('/getStocks/AAPL/', {'max_points': 'lots'}).status_code == 400
+    assert client.get('/getStocks/AAPL/', {'max_points': 2}).status_code == 400
+
+
+@pytest.mark.django_db
+@patch('Incrementum.controllers.stocks_controller.StockHistoryService')
+def test_stock_graph_epoch_timestamps_and_nulls(mock_service):
+    history = _history(3)
+    history['high'] = history['high'].astype(float)
+    history.loc[1, 'high'] = np.nan
+    mock_service.return_value.history.return_value = (history, {})
+    client = Client()
+
+    data = json.loads(client.get('/getStocks/AAPL/', {'ts_format': 'epoch'}).content)
+    assert data['dates'] == [1704067200000, 1704070800000, 1704074400000]
+    assert data['high'][1] is None
+    assert data['close'][0] == history['close_price'][0] / 100
+
+    assert client.get('/getStocks/AAPL/', {'ts_format': 'unix'}).status_code == 400
+
+
+def test_dumps_falls_back_to_stdlib():
+    from Incrementum import fast_json
+
+    payload = {'a': np.array([1.25, np.nan]), 'b': np.array([1, 2]), 'c': np.int64(3)}
+    with patch.object(fast_json, 'orjson', None):
+        fallback = json.loads(fast_json.dumps(payload))
+
+    assert fallback == {'a': [1.25, None], 'b': [1, 2], 'c': 3}
+    assert json.loads(fast_json.dumps(payload)) == fallback
@@ -0,0 +1,112 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from Incrementum.models.fifty_two_week_extrema import FiftyTwoWeekExtrema
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.services.fifty_two_week_service import FiftyTwoWeekService
+from Incrementum.yrhilo import (
+    fifty_two_week_high_dict,
+    fifty_two_week_low_dict,
+    fifty_two_week_range_dict,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+def _bar(stock, when, high, low):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=high,
+        close_price=high,
+        high=high,
+        low=low,
+        volume=100,
+    )
+
+
+def test_insert_trigger_keeps_running_extrema(stock):
+    now = timezone.now().replace(microsecond=0)
+    _bar(stock, now - timedelta(days=30), 150, low=100)
+    _bar(stock, now - timedelta(days=20), 140, low=90)
+    _bar(stock, now - timedelta(days=10), 160, low=95)
+
+    row = FiftyTwoWeekExtrema.objects.get(stock_symbol_id="AAPL")
+    assert (row.high, row.low) == (160, 90)
+    assert row.high_at == now - timedelta(days=10)
+    assert row.low_at == now - timedelta(days=20)
+
+
+def test_expired_side_is_recomputed_from_window(stock):
+    now = timezone.now().replace(microsecond=0)
+    _bar(stock, now - timedelta(days=300), 200, low=100)
+    _bar(stock, now - timedelta(days=100), 150, low=120)
+    _bar(stock, now - timedelta(days=50), 150, low=130)
+
+    later = now + timedelta(days=100)
+    extrema = FiftyTwoWeekService.extrema(["AAPL"], now=later)
+
+    row = extrema["AAPL"]
+    # The 200 high and 100 low aged out; ties keep the newest bar.
+    assert (row.high, row.low) == (150, 120)
+    assert row.high_at == now - timedelta(days=50)
+    stored = FiftyTwoWeekExtrema.objects.get(stock_symbol_id="AAPL")
+    assert (stored.high, stored.low) == (150, 120)
+
+    assert FiftyTwoWeekService.extrema(["AAPL"], now=now + timedelta(days=400)) == {}
+    assert not FiftyTwoWeekExtrema.objects.filter(stock_symbol_id="AAPL").exists()
+
+
+def test_expired_symbols_are_recomputed_in_one_statement(
+    stock, django_assert_num_queries
+):
+    now = timezone.now().replace(microsecond=0)
+    msft = StockModel.objects.create(symbol="MSFT", company_name="Microsoft Corporation")
+    nvda = StockModel.objects.create(symbol="NVDA", company_name="NVIDIA Corporation")
+    _bar(stock, now - timedelta(days=300), 200, low=100)
+    _bar(stock, now - timedelta(days=50), 150, low=120)
+    _bar(msft, now - timedelta(days=300), 400, low=300)
+    _bar(msft, now - timedelta(days=40), 350, low=320)
+    _bar(nvda, now - timedelta(days=300), 90, low=80)
+
+    later = now + timedelta(days=100)
+    # Read, delete NVDA (nothing left in the window), one upsert, re-read.
+    with django_assert_num_queries(4):
+        extrema = FiftyTwoWeekService.extrema(["AAPL", "MSFT", "NVDA"], now=later)
+
+    assert {s: (r.high, r.low) for s, r in extrema.items()} == {
+        "AAPL": (150, 120), "MSFT": (350, 320)
+    }
+    assert extrema["MSFT"].low_at == now - timedelta(days=40)
+    # NVDA's row is gone, so later reads do no recompute work for it.
+    with django_assert_num_queries(1):
+        assert FiftyTwoWeekService.extrema(["NVDA"], now=later) == {}
+
+
+def test_refresh_expired_sweeps_stale_rows(stock):
+    now = timezone.now().replace(microsecond=0)
+    _bar(stock, now - timedelta(days=300), 200, low=100)
+    _bar(stock, now - timedelta(days=10), 180, low=110)
+
+    assert FiftyTwoWeekService.refresh_expired(now=now) == 0
+    assert FiftyTwoWeekService.refresh_expired(now=now + timedelta(days=100)) == 1
+
+    row = FiftyTwoWeekExtrema.objects.get(stock_symbol_id="AAPL")
+    assert (row.high, row.low) == (180, 110)
+
+
+def test_yrhilo_dicts_read_extrema(stock):
+    now = timezone.now()
+    _bar(stock, now - timedelta(days=5), 300, low=250)
+    StockModel.objects.create(symbol="MSFT", company_name="Microsoft Corporation")
+
+    assert fifty_two_week_high_dict(stock="AAPL") == {"AAPL": 300}
+    assert fifty_two_week_low_dict(stocks=["AAPL", "MSFT"]) == {"AAPL": 250}
+    assert fifty_two_week_high_dict() == {}
+    assert fifty_two_week_range_dict(stocks=["AAPL", "MSFT"]) == {"AAPL": (300, 250)}
@@ -0,0 +1,186 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from Incrementum.history_cache import HistoryCache, HistorySeries
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.stock_history_service import HISTORY_COLUMNS, StockHistoryService
+
+
+def _at(day, hour):
+    return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+
+def _naive(day, hour):
+    return datetime(2026, 3, day, hour)
+
+
+def _series(*bars):
+    """A HistorySeries from (naive UTC time, close) pairs."""
+    return HistorySeries.from_frame(pd.DataFrame(
+        [("AAPL", when, close, close, close + 1, close - 1, 100, True) for when, close in bars],
+        columns=HISTORY_COLUMNS,
+    ))
+
+
+def _bar(stock, when, close):
+    StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=100,
+    )
+
+
+def _bars(stock, count):
+    """Hourly bars from 2026-03-02 00:00; bar i closes at 10_050 + i."""
+    StockHistory.objects.bulk_create([
+        StockHistory(
+            stock_symbol=stock,
+            day_and_time=_at(2, i),
+            open_price=10_000 + i,
+            close_price=10_050 + i,
+            high=10_100 + i,
+            low=9_900 + i,
+            volume=1_000 + i,
+        )
+        for i in range(count)
+    ])
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+@pytest.fixture
+def cache():
+    cache = HistoryCache(max_bytes=1_000_000)
+    with patch("Incrementum.stock_history_service.get_history_cache", return_value=cache):
+        yield cache
+
+
+def test_series_window_slices_half_open_range():
+    series = _series((_naive(2, 10), 1), (_naive(2, 11), 2), (_naive(3, 10), 3))
+
+    window = series.window("AAPL", series.times[1], series.times[2])
+
+    assert window["close_price"].tolist() == [2]
+    assert list(window.columns) == HISTORY_COLUMNS
+
+
+def test_cache_counts_hits_and_misses():
+    cache = HistoryCache(max_bytes=10_000)
+    series = _series((_naive(2, 10), 1))
+
+    assert cache.get(("AAPL", True)) is None
+    cache.put(("AAPL", True), series)
+    assert cache.get(("AAPL", True)) is series
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == series.nbytes
+
+
+def test_cache_evicts_least_recently_used_past_byte_budget():
+    series = _series((_naive(2, 10), 1))
+    cache = HistoryCache(max_bytes=series.nbytes * 2)
+    cache.put("a", series)
+    cache.put("b", series)
+    cache.get("a")
+
+    cache.put("c", series)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is series
+    assert cache.stats()["evictions"] == 1
+    assert cache.nbytes == series.nbytes * 2
+
+
+def test_cache_drops_entries_older_than_refresh_interval():
+    cache = HistoryCache(max_bytes=10_000, refresh_seconds=60)
+    series = _series((_naive(2, 10), 1))
+    series.loaded_at -= 120
+    cache.put("a", series)
+
+    assert cache.get("a") is None
+    assert cache.nbytes == 0
+
+
+def test_get_db_history_appends_only_newer_bars(stock, cache):
+    _bar(stock, _at(2, 10), 1)
+    _bar(stock, _at(2, 11), 2)
+    service = StockHistoryService()
+
+    first = service.get_db_history("AAPL", start_date="2026-03-02", is_hourly=True)
+    _bar(stock, _at(2, 12), 3)
+    with CaptureQueriesContext(connection) as queries:
+        second = service.get_db_history("AAPL", start_date="2026-03-02", is_hourly=True)
+    window = service.get_db_history(
+        "AAPL", start_date="2026-03-02 11:00", end_date="2026-03-02 12:00", is_hourly=True
+    )
+
+    assert first["close_price"].tolist() == [1, 2]
+    assert second["close_price"].tolist() == [1, 2, 3]
+    assert window["close_price"].tolist() == [2]
+
+    [tail_query] = [q["sql"] for q in queries.captured_queries]
+    assert "day_and_time > '2026-03-02 11:00:00'" in tail_query
+    assert "day_and_time >=" not in tail_query
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_get_db_history_reloads_when_window_starts_before_cached_series(
+    stock, cache
+):
+    _bar(stock, _at(2, 10), 1)
+    _bar(stock, _at(3, 10), 3)
+    service = StockHistoryService()
+
+    assert service.get_db_history(
+        "AAPL", start_date="2026-03-03", is_hourly=True
+    )["close_price"].tolist() == [3]
+    with CaptureQueriesContext(connection) as queries:
+        df = service.get_db_history("AAPL", start_date="2026-03-02", is_hourly=True)
+
+    assert df["close_price"].tolist() == [1, 3]
+    [reload_query] = [q["sql"] for q in queries.captured_queries]
+    assert "day_and_time >= '2026-03-02'" in reload_query
+
+
+def test_get_db_history_empty_window_returns_none(stock, cache):
+    _bar(stock, _at(2, 10), 1)
+    service = StockHistoryService()
+
+    assert service.get_db_history("AAPL", is_hourly=True) is not None
+    assert service.get_db_history("AAPL", start_date="2026-04-01", is_hourly=True) is None
+
+
+def test_fetch_history_arrays_fills_typed_columns_across_chunks(stock):
+    _bars(stock, 5)
+
+    series = StockHistoryService().fetch_history_arrays(
+        "AAPL", is_hourly=True, columns=("close_price",), chunk_size=2
+    )
+
+    assert series.times.dtype == np.dtype("datetime64[us]")
+    assert series.times[0] == np.datetime64("2026-03-02T00:00")
+    assert series.columns["close_price"].dtype == np.int32
+    assert series.columns["close_price"].tolist() == [10_050 + i for i in range(5)]
+    assert series.is_hourly.tolist() == [True] * 5
+    assert list(series.window("AAPL").columns) == [
+        "stock_symbol", "day_and_time", "close_price", "is_hourly"
+    ]
+    # Columns own compact buffers, so nbytes is what the cache really holds.
+    assert all(values.base is None for values in series.columns.values())
+    assert series.times.base is None and series.is_hourly.base is None
+    assert series.nbytes == 5 * (8 + 4 + 1)
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from Incrementum.history_cache import HistorySeries
+from Incrementum.history_store import HistoryStore
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.stock_history_service import HISTORY_COLUMNS, StockHistoryService
+
+
+def _naive(day, hour):
+    return datetime(2026, 3, day, hour)
+
+
+def _at(day, hour):
+    return datetime(2026, 3, day, hour, tzinfo=dt_timezone.utc)
+
+
+def _series(*bars):
+    """A HistorySeries from (naive UTC time, close) pairs."""
+    return HistorySeries.from_frame(pd.DataFrame(
+        [("AAPL", when, close, close, close + 1, close - 1, 100, True) for when, close in bars],
+        columns=HISTORY_COLUMNS,
+    ))
+
+
+def _bar(stock, when, close):
+    StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=100,
+    )
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Bypass the process-wide array cache so reads go to the store or the DB.
+    store = HistoryStore(tmp_path)
+    with patch("Incrementum.stock_history_service.get_history_store", return_value=store), \
+            patch("Incrementum.stock_history_service.get_history_cache", return_value=None):
+        yield store
+
+
+def test_store_round_trips_typed_memmaps(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("AAPL", True, _series((_naive(2, 10), 1), (_naive(2, 11), 2)))
+    store.append("AAPL", True, _series((_naive(2, 12), 3)))
+
+    series = store.read("AAPL", True)
+
+    assert isinstance(series.times, np.memmap)
+    assert series.times.dtype == np.dtype("datetime64[us]")
+    assert series.columns["close_price"].dtype == np.int32
+    assert series.columns["volume"].dtype == np.int64
+    assert series.columns["close_price"].tolist() == [1, 2, 3]
+    assert store.read("AAPL", False) is None
+
+
+def test_store_rejects_bars_not_after_tail(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("AAPL", True, _series((_naive(2, 11), 2)))
+
+    with pytest.raises(ValueError):
+        store.append("AAPL", True, _series((_naive(2, 11), 2)))
+
+
+def test_store_ignores_uncommitted_rows(tmp_path):
+    store = HistoryStore(tmp_path)
+    store.append("AAPL", True, _series((_naive(2, 10), 1)))
+    # Simulate an append that wrote column data but crashed before meta.json.
+    with open(tmp_path / "AAPL" / "hourly" / "close_price.bin", "ab") as f:
+        np.array([99], dtype="<i4").tofile(f)
+
+    assert store.read("AAPL", True).columns["close_price"].tolist() == [1]
+    store.append("AAPL", True, _series((_naive(2, 11), 2)))
+    assert store.read("AAPL", True).columns["close_price"].tolist() == [1, 2]
+
+
+def test_store_rejects_path_like_symbols(tmp_path):
+    with pytest.raises(ValueError):
+        HistoryStore(tmp_path).series_dir("../etc", True)
+
+
+def test_get_db_history_reads_store_and_tops_up_from_db(store, stock):
+    store.append("AAPL", True, _series((_naive(2, 10), 1), (_naive(2, 11), 2)))
+    for hour, close in ((10, 1), (11, 2), (12, 3)):
+        _bar(stock, _at(2, hour), close)
+
+    with CaptureQueriesContext(connection) as queries:
+        df = StockHistoryService().get_db_history(
+            "AAPL", start_date="2026-03-02 11:00", is_hourly=True
+        )
+
+    assert df["close_price"].tolist() == [2, 3]
+    [query] = [q["sql"] for q in queries.captured_queries]
+    assert "day_and_time > '2026-03-02 11:00:00'" in query
+
+
+def test_get_db_history_window_inside_store_skips_db(
+    db, store, django_assert_num_queries
+):
+    store.append("AAPL", True, _series((_naive(2, 10), 1), (_naive(2, 11), 2)))
+
+    with django_assert_num_queries(0):
+        df = StockHistoryService().get_db_history(
+            "AAPL", start_date="2026-03-02", end_date="2026-03-02 11:00", is_hourly=True
+        )
+
+    assert df["close_price"].tolist() == [1]
+
+
+def test_sync_store_appends_bars_after_stored_tail(store, stock):
+    store.append("AAPL", True, _series((_naive(2, 10), 1)))
+    _bar(stock, _at(2, 10), 1)
+    _bar(stock, _at(2, 11), 2)
+
+    added = StockHistoryService().sync_store(store, "AAPL", True)
+
+    assert added == 1
+    assert store.read("AAPL", True).columns["close_price"].tolist() == [1, 2]
+    assert store.read("AAPL", True).times[-1] == np.datetime64("2026-03-02T11:00")
+
+
+@override_settings(HISTORY_STORE_PATH="")
+def test_sync_command_requires_store_path():
+    with pytest.raises(CommandError):
+        call_command("sync_history_store")
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.services.model_inference_service import ModelInferenceService
+from Incrementum.stock_history_service import StockHistoryService
+
+START = datetime(2026, 3, 2, 14, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+def _bars(stock, count, is_hourly=True, step=timedelta(hours=1), start=START):
+    StockHistory.objects.bulk_create([
+        StockHistory(
+            stock_symbol=stock,
+            day_and_time=start + i * step,
+            open_price=10_000 + i,
+            close_price=10_050 + i,
+            high=10_100 + i,
+            low=9_900 + i,
+            volume=1_000 + i,
+            is_hourly=is_hourly,
+        )
+        for i in range(count)
+    ])
+
+
+def test_get_last_bars_returns_newest_n_ascending(stock):
+    _bars(stock, 30)
+    _bars(stock, 5, is_hourly=False, step=timedelta(minutes=1), start=START + timedelta(days=5))
+
+    df = StockHistoryService().get_last_bars("AAPL", 24, is_hourly=True)
+
+    assert len(df) == 24
+    assert df["close_price"].tolist() == [10_050 + i for i in range(6, 30)]
+    assert df["day_and_time"].is_monotonic_increasing
+    assert df["is_hourly"].all()
+    assert df["stock_symbol"].eq("AAPL").all()
+
+
+def test_get_last_bars_without_rows_returns_none(stock):
+    assert StockHistoryService().get_last_bars("AAPL", 24, is_hourly=True) is None
+
+
+def test_get_last_bars_reads_only_n_rows(stock):
+    _bars(stock, 30)
+    service = StockHistoryService()
+
+    with patch.object(service, "_fetch_bars", wraps=service._fetch_bars) as fetch:
+        service.get_last_bars("AAPL", 24, is_hourly=True)
+
+    assert fetch.call_args.args[3] == 24
+
+
+@patch("Incrementum.stock_history_service.connection.cursor")
+def test_get_last_bars_many_splits_lateral_rows_by_symbol(mock_cursor):
+    # unnest()/LATERAL are PostgreSQL-only, so this one checks the SQL.
+    def row(symbol, hour, close):
+        return (symbol, datetime(2026, 3, 2, hour), close, close, close + 1, close - 1, 100, True)
+
+    cursor = MagicMock()
+    cursor.fetchmany.side_effect = [
+        [row("AAPL", 11, 2), row("AAPL", 12, 3), row("MSFT", 12, 7)], [],
+    ]
+    mock_cursor.return_value.__enter__.return_value = cursor
+
+    bars = StockHistoryService().get_last_bars_many(
+        ["AAPL", "MSFT", "AAPL", "NONE"], 2, is_hourly=True
+    )
+
+    query, params = cursor.execute.call_args.args
+    assert "CROSS JOIN LATERAL" in query
+    assert params == [["AAPL", "MSFT", "NONE"], True, 2]
+    assert set(bars) == {"AAPL", "MSFT"}
+    assert bars["AAPL"]["close_price"].tolist() == [2, 3]
+    assert bars["MSFT"]["stock_symbol"].tolist() == ["MSFT"]
+
+
+@pytest.fixture(scope="module")
+def inference_service():
+    return ModelInferenceService()
+
+
+def test_get_prediction_uses_latest_lookback_hourly_bars(stock, inference_service):
+    _bars(stock, 40)
+    _bars(stock, 5, is_hourly=False, step=timedelta(minutes=1), start=START + timedelta(days=5))
+
+    result = inference_service.get_prediction("aapl")
+
+    lookback = inference_service.metadata.get("lookback", 24)
+    assert result["symbol"] == "AAPL"
+    assert result["data_records_used"] == lookback
+    assert result["last_close"] == (10_050 + 39) / 100
+    assert result["lookback_end_time"].startswith("2026-03-04 05:00")
+    assert len(result["predicted_close_prices"]) == result["forecast_horizon_hours"]
+
+
+def test_get_prediction_rejects_short_history(stock, inference_service):
+    _bars(stock, 5)
+
+    with pytest.raises(ValueError, match="Insufficient data"):
+        inference_service.get_prediction("AAPL")
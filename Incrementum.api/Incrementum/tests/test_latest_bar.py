@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from datetime import datetime, timedelta, timezone as dt_timezone
+from Incrementum.screener import Screener
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.latest_bar import LatestBar
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+
+pytestmark = pytest.mark.django_db
+
+
+def _bar(stock, when, close, volume=100):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=volume,
+    )
+
+
+def _stock(symbol="NVDA"):
+    return StockModel.objects.create(symbol=symbol, company_name=symbol)
+
+
+def test_latest_bar_tracks_newest_insert():
+    stock = StockModel.objects.create(symbol="NVDA", company_name="NVIDIA Corporation")
+    newer = datetime(2025, 12, 26, 15, 0, tzinfo=dt_timezone.utc)
+
+    _bar(stock, newer - timedelta(hours=1), 50000, volume=100)
+    _bar(stock, newer, 51000, volume=200)
+
+    latest = LatestBar.objects.get(stock_symbol=stock)
+    assert latest.close_price == 51000
+    assert latest.volume == 200
+    assert latest.day_and_time == newer
+
+
+def test_latest_bar_ignores_backfilled_older_bars():
+    stock = StockModel.objects.create(symbol="NVDA", company_name="NVIDIA Corporation")
+    newer = datetime(2025, 12, 26, 15, 0, tzinfo=dt_timezone.utc)
+
+    _bar(stock, newer, 51000, volume=200)
+    _bar(stock, newer - timedelta(days=30), 40000, volume=900)
+
+    latest = LatestBar.objects.get(stock_symbol=stock)
+    assert latest.close_price == 51000
+    assert latest.day_and_time == newer
+
+
+def test_screener_sorts_by_latest_volume_from_snapshot():
+    now = datetime(2025, 12, 26, 15, 0, tzinfo=dt_timezone.utc)
+    for symbol, volume in (("AAA", 300), ("BBB", 100), ("CCC", 200)):
+        stock = StockModel.objects.create(symbol=symbol, company_name=symbol)
+        _bar(stock, now - timedelta(hours=1), 1000, volume=999999)
+        _bar(stock, now, 1000, volume=volume)
+    StockModel.objects.create(symbol="DDD", company_name="No history")
+
+    result, total = Screener().query([], sort_by='volume', sort_order='desc')
+
+    assert total == 3
+    assert [s.symbol for s in result] == ["AAA", "CCC", "BBB"]
+
+    result, total = Screener().query(
+        [FilterData("less_than", "volume", "numeric", 250)]
+    )
+    assert sorted(s.symbol for s in result) == ["BBB", "CCC"]
+
+
+def _delete_bars(symbol, when=None):
+    # stock_history rows carry no id here, so delete with SQL rather than
+    # through the ORM collector.
+    query, params = "DELETE FROM stock_history WHERE stock_symbol = %s", [symbol]
+    if when is not None:
+        query += " AND day_and_time = %s"
+        params.append(when.replace(tzinfo=None))
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+
+
+def test_latest_bar_falls_back_when_newest_bar_is_deleted():
+    stock = _stock()
+    newer = datetime(2025, 12, 26, 15, 0, tzinfo=dt_timezone.utc)
+    _bar(stock, newer - timedelta(hours=2), 49000)
+    _bar(stock, newer - timedelta(hours=1), 50000)
+    _bar(stock, newer, 51000)
+
+    _delete_bars("NVDA", newer - timedelta(hours=2))
+    assert LatestBar.objects.get(stock_symbol=stock).close_price == 51000
+
+    _delete_bars("NVDA", newer)
+    latest = LatestBar.objects.get(stock_symbol=stock)
+    assert (latest.close_price, latest.day_and_time) == (50000, newer - timedelta(hours=1))
+
+    _delete_bars("NVDA")
+    assert not LatestBar.objects.filter(stock_symbol=stock).exists()
+
+
+def test_latest_bar_follows_corrections():
+    stock = _stock()
+    newer = datetime(2025, 12, 26, 15, 0, tzinfo=dt_timezone.utc)
+    older = _bar(stock, newer - timedelta(hours=1), 50000)
+    _bar(stock, newer, 51000)
+
+    StockHistory.objects.filter(stock_symbol=stock, day_and_time=newer).update(close_price=51500)
+    assert LatestBar.objects.get(stock_symbol=stock).close_price == 51500
+
+    StockHistory.objects.filter(stock_symbol=stock, day_and_time=newer).update(
+        day_and_time=newer - timedelta(hours=3)
+    )
+    latest = LatestBar.objects.get(stock_symbol=stock)
+    assert (latest.close_price, latest.day_and_time) == (older.close_price, older.day_and_time)
@@ -0,0 +1,134 @@
+import json
+import pytest
+from datetime import timedelta
+from django.test import Client
+from django.utils import timezone
+from Incrementum.models.fifty_two_week_extrema import FiftyTwoWeekExtrema
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.services.quote_service import QuoteService
+
+pytestmark = pytest.mark.django_db
+
+
+def _bar(stock, when, open_price, close, high, low):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=open_price,
+        close_price=close,
+        high=high,
+        low=low,
+        volume=100,
+    )
+
+
+@pytest.fixture
+def quoted_stocks(db):
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    yesterday = today - timedelta(days=1)
+    aapl = StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+    _bar(aapl, yesterday.replace(hour=17), 19500, 20000, 20500, 19000)
+    _bar(aapl, today.replace(hour=10), 20000, 21000, 21500, 19800)
+    StockModel.objects.create(symbol="MSFT", company_name="Microsoft Corporation")
+    return today
+
+
+def test_quotes_read_snapshot_in_one_query(quoted_stocks, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        quotes = QuoteService.quotes(["AAPL", "MSFT"])
+
+    aapl = quotes["AAPL"]
+    assert aapl['currentPrice'] == 210.0
+    assert (aapl['open'], aapl['high'], aapl['low']) == (200.0, 215.0, 198.0)
+    assert aapl['previousClose'] == 200.0
+    assert aapl['change'] == pytest.approx(10.0)
+    assert aapl['changePercent'] == pytest.approx(5.0)
+    assert (aapl['high52Week'], aapl['low52Week']) == (215.0, 190.0)
+
+    assert quotes["MSFT"]['currentPrice'] is None
+    assert quotes["MSFT"]['changePercent'] is None
+
+
+def test_previous_close_skips_todays_session(quoted_stocks):
+    aapl = StockModel.objects.get(symbol="AAPL")
+    _bar(aapl, quoted_stocks.replace(hour=17), 21000, 22000, 22000, 21000)
+
+    quote = QuoteService.quotes(["AAPL"])["AAPL"]
+
+    assert quote['currentPrice'] == 220.0
+    assert quote['previousClose'] == 200.0
+    assert quote['changePercent'] == pytest.approx(10.0)
+
+
+def test_quotes_refresh_expired_ranges_together(
+    quoted_stocks, django_assert_num_queries
+):
+    msft = StockModel.objects.get(symbol="MSFT")
+    _bar(msft, quoted_stocks - timedelta(days=3), 30000, 30000, 31000, 29000)
+    long_ago = quoted_stocks - timedelta(weeks=60)
+    FiftyTwoWeekExtrema.objects.update(high=99999, high_at=long_ago)
+
+    # Snapshot, delete of emptied rows, one grouped upsert, re-read.
+    with django_assert_num_queries(4):
+        quotes = QuoteService.quotes(["AAPL", "MSFT"])
+
+    assert (quotes["AAPL"]['high52Week'], quotes["AAPL"]['low52Week']) == (215.0, 190.0)
+    assert (quotes["MSFT"]['high52Week'], quotes["MSFT"]['low52Week']) == (310.0, 290.0)
+
+
+def test_stock_metadata_uses_quote_snapshot(quoted_stocks, django_assert_num_queries):
+    client = Client()
+    # One query for the conditional-GET validators, one for the snapshot.
+    with django_assert_num_queries(2):
+        response = client.get('/stock/aapl/metadata/')
+
+    data = json.loads(response.content)
+    assert response.status_code == 200
+    assert data['symbol'] == "AAPL"
+    assert data['currentPrice'] == 210.0
+    assert data['previousClose'] == 200.0
+    assert data['high52Week'] == 215.0
+
+    assert client.get('/stock/nope/metadata/').status_code == 404
+
+
+def test_bulk_quotes_endpoint(quoted_stocks, django_assert_num_queries):
+    client = Client()
+    with django_assert_num_queries(1):
+        response = client.post(
+            '/stocks/quotes/',
+            data=json.dumps({'tickers': ['msft', 'AAPL', 'NOPE', 'AAPL']}),
+            content_type='application/json'
+        )
+
+    data = json.loads(response.content)
+    assert response.status_code == 200
+    assert [q['symbol'] for q in data['quotes']] == ['MSFT', 'AAPL']
+    assert data['quotes'][1]['currentPrice'] == 210.0
+    assert data['quotes'][1]['changePercent'] == pytest.approx(5.0)
+    assert data['missing'] == ['NOPE']
+
+
+def test_bulk_quotes_endpoint_validates_tickers(db):
+    client = Client()
+    response = client.post(
+        '/stocks/quotes/',
+        data=json.dumps({'tickers': 'AAPL'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        '/stocks/quotes/',
+        data=json.dumps({'tickers': [f'T{i}' for i in range(1001)]}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+    for body in (['AAPL'], 'AAPL', 7, None):
+        response = client.post(
+            '/stocks/quotes/', data=json.dumps(body), content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert json.loads(response.content) == {'error': 'Request body must be a JSON object'}
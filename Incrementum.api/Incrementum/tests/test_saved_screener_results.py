@@ -0,0 +1,263 @@
+import pytest
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+from Incrementum.models.account import Account
+from Incrementum.models.custom_screener import CustomScreener
+from Incrementum.models.custom_screener_result import CustomScreenerResult
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine
+from Incrementum.screener_service import ScreenerService
+from Incrementum.services.saved_screener_service import (
+    SavedScreenerEvaluator,
+    saved_filters_to_filter_data,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def account(db):
+    return Account.objects.create(
+        name="Saved User",
+        phone_number="5550001111",
+        email="saved@example.com",
+        password_hash="hash",
+        api_key="saved-key",
+    )
+
+
+@pytest.fixture
+def saved_stocks(db):
+    rows = [
+        ("AAA", 5000, "NASDAQ", "Software"),
+        ("BBB", 1000, "NYSE", "Software"),
+        ("CCC", 8000, "NYSE", "Retail"),
+        ("DDD", None, "NASDAQ", "Retail"),
+    ]
+    for symbol, cap, exchange, industry in rows:
+        StockModel.objects.create(
+            symbol=symbol,
+            company_name=symbol,
+            market_cap=cap,
+            primary_exchange=exchange,
+            sic_description=industry,
+        )
+
+
+def _bar(symbol, close, volume):
+    StockHistory.objects.create(
+        stock_symbol_id=symbol,
+        day_and_time=timezone.now(),
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=volume,
+    )
+
+
+def _screener(account, filters, is_private=True):
+    return CustomScreener.objects.create(
+        account=account, screener_name="Saved", filters=filters, is_private=is_private
+    )
+
+
+SAVED_FILTERS = [
+    [{'operator': 'greater_than', 'operand': 'market_cap', 'filter_type': 'numeric',
+      'value': 2000, 'value_low': None, 'value_high': None}],
+    [{'operator': 'equals', 'operand': 'industry', 'filter_type': 'categorical',
+      'value': 'software', 'value_low': None, 'value_high': None}],
+    [{'operator': 'eq', 'operand': 'market_cap', 'filter_type': 'numeric',
+      'value': None, 'value_low': 900, 'value_high': 5000}],
+    [
+        {'operator': 'equals', 'operand': 'primary_exchange', 'filter_type': 'categorical',
+         'value': 'NYSE'},
+        {'operator': 'greater_than', 'operand': 'market_cap', 'filter_type': 'numeric',
+         'value': 2000},
+    ],
+]
+
+
+def test_bulk_evaluation_matches_live_screener(account, saved_stocks):
+    screeners = [_screener(account, filters) for filters in SAVED_FILTERS]
+
+    assert SavedScreenerEvaluator().evaluate_all() == len(screeners)
+
+    for screener in screeners:
+        screener.refresh_from_db()
+        expected, _ = Screener().query(saved_filters_to_filter_data(screener.filters))
+        stored = CustomScreenerResult.objects.filter(
+            custom_screener=screener
+        ).order_by('position').values_list('stock_symbol', flat=True)
+        assert list(stored) == [s.symbol for s in expected]
+        assert screener.results_as_of is not None
+
+
+def test_bulk_evaluation_falls_back_to_database(account, saved_stocks):
+    screener = _screener(account, [
+        {'operator': 'greater_than', 'operand': 'list_date', 'filter_type': 'numeric',
+         'value': '2020-01-01'},
+    ])
+
+    SavedScreenerEvaluator(ColumnarScreenerEngine()).evaluate_all()
+
+    assert CustomScreenerResult.objects.filter(custom_screener=screener).count() == 0
+    screener.refresh_from_db()
+    assert screener.results_as_of is not None
+
+
+def test_results_endpoint_never_evaluates(account, saved_stocks, django_assert_num_queries):
+    screener = _screener(account, SAVED_FILTERS[0])
+
+    # Screener lookup, result page and count: no evaluation, no writes.
+    with django_assert_num_queries(3):
+        response = Client().get(
+            f'/screeners/custom/{screener.id}/results/', HTTP_X_USER_ID=account.api_key
+        )
+
+    data = json.loads(response.content)
+    assert response.status_code == 200
+    assert data['stocks'] == [] and data['as_of'] is None
+    assert not CustomScreenerResult.objects.exists()
+
+
+def test_results_endpoint_reads_precomputed_rows(account, saved_stocks):
+    screener = _screener(account, SAVED_FILTERS[0])
+    SavedScreenerEvaluator().evaluate_all()
+    client = Client()
+
+    response = client.get(
+        f'/screeners/custom/{screener.id}/results/', HTTP_X_USER_ID=account.api_key
+    )
+    data = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert [s['symbol'] for s in data['stocks']] == ['AAA', 'CCC']
+    assert data['pagination']['total_count'] == 2
+    assert data['as_of'] is not None
+
+    # Reads come from the stored set until the next evaluation.
+    StockModel.objects.create(symbol="EEE", company_name="EEE", market_cap=9000)
+    data = json.loads(client.get(
+        f'/screeners/custom/{screener.id}/results/', HTTP_X_USER_ID=account.api_key
+    ).content)
+    assert [s['symbol'] for s in data['stocks']] == ['AAA', 'CCC']
+
+    SavedScreenerEvaluator().evaluate_all()
+    data = json.loads(client.get(
+        f'/screeners/custom/{screener.id}/results/',
+        {'per_page': 2, 'page': 2},
+        HTTP_X_USER_ID=account.api_key,
+    ).content)
+    assert [s['symbol'] for s in data['stocks']] == ['EEE']
+    assert data['pagination']['has_prev'] is True
+
+
+def test_results_endpoint_hides_private_screeners(account, saved_stocks):
+    screener = _screener(account, SAVED_FILTERS[0])
+    client = Client()
+
+    assert client.get(f'/screeners/custom/{screener.id}/results/').status_code == 404
+
+    screener.is_private = False
+    screener.save()
+    assert client.get(f'/screeners/custom/{screener.id}/results/').status_code == 200
+
+
+def test_results_store_sort_keys_and_sort_by_them(account, saved_stocks):
+    screener = _screener(account, SAVED_FILTERS[1])
+    _bar("AAA", 1234, 10)
+    _bar("BBB", 999, 20)
+    SavedScreenerEvaluator().evaluate_all()
+
+    rows = CustomScreenerResult.objects.filter(custom_screener=screener).order_by('position')
+    assert [(r.stock_symbol_id, r.market_cap, r.price, r.volume) for r in rows] == [
+        ("AAA", 5000, 1234, 10), ("BBB", 1000, 999, 20)
+    ]
+
+    client = Client()
+    for params, expected in (
+        ({'sort_by': 'market_cap'}, ['BBB', 'AAA']),
+        ({'sort_by': 'volume', 'sort_order': 'desc'}, ['BBB', 'AAA']),
+        ({'sort_by': 'pps', 'sort_order': 'desc'}, ['AAA', 'BBB']),
+    ):
+        data = json.loads(client.get(
+            f'/screeners/custom/{screener.id}/results/', params,
+            HTTP_X_USER_ID=account.api_key,
+        ).content)
+        assert [s['symbol'] for s in data['stocks']] == expected
+
+    assert client.get(
+        f'/screeners/custom/{screener.id}/results/', {'sort_by': 'description'},
+        HTTP_X_USER_ID=account.api_key,
+    ).status_code == 400
+
+
+def test_saving_filters_marks_results_stale_until_evaluated(account, saved_stocks):
+    service = ScreenerService()
+    client = Client()
+    screener = service.create_custom_screener(
+        account.api_key,
+        numeric_filters=[{'operand': 'market_cap', 'operator': 'greater_than',
+                          'value': 2000}],
+    )
+    assert not screener.results.exists()
+
+    call_command('evaluate_saved_screeners', '--stale', stdout=StringIO())
+    data = json.loads(client.get(
+        f'/screeners/custom/{screener.id}/results/', HTTP_X_USER_ID=account.api_key
+    ).content)
+    assert [s['symbol'] for s in data['stocks']] == ['AAA', 'CCC']
+    assert data['stale'] is False
+    as_of = data['as_of']
+
+    # Saving returns without evaluating; reads keep the stamped rows.
+    service.update_custom_screener(
+        account.api_key, screener.id,
+        categorical_filters=[{'operand': 'industry', 'operator': 'equals', 'value': 'retail'}],
+    )
+    data = json.loads(client.get(
+        f'/screeners/custom/{screener.id}/results/', HTTP_X_USER_ID=account.api_key
+    ).content)
+    assert [s['symbol'] for s in data['stocks']] == ['AAA', 'CCC']
+    assert data['as_of'] == as_of and data['stale'] is True
+
+    call_command('evaluate_saved_screeners', '--stale', stdout=StringIO())
+    screener.refresh_from_db()
+    assert screener.results_stale is False
+    assert list(screener.results.values_list('stock_symbol', flat=True)) == ['CCC', 'DDD']
+
+
+def test_stale_evaluation_skips_current_screeners(account, saved_stocks):
+    current = _screener(account, SAVED_FILTERS[0])
+    SavedScreenerEvaluator().evaluate_all()
+    current.refresh_from_db()
+    as_of = current.results_as_of
+    pending = _screener(account, SAVED_FILTERS[1])
+
+    out = StringIO()
+    call_command('evaluate_saved_screeners', '--stale', stdout=out)
+
+    assert 'Evaluated 1 saved screeners' in out.getvalue()
+    current.refresh_from_db()
+    pending.refresh_from_db()
+    assert current.results_as_of == as_of
+    assert pending.results_as_of is not None and pending.results_stale is False
+
+
+def test_data_refresh_command_reevaluates_saved_screeners(account, saved_stocks):
+    screener = _screener(account, SAVED_FILTERS[0])
+
+    call_command('bump_data_generation', stdout=StringIO())
+    assert screener.results.count() == 2
+
+    StockModel.objects.create(symbol="EEE", company_name="EEE", market_cap=9000)
+    call_command('bump_data_generation', '--skip-saved-screeners', stdout=StringIO())
+    assert screener.results.count() == 2
+    call_command('bump_data_generation', stdout=StringIO())
+    assert screener.results.count() == 3
@@ -0,0 +1,101 @@
+import pytest
+import json
+from django.test import Client
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def batch_stocks(db):
+    for index in range(8):
+        StockModel.objects.create(
+            symbol=f"B{index}",
+            company_name=f"Batch {index}",
+            market_cap=(index + 1) * 1000 if index != 3 else None,
+            primary_exchange="NYSE" if index % 2 else "NASDAQ",
+        )
+
+
+BATCH = [
+    {'filters': []},
+    {
+        'filters': [FilterData("greater_than", "market_cap", "numeric", 2500)],
+        'sort_by': 'market_cap',
+        'sort_order': 'desc',
+        'page': 2,
+        'page_size': 2,
+    },
+    {
+        'filters': [FilterData("equals", "primary_exchange", "categoric", "nyse")],
+        'sort_by': 'market_cap',
+        'page_size': 3,
+    },
+]
+
+
+@pytest.mark.parametrize("engine", [None, ColumnarScreenerEngine()])
+def test_batch_matches_individual_queries(batch_stocks, engine):
+    results = Screener(engine=engine).query_batch(BATCH)
+
+    for request, result in zip(BATCH, results):
+        expected = Screener().query_page(**request)
+        assert [s.symbol for s in result['stocks']] == [s.symbol for s in expected['stocks']]
+        assert result['total_count'] == expected['total_count']
+        assert result['has_next'] == expected['has_next']
+
+
+def test_batch_counts_share_one_aggregate(batch_stocks, django_assert_num_queries):
+    # One aggregate for every total, then one page fetch per screen.
+    with django_assert_num_queries(1 + len(BATCH)):
+        Screener().query_batch(BATCH)
+
+
+def test_batch_endpoint(batch_stocks):
+    client = Client()
+    response = client.post(
+        '/screeners/database/batch/',
+        data=json.dumps({'screeners': [
+            {'name': 'all', 'filters': [], 'per_page': 5},
+            {
+                'name': 'big',
+                'filters': [{'operator': 'greater_than', 'operand': 'market_cap',
+                             'filter_type': 'numeric', 'value': 6500}],
+                'sort_by': 'market_cap',
+            },
+        ]}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    results = json.loads(response.content)['results']
+    assert [r['name'] for r in results] == ['all', 'big']
+    assert results[0]['pagination']['total_count'] == 8
+    assert results[0]['count'] == 5
+    assert [s['symbol'] for s in results[1]['stocks']] == ['B6', 'B7']
+
+    response = client.post(
+        '/screeners/database/batch/',
+        data=json.dumps({'screeners': [{'filters': [{'operand': 'market_cap'}]}]}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("screen", [
+    {'filters': [], 'sort_by': 'no_such_field'},
+    {'filters': [], 'sort_by': ['market_cap']},
+    {'filters': [], 'sort_by': 'market_cap', 'sort_order': 'sideways'},
+])
+def test_batch_endpoint_rejects_unknown_sort(batch_stocks, screen):
+    response = Client().post(
+        '/screeners/database/batch/',
+        data=json.dumps({'screeners': [{'filters': []}, screen]}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 400
+    assert json.loads(response.content)['error'].startswith('Screener 1: sort_')
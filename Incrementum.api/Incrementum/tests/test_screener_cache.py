@@ -0,0 +1,105 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from Incrementum.screener import Screener
+from Incrementum.screener_cache import ScreenerResultCache, get_screener_result_cache
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def cached_stocks(db):
+    cache.clear()
+    for index in range(5):
+        StockModel.objects.create(
+            symbol=f"R{index}",
+            company_name=f"Company {index}",
+            market_cap=(index + 1) * 1000,
+            sic_description="Software" if index % 2 else "Retail",
+        )
+
+
+def test_repeated_request_is_served_from_cache(cached_stocks, django_assert_num_queries):
+    result_cache = ScreenerResultCache()
+    screener = Screener(result_cache=result_cache)
+    filters = [FilterData("greater_than", "market_cap", "numeric", 1500)]
+
+    first = screener.query_page(filters, sort_by='market_cap', page_size=2)
+    with django_assert_num_queries(0):
+        second = screener.query_page(filters, sort_by='market_cap', page_size=2)
+
+    assert [s.symbol for s in second['stocks']] == [s.symbol for s in first['stocks']]
+    assert second['total_count'] == 4
+    assert (result_cache.hits, result_cache.misses) == (1, 1)
+
+
+def test_cache_key_is_canonical(cached_stocks):
+    result_cache = ScreenerResultCache()
+    a = FilterData("greater_than", "market_cap", "numeric", 1500)
+    b = FilterData("equals", "industry", "categoric", "software")
+
+    assert result_cache.make_key([a, b], page_size=10) == \
+        result_cache.make_key([b, a], page_size=10)
+    assert result_cache.make_key([a], page=1, page_size=10) != \
+        result_cache.make_key([a], page=2, page_size=10)
+    assert result_cache.make_key([a], 'market_cap', 'asc') != \
+        result_cache.make_key([a], 'market_cap', 'desc')
+
+
+def test_data_write_invalidates_cached_results(cached_stocks):
+    result_cache = ScreenerResultCache()
+    screener = Screener(result_cache=result_cache)
+    filters = [FilterData("equals", "industry", "categoric", "software")]
+
+    assert screener.query_page(filters)['total_count'] == 2
+
+    StockModel.objects.create(
+        symbol="R9", company_name="New", sic_description="Software"
+    )
+
+    assert screener.query_page(filters)['total_count'] == 3
+    assert result_cache.hits == 0
+
+
+def test_oversized_entries_are_not_stored(cached_stocks):
+    result_cache = ScreenerResultCache(max_entry_bytes=16)
+    screener = Screener(result_cache=result_cache)
+
+    screener.query_page([])
+    screener.query_page([])
+
+    assert result_cache.hits == 0
+    assert result_cache.misses == 2
+
+
+def test_result_cache_needs_a_shared_backend(tmp_path):
+    local = {'screener': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    shared = {'screener': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+
+    with override_settings(
+        SCREENER_RESULT_CACHE_ENABLED=True, SCREENER_CACHE_ALIAS='screener', CACHES=local
+    ):
+        assert get_screener_result_cache() is None
+    with override_settings(
+        SCREENER_RESULT_CACHE_ENABLED=True, SCREENER_CACHE_ALIAS='screener', CACHES=shared
+    ):
+        assert isinstance(get_screener_result_cache(), ScreenerResultCache)
+
+
+def test_bar_writes_do_not_bump_the_generation(cached_stocks):
+    result_cache = ScreenerResultCache()
+    before = result_cache.make_key([])
+
+    StockHistory.objects.create(
+        stock_symbol_id="R0", day_and_time=timezone.now(), open_price=1,
+        close_price=1, high=1, low=1, volume=1,
+    )
+
+    assert result_cache.make_key([]) == before
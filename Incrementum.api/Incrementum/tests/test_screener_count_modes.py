@@ -0,0 +1,109 @@
+import pytest
+import json
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.test import Client
+from Incrementum.screener import Screener, canonical_filters_key
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def count_stocks(db):
+    cache.clear()
+    for index in range(7):
+        StockModel.objects.create(
+            symbol=f"C{index}",
+            company_name=f"Company {index}",
+            market_cap=(index + 1) * 1000,
+        )
+
+
+def test_exact_count_mode(count_stocks):
+    result = Screener().query_page([], page=2, page_size=3)
+
+    assert result['count_mode'] == 'exact'
+    assert result['total_count'] == 7
+    assert result['has_next'] is True
+    assert [s.symbol for s in result['stocks']] == ['C3', 'C4', 'C5']
+
+
+def test_none_count_mode_uses_extra_row(count_stocks, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        result = Screener().query_page([], page=2, page_size=3, count_mode='none')
+
+    assert result['total_count'] is None
+    assert result['has_next'] is True
+    assert len(result['stocks']) == 3
+
+    last = Screener().query_page([], page=3, page_size=3, count_mode='none')
+    assert last['has_next'] is False
+    assert [s.symbol for s in last['stocks']] == ['C6']
+
+
+def test_cached_count_mode_reuses_count_until_data_changes(
+    count_stocks, django_assert_num_queries
+):
+    filters = [FilterData("greater_than", "market_cap", "numeric", 2500)]
+    first = Screener().query_page(filters, page_size=2, count_mode='cached')
+    assert first['total_count'] == 5
+    assert first['count_mode'] == 'cached'
+
+    with django_assert_num_queries(1):
+        again = Screener().query_page(filters, page_size=2, count_mode='cached')
+    assert again['total_count'] == 5
+
+    StockModel.objects.create(symbol="C9", company_name="New", market_cap=9000)
+    refreshed = Screener().query_page(filters, page_size=2, count_mode='cached')
+    assert refreshed['total_count'] == 6
+
+
+def test_estimated_count_mode_falls_back_to_exact_off_postgres(count_stocks):
+    result = Screener().query_page([], page_size=3, count_mode='estimated')
+
+    assert result['count_mode'] == 'exact'
+    assert result['total_count'] == 7
+
+
+@patch('Incrementum.screener.connection')
+def test_estimated_count_reads_planner_rows(mock_connection):
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ([{'Plan': {'Plan Rows': 4200}}],)
+    mock_connection.cursor.return_value.__enter__.return_value = cursor
+
+    total = Screener()._estimated_count(StockModel.objects.all())
+
+    assert total == 4200
+    assert cursor.execute.call_args[0][0].startswith('EXPLAIN (FORMAT JSON) ')
+
+
+def test_canonical_filters_key_ignores_order():
+    a = FilterData("greater_than", "market_cap", "numeric", 10)
+    b = FilterData("equals", "industry", "categoric", "Software")
+
+    assert canonical_filters_key([a, b]) == canonical_filters_key([b, a])
+    assert canonical_filters_key([a]) != canonical_filters_key([b])
+
+
+def test_database_screener_reports_count_mode(count_stocks):
+    client = Client()
+    response = client.post(
+        '/screeners/database/?count_mode=none',
+        data=json.dumps({'filters': [], 'per_page': 5}),
+        content_type='application/json'
+    )
+    data = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert data['pagination']['count_mode'] == 'none'
+    assert data['pagination']['total_count'] is None
+    assert data['pagination']['has_next'] is True
+
+    response = client.post(
+        '/screeners/database/',
+        data=json.dumps({'filters': [], 'count_mode': 'bogus'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
@@ -0,0 +1,177 @@
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def engine_stocks(db):
+    """Create a small universe with numeric, categorical and history data."""
+    stocks = [
+        StockModel.objects.create(
+            symbol="AAPL",
+            company_name="Apple Inc.",
+            market_cap=3000000000000,
+            primary_exchange="NASDAQ",
+            sic_description="Electronic Computers",
+            price_per_earnings=2850,
+        ),
+        StockModel.objects.create(
+            symbol="MSFT",
+            company_name="Microsoft Corporation",
+            market_cap=2800000000000,
+            primary_exchange="NASDAQ",
+            sic_description="Prepackaged Software",
+            price_per_earnings=3400,
+        ),
+        StockModel.objects.create(
+            symbol="F",
+            company_name="Ford Motor Company",
+            market_cap=50000000000,
+            primary_exchange="NYSE",
+            sic_description="Motor Vehicles",
+            price=1200,
+        ),
+        StockModel.objects.create(
+            symbol="AMD",
+            company_name="Advanced Micro Devices",
+            market_cap=None,
+            primary_exchange="NASDAQ",
+            sic_description="Semiconductors",
+        ),
+    ]
+    bar_time = datetime(2025, 12, 26, 12, 0, tzinfo=dt_timezone.utc)
+    for stock, close, volume in ((stocks[0], 19000, 500), (stocks[1], 41000, 300)):
+        StockHistory.objects.create(
+            stock_symbol=stock,
+            day_and_time=bar_time,
+            open_price=close,
+            close_price=close,
+            high=close,
+            low=close,
+            volume=volume,
+        )
+    return stocks
+
+
+FILTER_CASES = [
+    [],
+    [FilterData("greater_than", "market_cap", "numeric", 1000000000000)],
+    [FilterData("less_than_or_equal", "price_per_earnings", "numeric", 30)],
+    [FilterData("equals", "ticker", "string", "aapl")],
+    [FilterData("contains", "ticker", "string", "A*")],
+    [FilterData("contains", "industry", "categoric", "soft")],
+    [
+        FilterData("equals", "primary_exchange", "categoric", "nyse"),
+        FilterData("equals", "primary_exchange", "categoric", "NASDAQ"),
+        FilterData("greater_than", "market_cap", "numeric", 100000000000),
+    ],
+    [
+        FilterData("greater_than", "market_cap", "numeric", 1000000000),
+        FilterData("less_than", "market_cap", "numeric", 2900000000000),
+    ],
+    [FilterData("greater_than", "pps", "numeric", 100)],
+    [FilterData("greater_than", "volume", "numeric", 400)],
+]
+
+
+@pytest.mark.parametrize("filters", FILTER_CASES)
+def test_engine_matches_database_path(engine_stocks, filters):
+    """Every filter case returns the same symbols from both paths."""
+    expected, expected_total = Screener().query(filters)
+    result, total = Screener(engine=ColumnarScreenerEngine()).query(filters)
+
+    assert total == expected_total
+    assert sorted(s.symbol for s in result) == sorted(s.symbol for s in expected)
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [
+    (None, 'asc'),
+    ('market_cap', 'asc'),
+    ('market_cap', 'desc'),
+    ('pps', 'desc'),
+    ('company_name', 'asc'),
+])
+def test_engine_sort_and_pagination(engine_stocks, sort_by, sort_order):
+    """Sorting excludes NULL keys and pages like the database path."""
+    expected, expected_total = Screener().query(
+        [], sort_by=sort_by, sort_order=sort_order
+    )
+    engine = ColumnarScreenerEngine()
+    result, total = engine.query([], sort_by=sort_by, sort_order=sort_order)
+
+    assert total == expected_total
+    assert [s.symbol for s in result] == [s.symbol for s in expected]
+
+    page, _ = engine.query(
+        [], sort_by=sort_by, sort_order=sort_order, page=2, page_size=1
+    )
+    assert [s.symbol for s in page] == [s.symbol for s in expected][1:2]
+
+
+def test_engine_falls_back_for_unknown_fields(engine_stocks):
+    """Fields outside the snapshot are left to the database path."""
+    engine = ColumnarScreenerEngine()
+    filters = [FilterData("greater_than", "list_date", "numeric", "2020-01-01")]
+
+    assert engine.query(filters) is None
+
+
+def test_engine_refresh_after_invalidate(engine_stocks):
+    """Snapshots are reused until invalidated, then reloaded."""
+    engine = ColumnarScreenerEngine(max_age_seconds=None)
+    filters = [FilterData("equals", "ticker", "string", "NVDA")]
+
+    assert engine.query(filters) == ([], 0)
+    version = engine.version
+
+    # bulk_create skips save signals, so nothing tells the engine yet.
+    StockModel.objects.bulk_create(
+        [StockModel(symbol="NVDA", company_name="NVIDIA Corporation")]
+    )
+    assert engine.query(filters) == ([], 0)
+
+    engine.invalidate()
+    result, total = engine.query(filters)
+    assert total == 1
+    assert result[0].symbol == "NVDA"
+    assert engine.version == version + 1
+
+
+def test_engine_reloads_on_data_generation_bump(engine_stocks):
+    engine = ColumnarScreenerEngine(max_age_seconds=None)
+    filters = [FilterData("equals", "ticker", "string", "NVDA")]
+    assert engine.query(filters) == ([], 0)
+
+    StockModel.objects.create(symbol="NVDA", company_name="NVIDIA Corporation")
+
+    result, total = engine.query(filters)
+    assert total == 1
+
+
+def test_categorical_filters_resolve_through_bitmaps(engine_stocks):
+    engine = ColumnarScreenerEngine()
+    snapshot = engine.snapshot()
+    column = snapshot.strings['primary_exchange']
+
+    # One packed row per exchange plus NULL, eight stocks per byte.
+    assert column.bitmaps.shape == (len(column.categories) + 1, 1)
+    assert snapshot.strings['symbol'].bitmaps is None
+
+    filters = [
+        FilterData("equals", "industry", "categoric", "motor vehicles"),
+        FilterData("contains", "industry", "categoric", "software"),
+        FilterData("equals", "primary_exchange", "categoric", "nasdaq"),
+        FilterData("equals", "primary_exchange", "categoric", "nyse"),
+    ]
+    expected, _ = Screener().query(filters)
+    result, _ = engine.query(filters)
+    assert sorted(s.symbol for s in result) == sorted(s.symbol for s in expected) == ["F", "MSFT"]
+
+    filters.append(FilterData("equals", "type", "categoric", "ETF"))
+    assert engine.query(filters) == ([], 0)
@@ -0,0 +1,69 @@
+import pytest
+import csv
+import io
+import json
+from django.test import Client
+from Incrementum.screener import Screener
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def export_stocks(db):
+    for index in range(7):
+        StockModel.objects.create(
+            symbol=f"X{index}",
+            company_name=f"Export {index}",
+            market_cap=(index + 1) * 1000,
+        )
+
+
+def test_iterate_reads_in_chunks(export_stocks):
+    filters = [FilterData("greater_than", "market_cap", "numeric", 2500)]
+    expected, _ = Screener().query(filters, sort_by='market_cap', sort_order='desc')
+
+    rows = Screener().iterate(filters, sort_by='market_cap', sort_order='desc', chunk_size=2)
+
+    assert not isinstance(rows, list)
+    assert [s.symbol for s in rows] == [s.symbol for s in expected]
+
+
+def test_export_streams_ndjson(export_stocks):
+    response = Client().post(
+        '/screeners/database/export/',
+        data=json.dumps({'filters': [], 'sort_by': 'market_cap'}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)['symbol'] for line in lines] == [f"X{i}" for i in range(7)]
+
+
+def test_export_streams_csv(export_stocks):
+    response = Client().post(
+        '/screeners/database/export/?format=csv',
+        data=json.dumps({'filters': [{'operator': 'less_than', 'operand': 'market_cap',
+                                      'filter_type': 'numeric', 'value': 3500}]}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/csv'
+    body = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [row['symbol'] for row in rows] == ['X0', 'X1', 'X2']
+    assert rows[0]['market_cap'] == '1000'
+
+
+def test_export_rejects_unknown_format(export_stocks):
+    response = Client().post(
+        '/screeners/database/export/?format=xml',
+        data=json.dumps({'filters': []}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
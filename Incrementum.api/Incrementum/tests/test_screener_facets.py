@@ -0,0 +1,123 @@
+import pytest
+import json
+from unittest.mock import patch
+from django.test import Client
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def facet_stocks(db):
+    rows = [
+        ("A1", 100_000_000, "NYSE", "Software", "CS", 500),
+        ("A2", 5_000_000_000, "NYSE", "Software", "CS", 1500),
+        ("A3", 50_000_000_000, "NASDAQ", "Retail", "CS", -200),
+        ("A4", 500_000_000_000, "NASDAQ", "Software", "ADRC", 6000),
+        ("A5", None, "NASDAQ", None, None, None),
+    ]
+    for symbol, cap, exchange, industry, kind, pe in rows:
+        StockModel.objects.create(
+            symbol=symbol,
+            company_name=symbol,
+            market_cap=cap,
+            primary_exchange=exchange,
+            sic_description=industry,
+            type=kind,
+            price_per_earnings=pe,
+        )
+
+
+def _counts(buckets):
+    return [bucket['count'] for bucket in buckets]
+
+
+def test_database_facets(facet_stocks):
+    facets = Screener().facets([])
+
+    assert facets['sic_description'] == [
+        {'value': 'Software', 'count': 3},
+        {'value': 'Retail', 'count': 1},
+    ]
+    assert facets['primary_exchange'][0] == {'value': 'NASDAQ', 'count': 3}
+    assert _counts(facets['market_cap']) == [1, 0, 1, 1, 1]
+    assert facets['market_cap'][0] == {'min': None, 'max': 300_000_000, 'count': 1}
+    # P/E is stored x100: -2, 5, 15 and 60.
+    assert _counts(facets['price_per_earnings']) == [1, 1, 1, 0, 0, 1]
+
+
+@pytest.mark.parametrize("filters", [
+    [],
+    [FilterData("equals", "primary_exchange", "categoric", "nasdaq")],
+    [FilterData("greater_than", "market_cap", "numeric", 1_000_000_000)],
+])
+def test_engine_facets_match_database(facet_stocks, filters):
+    expected = Screener().facets(filters, sort_by='market_cap')
+    assert ColumnarScreenerEngine().facets(filters, sort_by='market_cap') == expected
+
+
+def test_query_page_and_endpoint_return_facets(facet_stocks):
+    result = Screener().query_page([], page_size=1, facets=True)
+    assert len(result['stocks']) == 1
+    assert result['facets']['type'][0] == {'value': 'CS', 'count': 3}
+
+    response = Client().post(
+        '/screeners/database/?facets=true',
+        data=json.dumps({
+            'filters': [{'operator': 'equals', 'operand': 'industry',
+                         'filter_type': 'categoric', 'value': 'software'}],
+            'per_page': 1,
+        }),
+        content_type='application/json'
+    )
+    data = json.loads(response.content)
+    assert data['facets']['sic_description'] == [{'value': 'Software', 'count': 3}]
+    assert 'facets' not in json.loads(Client().post(
+        '/screeners/database/', data=json.dumps({'filters': []}),
+        content_type='application/json'
+    ).content)
+
+
+def test_database_page_and_facets_share_one_scan(facet_stocks, django_assert_num_queries):
+    filters = [FilterData("equals", "primary_exchange", "categoric", "nasdaq")]
+
+    # One GROUP BY for the total and every facet, one page fetch.
+    with django_assert_num_queries(2):
+        result = Screener().query_page(filters, page_size=2, count_mode='none', facets=True)
+
+    assert (result['total_count'], result['count_mode'], result['has_next']) == (3, 'exact', True)
+    assert [s.symbol for s in result['stocks']] == ['A3', 'A4']
+    assert result['facets'] == Screener().facets(filters)
+
+
+def test_engine_page_and_facets_evaluate_filters_once(facet_stocks):
+    filters = [FilterData("greater_than", "market_cap", "numeric", 1_000_000_000)]
+    engine = ColumnarScreenerEngine()
+    expected = Screener().query_page(filters, page_size=1, sort_by='market_cap', facets=True)
+
+    with patch.object(engine, 'matching_indices', wraps=engine.matching_indices) as match:
+        result = Screener(engine=engine).query_page(
+            filters, page_size=1, sort_by='market_cap', facets=True
+        )
+
+    assert match.call_count == 1
+    assert result['facets'] == expected['facets']
+    assert result['total_count'] == expected['total_count'] == 3
+    assert [s.symbol for s in result['stocks']] == ['A2']
+
+
+@pytest.mark.parametrize("flag, expected", [
+    (True, True), ("true", True), ("1", True), (1, True),
+    (False, False), ("false", False), ("0", False), (0, False), (None, False),
+])
+def test_endpoint_parses_facets_flag_from_body(facet_stocks, flag, expected):
+    response = Client().post(
+        '/screeners/database/',
+        data=json.dumps({'filters': [], 'per_page': 1, 'facets': flag}),
+        content_type='application/json'
+    )
+    assert response.status_code == 200
+    assert ('facets' in json.loads(response.content)) is expected
@@ -0,0 +1,161 @@
+import pytest
+import json
+from django.test import Client
+from Incrementum.screener import Screener
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def keyset_stocks(db):
+    """Eleven stocks with repeated market caps so ties need the symbol key."""
+    caps = [500, 300, 300, 300, 100, 900, 700, 700, None, 200, 300]
+    for index, cap in enumerate(caps):
+        StockModel.objects.create(
+            symbol=f"S{index:02d}",
+            company_name=f"Stock {index}",
+            market_cap=cap,
+            primary_exchange="NYSE" if index % 2 else "NASDAQ",
+        )
+
+
+def _walk_forward(screener, filters, sort_by, sort_order, page_size):
+    pages = []
+    cursor = None
+    while True:
+        result = screener.query_keyset(
+            filters, sort_by=sort_by, sort_order=sort_order,
+            page_size=page_size, cursor=cursor,
+        )
+        pages.append(result)
+        cursor = result['next_cursor']
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [
+    (None, 'asc'),
+    ('market_cap', 'asc'),
+    ('market_cap', 'desc'),
+])
+def test_keyset_pages_match_offset_order(keyset_stocks, sort_by, sort_order):
+    """Walking cursors visits every row once, in the offset path's order."""
+    screener = Screener()
+    expected, total = screener.query([], sort_by=sort_by, sort_order=sort_order)
+
+    pages = _walk_forward(screener, [], sort_by, sort_order, page_size=3)
+    walked = [s.symbol for page in pages for s in page['stocks']]
+
+    assert walked == [s.symbol for s in expected]
+    assert len(walked) == total
+    assert pages[0]['prev_cursor'] is None
+    assert all(page['prev_cursor'] for page in pages[1:])
+
+
+def test_keyset_prev_cursor_returns_previous_page(keyset_stocks):
+    screener = Screener()
+    pages = _walk_forward(screener, [], 'market_cap', 'desc', page_size=3)
+
+    back = screener.query_keyset(
+        [], sort_by='market_cap', sort_order='desc',
+        page_size=3, cursor=pages[2]['prev_cursor'],
+    )
+
+    assert [s.symbol for s in back['stocks']] == [s.symbol for s in pages[1]['stocks']]
+    assert back['next_cursor'] is not None
+    assert back['prev_cursor'] is not None
+
+
+def test_keyset_applies_filters(keyset_stocks):
+    screener = Screener()
+    filters = [FilterData("equals", "primary_exchange", "categoric", "nyse")]
+    expected, _ = screener.query(filters, sort_by='market_cap')
+
+    pages = _walk_forward(screener, filters, 'market_cap', 'asc', page_size=2)
+
+    assert [s.symbol for p in pages for s in p['stocks']] == [s.symbol for s in expected]
+
+
+def test_keyset_rejects_cursor_for_other_sort(keyset_stocks):
+    screener = Screener()
+    first = screener.query_keyset([], sort_by='market_cap', page_size=2)
+
+    with pytest.raises(ValueError):
+        screener.query_keyset(
+            [], sort_by='market_cap', sort_order='desc',
+            page_size=2, cursor=first['next_cursor'],
+        )
+    with pytest.raises(ValueError):
+        screener.query_keyset([], page_size=2, cursor='not-a-cursor')
+
+
+def test_keyset_rejects_cursor_for_other_filters(keyset_stocks):
+    screener = Screener()
+    nyse = [FilterData("equals", "primary_exchange", "categoric", "nyse")]
+    first = screener.query_keyset(nyse, sort_by='market_cap', page_size=2)
+
+    with pytest.raises(ValueError):
+        screener.query_keyset([], sort_by='market_cap', page_size=2,
+                              cursor=first['next_cursor'])
+    # Filter order does not change the screen, so the cursor still applies.
+    both = nyse + [FilterData("greater_than", "market_cap", "numeric", 100)]
+    first = screener.query_keyset(both, sort_by='market_cap', page_size=1)
+    screener.query_keyset(list(reversed(both)), sort_by='market_cap', page_size=1,
+                          cursor=first['next_cursor'])
+
+
+def test_database_screener_endpoint_cursor_mode(keyset_stocks):
+    client = Client()
+    response = client.post(
+        '/screeners/database/',
+        data=json.dumps({'filters': [], 'per_page': 4, 'cursor': None}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    data = json.loads(response.content)
+    assert data['pagination']['mode'] == 'cursor'
+    assert data['pagination']['has_prev'] is False
+    assert [s['symbol'] for s in data['stocks']] == ['S00', 'S01', 'S02', 'S03']
+
+    response = client.post(
+        '/screeners/database/',
+        data=json.dumps({
+            'filters': [],
+            'per_page': 4,
+            'cursor': data['pagination']['next_cursor'],
+        }),
+        content_type='application/json'
+    )
+    data = json.loads(response.content)
+    assert [s['symbol'] for s in data['stocks']] == ['S04', 'S05', 'S06', 'S07']
+
+
+def test_database_screener_endpoint_rejects_non_string_cursor(keyset_stocks):
+    response = Client().post(
+        '/screeners/database/',
+        data=json.dumps({'filters': [], 'cursor': {'k': 1}}),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 400
+
+
+def test_database_stocks_endpoint_cursor_mode(keyset_stocks):
+    client = Client()
+    response = client.get('/stocks/database/', {'cursor': '', 'limit': 6})
+    data = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert data['count'] == 6
+    assert data['prev_cursor'] is None
+
+    response = client.get('/stocks/database/', {'cursor': data['next_cursor'], 'limit': 6})
+    data = json.loads(response.content)
+    assert [s['symbol'] for s in data['stocks']] == ['S06', 'S07', 'S08', 'S09', 'S10']
+    assert data['next_cursor'] is None
+
+    response = client.get('/stocks/database/', {'cursor': 'garbage'})
+    assert response.status_code == 400
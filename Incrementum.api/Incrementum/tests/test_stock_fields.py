@@ -0,0 +1,79 @@
+import pytest
+import json
+from decimal import Decimal
+from django.test import Client
+from Incrementum.models.stock import StockModel, parse_stock_fields, stock_columns
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def field_stocks(db):
+    for index in range(3):
+        StockModel.objects.create(
+            symbol=f"F{index}",
+            company_name=f"Fields {index}",
+            description="x" * 500,
+            market_cap=(index + 1) * 1000,
+            day_percent_change=Decimal('1.5'),
+        )
+
+
+def test_parse_stock_fields():
+    assert parse_stock_fields(None) is None
+    assert parse_stock_fields('') is None
+    assert parse_stock_fields('symbol, price,symbol') == ['symbol', 'price']
+    assert parse_stock_fields(['market_cap']) == ['market_cap']
+    with pytest.raises(ValueError):
+        parse_stock_fields('symbol,password')
+
+
+def test_to_dict_projection_reads_only_requested_columns(
+    field_stocks, django_assert_num_queries
+):
+    fields = ['symbol', 'market_cap', 'percent_change']
+    with django_assert_num_queries(1):
+        stocks = list(StockModel.objects.only(*stock_columns(fields)).order_by('symbol'))
+        data = [stock.to_dict(fields) for stock in stocks]
+
+    assert data[0] == {'symbol': 'F0', 'market_cap': 1000, 'percent_change': 1.5}
+    assert set(StockModel.objects.get(symbol='F0').to_dict()) >= {'description', 'eps'}
+
+
+def test_screener_endpoint_projects_fields(field_stocks):
+    response = Client().post(
+        '/screeners/database/?fields=symbol,company_name',
+        data=json.dumps({'filters': [], 'sort_by': 'market_cap', 'sort_order': 'desc'}),
+        content_type='application/json'
+    )
+    data = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert data['stocks'][0] == {'symbol': 'F2', 'company_name': 'Fields 2'}
+
+    response = Client().post(
+        '/screeners/database/',
+        data=json.dumps({'filters': [], 'fields': ['nope']}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+
+def test_database_and_bulk_endpoints_project_fields(field_stocks):
+    client = Client()
+    data = json.loads(client.get(
+        '/stocks/database/', {'fields': 'symbol,market_cap', 'limit': 2}
+    ).content)
+    assert data['stocks'] == [
+        {'symbol': 'F0', 'market_cap': 1000},
+        {'symbol': 'F1', 'market_cap': 2000},
+    ]
+
+    response = client.post(
+        '/stocks/bulk/?fields=symbol,description',
+        data=json.dumps({'tickers': ['F1']}),
+        content_type='application/json'
+    )
+    assert json.loads(response.content)['stocks'] == [
+        {'symbol': 'F1', 'description': 'x' * 500}
+    ]
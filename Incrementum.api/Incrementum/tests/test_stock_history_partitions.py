@@ -0,0 +1,105 @@
+import pytest
+from datetime import date
+from unittest.mock import MagicMock, patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from Incrementum.services.stock_history_partition_service import (
+    StockHistoryPartitionService,
+    partition_month,
+)
+
+
+def _mock_cursor(mock_connection):
+    cursor = MagicMock()
+    mock_connection.cursor.return_value.__enter__.return_value = cursor
+    mock_connection.ops.quote_name.side_effect = lambda name: f'"{name}"'
+    return cursor
+
+
+def test_partition_month_parses_monthly_names():
+    assert partition_month('stock_history_2025_03') == date(2025, 3, 1)
+    assert partition_month('stock_history_default') is None
+
+
+@patch('Incrementum.services.stock_history_partition_service.connection')
+def test_ensure_creates_current_and_upcoming_months(mock_connection):
+    cursor = _mock_cursor(mock_connection)
+    cursor.fetchall.return_value = []
+    cursor.fetchone.side_effect = [('a',), ('b',), ('c',)]
+
+    created = StockHistoryPartitionService.ensure(months_ahead=2, today=date(2025, 11, 20))
+
+    assert created == ['a', 'b', 'c']
+    months = [call[0][1][0] for call in cursor.execute.call_args_list[1:]]
+    assert months == [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1)]
+
+
+@patch('Incrementum.services.stock_history_partition_service.connection')
+def test_ensure_covers_months_stranded_in_default_and_backfills(mock_connection):
+    cursor = _mock_cursor(mock_connection)
+    cursor.fetchall.return_value = [(date(2019, 6, 1),), (date(2025, 9, 1),)]
+    cursor.fetchone.side_effect = lambda: ('stock_history_x',)
+
+    StockHistoryPartitionService.ensure(
+        months_ahead=0, today=date(2025, 11, 20), since=date(2025, 9, 15)
+    )
+
+    assert 'stock_history_default' in cursor.execute.call_args_list[0][0][0]
+    months = [call[0][1][0] for call in cursor.execute.call_args_list[1:]]
+    assert months == [
+        date(2019, 6, 1), date(2025, 9, 1), date(2025, 10, 1), date(2025, 11, 1)
+    ]
+
+
+@patch('Incrementum.services.stock_history_partition_service.connection')
+def test_detach_before_only_touches_older_months(mock_connection):
+    cursor = _mock_cursor(mock_connection)
+    cursor.fetchall.return_value = [
+        ('stock_history_2024_12',),
+        ('stock_history_default',),
+        ('stock_history_2025_01',),
+        ('stock_history_2025_02',),
+    ]
+
+    detached = StockHistoryPartitionService.detach_before(date(2025, 2, 1), drop=True)
+
+    assert detached == ['stock_history_2024_12', 'stock_history_2025_01']
+    statements = [call[0][0] for call in cursor.execute.call_args_list[1:]]
+    assert statements == [
+        'ALTER TABLE stock_history DETACH PARTITION "stock_history_2024_12"',
+        'DROP TABLE "stock_history_2024_12"',
+        'ALTER TABLE stock_history DETACH PARTITION "stock_history_2025_01"',
+        'DROP TABLE "stock_history_2025_01"',
+    ]
+
+
+@patch('Incrementum.services.stock_history_partition_service.connection')
+def test_attach_binds_partition_to_its_month(mock_connection):
+    cursor = _mock_cursor(mock_connection)
+
+    StockHistoryPartitionService.attach('stock_history_2024_12')
+
+    sql, params = cursor.execute.call_args[0]
+    assert 'ATTACH PARTITION "stock_history_2024_12"' in sql
+    assert params == [date(2024, 12, 1), date(2025, 1, 1)]
+    with pytest.raises(ValueError):
+        StockHistoryPartitionService.attach('stock')
+
+
+@patch('Incrementum.management.commands.stock_history_partitions.connection')
+@patch(
+    'Incrementum.management.commands.stock_history_partitions.'
+    'StockHistoryPartitionService.ensure'
+)
+def test_ensure_command_passes_since_month(mock_ensure, mock_connection):
+    mock_connection.vendor = 'postgresql'
+    mock_ensure.return_value = ['stock_history_2024_01']
+
+    call_command('stock_history_partitions', 'ensure', '--since', '2024-01')
+
+    mock_ensure.assert_called_once_with(2, since=date(2024, 1, 1))
+
+
+def test_stock_history_partitions_requires_postgres():
+    with pytest.raises(CommandError):
+        call_command('stock_history_partitions', 'list')
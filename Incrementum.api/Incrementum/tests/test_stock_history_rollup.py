@@ -0,0 +1,152 @@
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import connection
+from django.utils import timezone
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
+from Incrementum.models.stock_history_rollup import StockHistoryRollup
+from Incrementum.stock_history_service import StockHistoryService
+
+pytestmark = pytest.mark.django_db
+
+
+def _bar(stock, when, open_price, close, high, low, volume, is_hourly):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=open_price,
+        close_price=close,
+        high=high,
+        low=low,
+        volume=volume,
+        is_hourly=is_hourly,
+    )
+
+
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="NVDA", company_name="NVIDIA Corporation")
+
+
+def test_minute_bars_roll_up_out_of_order(stock):
+    start = datetime(2025, 12, 17, 14, 0, tzinfo=dt_timezone.utc)  # a Wednesday
+    _bar(stock, start + timedelta(minutes=7), 105, 108, 110, 104, 30, False)
+    _bar(stock, start + timedelta(minutes=2), 100, 104, 106, 99, 10, False)
+    _bar(stock, start + timedelta(minutes=12), 108, 107, 109, 101, 20, False)
+
+    five = StockHistoryRollup.objects.filter(
+        stock_symbol=stock, bucket_interval='5m'
+    ).order_by('bucket')
+    assert [(r.bucket.minute, r.open_price, r.close_price) for r in five] == [
+        (0, 100, 104),
+        (5, 105, 108),
+        (10, 108, 107),
+    ]
+
+    hour = StockHistoryRollup.objects.get(stock_symbol=stock, bucket_interval='1h')
+    assert hour.bucket == start
+    assert (hour.open_price, hour.close_price) == (100, 107)
+    assert (hour.high, hour.low, hour.volume) == (110, 99, 60)
+
+    week = StockHistoryRollup.objects.get(
+        stock_symbol=stock, bucket_interval='1wk', is_hourly=False
+    )
+    assert week.bucket == datetime(2025, 12, 21, tzinfo=dt_timezone.utc)
+
+
+def test_hourly_bars_only_feed_daily_and_weekly(stock):
+    start = datetime(2025, 12, 17, 14, 0, tzinfo=dt_timezone.utc)
+    _bar(stock, start, 100, 110, 115, 95, 500, True)
+
+    intervals = set(
+        StockHistoryRollup.objects.filter(stock_symbol=stock).values_list(
+            'bucket_interval', 'is_hourly'
+        )
+    )
+    assert intervals == {('1d', True), ('1wk', True)}
+
+
+def test_history_reads_rollup_without_resampling(stock, monkeypatch):
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in (3, 2):
+        for hour in (14, 15, 16):
+            when = today - timedelta(days=day) + timedelta(hours=hour)
+            _bar(stock, when, 100 + hour, 200 + hour, 300 + hour, 50 + hour, 10, True)
+
+    service = StockHistoryService()
+    monkeypatch.setattr(
+        service, '_aggregate_to_interval',
+        lambda *args: pytest.fail('history() resampled at request time'),
+    )
+    df, metadata = service.history("NVDA", period="1mo", interval="1d")
+
+    assert metadata['records_count'] == 2
+    assert df['open_price'].tolist() == [114, 114]
+    assert df['close_price'].tolist() == [216, 216]
+    assert df['volume'].tolist() == [30, 30]
+    assert df['is_hourly'].all()
+
+
+def test_weekly_history_includes_week_in_progress(stock, monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2025, 12, 17, 12, 0)  # a Wednesday
+
+    monkeypatch.setattr('Incrementum.stock_history_service.datetime', FrozenDatetime)
+    _bar(stock, datetime(2025, 12, 10, 14, tzinfo=dt_timezone.utc), 90, 95, 96, 89, 10, True)
+    _bar(stock, datetime(2025, 12, 15, 14, tzinfo=dt_timezone.utc), 100, 104, 106, 99, 10, True)
+    _bar(stock, datetime(2025, 12, 16, 14, tzinfo=dt_timezone.utc), 104, 108, 110, 103, 20, True)
+
+    df, metadata = StockHistoryService().history("NVDA", period="1mo", interval="1wk")
+
+    assert metadata['records_count'] == 2
+    assert pd.to_datetime(df['day_and_time']).dt.day.tolist() == [14, 21]
+    assert df['open_price'].tolist() == [90, 100]
+    assert df['close_price'].tolist() == [95, 108]
+    assert df['volume'].tolist() == [10, 30]
+
+
+def _rollup(stock, interval):
+    return [
+        (r.bucket.minute, r.open_price, r.close_price, r.high, r.volume)
+        for r in StockHistoryRollup.objects.filter(
+            stock_symbol=stock, bucket_interval=interval, is_hourly=False
+        ).order_by('bucket')
+    ]
+
+
+def test_corrected_and_deleted_bars_rebuild_their_buckets(stock):
+    start = datetime(2025, 12, 17, 14, 0, tzinfo=dt_timezone.utc)
+    _bar(stock, start + timedelta(minutes=1), 100, 104, 106, 99, 10, False)
+    _bar(stock, start + timedelta(minutes=3), 104, 108, 110, 103, 20, False)
+    _bar(stock, start + timedelta(minutes=6), 108, 107, 109, 101, 30, False)
+    _bar(stock, start + timedelta(days=7), 200, 200, 200, 200, 5, False)
+
+    StockHistory.objects.filter(
+        stock_symbol=stock, day_and_time=start + timedelta(minutes=3)
+    ).update(close_price=105, high=107)
+    assert _rollup(stock, '5m')[:2] == [(0, 100, 105, 107, 30), (5, 108, 107, 109, 30)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM stock_history WHERE stock_symbol = %s AND day_and_time = %s",
+            ["NVDA", (start + timedelta(minutes=1)).replace(tzinfo=None)],
+        )
+    assert _rollup(stock, '5m')[:2] == [(0, 104, 105, 107, 20), (5, 108, 107, 109, 30)]
+    hour = StockHistoryRollup.objects.get(
+        stock_symbol=stock, bucket_interval='1h', bucket=start
+    )
+    assert (hour.open_price, hour.volume) == (104, 50)
+
+    StockHistory.objects.filter(
+        stock_symbol=stock, day_and_time=start + timedelta(minutes=6)
+    ).update(day_and_time=start + timedelta(days=7, minutes=30))
+    assert _rollup(stock, '5m') == [
+        (0, 104, 105, 107, 20), (0, 200, 200, 200, 5), (30, 108, 107, 109, 30)
+    ]
+    weeks = StockHistoryRollup.objects.filter(
+        stock_symbol=stock, bucket_interval='1wk', is_hourly=False
+    ).order_by('bucket').values_list('volume', flat=True)
+    assert list(weeks) == [20, 35]
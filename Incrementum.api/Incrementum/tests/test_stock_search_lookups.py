@@ -0,0 +1,114 @@
+import pytest
+import json
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.core.management import CommandError, call_command
+from django.test import Client
+from Incrementum.lookups import (
+    contains_pattern,
+    like_regex,
+    prefix_pattern,
+    wildcard_like_pattern,
+)
+from Incrementum.screener import Screener
+from Incrementum.screener_engine import ColumnarScreenerEngine
+from Incrementum.DTOs.ifilterdata import FilterData
+from Incrementum.models.stock import StockModel
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def search_stocks(db):
+    rows = [
+        ("AAPL", "Apple Inc.", "Electronic Computers"),
+        ("AA", "Alcoa", "Primary Production of Aluminum"),
+        ("BA_B", "Underscore Co", "Prepackaged Software"),
+        ("MSFT", "Microsoft", "Prepackaged Software"),
+        ("ORCL", "Oracle", "Software 100%"),
+    ]
+    for symbol, name, industry in rows:
+        StockModel.objects.create(symbol=symbol, company_name=name, sic_description=industry)
+
+
+def test_like_patterns_escape_metacharacters():
+    assert contains_pattern("100%") == "%100\\%%"
+    assert prefix_pattern("a_b") == "a\\_b%"
+    assert wildcard_like_pattern("A*L") == "A%L"
+
+
+def test_like_regex_reads_patterns_like_ilike():
+    assert like_regex(wildcard_like_pattern("ba_*")).fullmatch("BA_B")
+    assert not like_regex(wildcard_like_pattern("ba_*")).fullmatch("BAXB")
+    assert like_regex(contains_pattern("100%")).fullmatch("Software 100%")
+    assert not like_regex(contains_pattern("100%")).fullmatch("Software 1000")
+    assert like_regex("a_c").fullmatch("ABC")
+
+
+@pytest.mark.parametrize("operand,value", [
+    ("ticker", "BA_*"),
+    ("ticker", "*_*"),
+    ("ticker", "a*"),
+    ("ticker", "%"),
+    ("industry", "*100%"),
+    ("industry", "software*"),
+    ("industry", "pre*soft"),
+])
+def test_wildcards_match_the_same_rows_on_both_paths(search_stocks, operand, value):
+    filters = [FilterData("contains", operand, "string", value)]
+
+    expected, _ = Screener().query(filters)
+    result, _ = Screener(engine=ColumnarScreenerEngine()).query(filters)
+
+    assert sorted(s.symbol for s in result) == sorted(s.symbol for s in expected)
+
+
+def test_contains_filters_use_ilike(search_stocks):
+    qs = Screener().build_queryset([FilterData("contains", "ticker", "string", "A*")])
+    assert " LIKE " in str(qs.query)
+    assert "REGEXP" not in str(qs.query).upper()
+    assert sorted(s.symbol for s in qs) == ["AA", "AAPL"]
+
+    qs = Screener().build_queryset([FilterData("contains", "ticker", "string", "*L")])
+    assert [s.symbol for s in qs] == ["AAPL", "ORCL"]
+
+
+def test_contains_matches_metacharacters_literally(search_stocks):
+    underscore, _ = Screener().query([FilterData("contains", "ticker", "string", "A_")])
+    assert [s.symbol for s in underscore] == ["BA_B"]
+
+    percent, _ = Screener().query([FilterData("contains", "industry", "categoric", "100%")])
+    assert [s.symbol for s in percent] == ["ORCL"]
+
+
+def test_industry_autocomplete_ranks_prefix_matches_first(search_stocks):
+    response = Client().get('/stocks/industry-autocomplete/', {'query': 'soft'})
+    industries = json.loads(response.content)['industries']
+
+    assert industries == ["Software 100%", "Prepackaged Software"]
+
+
+def test_explain_stock_search_requires_postgres():
+    with pytest.raises(CommandError):
+        call_command('explain_stock_search')
+
+
+@patch('Incrementum.management.commands.explain_stock_search.connection')
+def test_explain_stock_search_reports_seq_scans(mock_connection):
+    mock_connection.vendor = 'postgresql'
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [
+        [("Bitmap Heap Scan on stock",), ("Execution Time: 0.1 ms",)],
+        [("Seq Scan on stock",), ("Execution Time: 9.0 ms",)],
+        [("Bitmap Index Scan on stock_sic_description_trgm",)],
+        [("Bitmap Index Scan on stock_sic_description_trgm",)],
+    ]
+    mock_connection.cursor.return_value.__enter__.return_value = cursor
+    out = StringIO()
+
+    call_command('explain_stock_search', stdout=out, no_color=True)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "ticker contains: index Execution Time: 0.1 ms"
+    assert lines[1].startswith("industry contains: SEQ SCAN")
+    assert cursor.execute.call_args_list[0][0][0].startswith("EXPLAIN (ANALYZE, FORMAT TEXT)")
@@ -1,13 +1,37 @@
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone as dt_timezone
 from decimal import Decimal
-from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
 from django.utils import timezone
 
+from Incrementum.models.stock import StockModel
+from Incrementum.models.stock_history import StockHistory
 from Incrementum.yrhilo import day_percent_change
 
 
+@pytest.fixture
+def stock(db):
+    return StockModel.objects.create(symbol="AAPL", company_name="Apple Inc.")
+
+
+def _bar(stock, when, close):
+    return StockHistory.objects.create(
+        stock_symbol=stock,
+        day_and_time=when,
+        open_price=close,
+        close_price=close,
+        high=close,
+        low=close,
+        volume=100,
+    )
+
+
+def _session(day):
+    """The 17:00 UTC bar daily_close records as that day's session close."""
+    return datetime(2026, 3, day, 17, tzinfo=dt_timezone.utc)
+
+
 @patch('Incrementum.yrhilo.connection.cursor')
 @patch('Incrementum.yrhilo.StockModel')
 def test_day_percent_change_uses_fresh_cached_value(mock_stock_model, mock_cursor):
@@ -30,52 +54,21 @@ def test_day_percent_change_uses_fresh_cached_value(mock_stock_model, mock_curso
     mock_stock_model.objects.bulk_update.assert_not_called()
 
 
-@patch('Incrementum.yrhilo.connection.cursor')
-@patch('Incrementum.yrhilo.StockModel')
-def test_day_percent_change_recalculates_and_persists_when_cache_stale(mock_stock_model,
-                                                                       mock_cursor):
-    now = timezone.now()
-
-    cache_qs = MagicMock()
-    cache_qs.values.return_value = [
-        {
-            'symbol': 'AAPL',
-            'day_percent_change': Decimal('1.000000'),
-            'updated_at': now - timedelta(hours=2),
-        }
-    ]
-
-    stock_obj = SimpleNamespace(
-        symbol='AAPL',
-        day_percent_change=None,
-        updated_at=None,
+@pytest.mark.django_db
+def test_day_percent_change_recalculates_and_persists_when_cache_stale(stock):
+    _bar(stock, _session(2), 10000)
+    _bar(stock, _session(3), 11000)
+    StockModel.objects.filter(symbol='AAPL').update(
+        day_percent_change=Decimal('1.000000'),
+        updated_at=timezone.now() - timedelta(hours=2),
     )
 
-    mock_stock_model.objects.filter.side_effect = [cache_qs, [stock_obj]]
-
-    cursor_ctx = MagicMock()
-    cursor = MagicMock()
-    cursor_ctx.__enter__.return_value = cursor
-    cursor_ctx.__exit__.return_value = None
-    mock_cursor.return_value = cursor_ctx
-
-    cursor.fetchall.return_value = [
-        ('AAPL', 110, now),
-        ('AAPL', 100, now - timedelta(days=1)),
-    ]
-
     result = day_percent_change(stocks=['AAPL'])
 
-    assert result['AAPL'] == 10.0
-    cursor.execute.assert_called_once()
-    assert cursor.execute.call_args[0][1] == [['AAPL']]
-
-    mock_stock_model.objects.bulk_update.assert_called_once()
-    updated_objs = mock_stock_model.objects.bulk_update.call_args[0][0]
-    assert len(updated_objs) == 1
-    assert updated_objs[0].symbol == 'AAPL'
-    assert updated_objs[0].day_percent_change == Decimal('10.0')
-    assert updated_objs[0].updated_at is not None
+    assert result == {'AAPL': pytest.approx(10.0)}
+    stock.refresh_from_db()
+    assert stock.day_percent_change == Decimal('10.000000')
+    assert stock.updated_at >= timezone.now() - timedelta(minutes=1)
 
 
 @patch('Incrementum.yrhilo.connection.cursor')
@@ -100,44 +93,17 @@ def test_day_percent_change_accepts_naive_updated_at(mock_stock_model, mock_curs
     mock_stock_model.objects.bulk_update.assert_not_called()
 
 
-@patch('Incrementum.yrhilo.connection.cursor')
-@patch('Incrementum.yrhilo.StockModel')
-def test_day_percent_change_persists_null_when_no_recalculation_available(mock_stock_model,
-                                                                          mock_cursor):
-    now = timezone.now()
-
-    cache_qs = MagicMock()
-    cache_qs.values.return_value = [
-        {
-            'symbol': 'AAPL',
-            'day_percent_change': None,
-            'updated_at': now - timedelta(hours=2),
-        }
-    ]
-
-    stock_obj = SimpleNamespace(
-        symbol='AAPL',
+@pytest.mark.django_db
+def test_day_percent_change_persists_null_when_no_recalculation_available(stock):
+    _bar(stock, _session(3), 11000)
+    StockModel.objects.filter(symbol='AAPL').update(
         day_percent_change=Decimal('1.0'),
-        updated_at=now - timedelta(hours=2),
+        updated_at=timezone.now() - timedelta(hours=2),
     )
 
-    mock_stock_model.objects.filter.side_effect = [cache_qs, [stock_obj]]
-
-    cursor_ctx = MagicMock()
-    cursor = MagicMock()
-    cursor_ctx.__enter__.return_value = cursor
-    cursor_ctx.__exit__.return_value = None
-    mock_cursor.return_value = cursor_ctx
-
-    cursor.fetchall.return_value = [
-        ('AAPL', 110, now),
-    ]
-
     result = day_percent_change(stocks=['AAPL'])
 
     assert result == {}
-    mock_stock_model.objects.bulk_update.assert_called_once()
-    updated_objs = mock_stock_model.objects.bulk_update.call_args[0][0]
-    assert updated_objs[0].symbol == 'AAPL'
-    assert updated_objs[0].day_percent_change is None
-    assert updated_objs[0].updated_at is not None
+    stock.refresh_from_db()
+    assert stock.day_percent_change is None
+    assert stock.updated_at >= timezone.now() - timedelta(minutes=1)
@@ -54,6 +54,9 @@ urlpatterns = [
     path('stocks/bulk/',
          stocks.get_stocks_by_tickers,
          name='get_stocks_by_tickers'),
+    path('stocks/quotes/',
+         stocks.get_stock_quotes,
+         name='get_stock_quotes'),
 
     # Candlestick pattern endpoints
     path('candlestick/patterns/<str:ticker>/',
@@ -76,6 +79,9 @@ urlpatterns = [
     path('screeners/custom/<int:screener_id>/share/',
          screener_views.get_custom_screener_share_token,
          name='get_custom_screener_share_token'),
+    path('screeners/custom/<int:screener_id>/results/',
+         screener_views.get_custom_screener_results,
+         name='get_custom_screener_results'),
     path('screeners/custom/<int:screener_id>/update/',
          screener_views.update_custom_screener,
          name='update_custom_screener'),
@@ -91,6 +97,12 @@ urlpatterns = [
     path('screeners/database/',
          screener_views.run_database_screener,
          name='run_database_screener'),
+    path('screeners/database/export/',
+         screener_views.export_database_screener,
+         name='export_database_screener'),
+    path('screeners/database/batch/',
+         screener_views.run_database_screener_batch,
+         name='run_database_screener_batch'),
 
     # Filter endpoints
     path('filters/categorical/',
@@ -7,6 +7,7 @@ import pandas as pd
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from Incrementum.conditional import symbol_conditional
 from Incrementum.stock_history_service import StockHistoryService
 from Incrementum.services.candlestick_patterns import CandlestickPatternAnalyzer
 
@@ -60,6 +61,7 @@ def _calculate_summary(patterns: dict, total_candles: int) -> dict:
 
 @csrf_exempt
 @require_http_methods(["GET"])
+@symbol_conditional('candlestick')
 def analyze_candlestick_patterns(request, ticker):
     """
     Analyze candlestick patterns for a given stock ticker.
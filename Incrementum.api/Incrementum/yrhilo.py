@@ -1,8 +1,11 @@
 from django.db import connection
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
+from Incrementum.models.daily_close import DailyClose
 from Incrementum.models.stock import StockModel
+from Incrementum.services.fifty_two_week_service import FiftyTwoWeekService
 
 
 PERCENT_CHANGE_CACHE_TTL_MINUTES = 60
@@ -16,44 +19,26 @@ def _coerce_aware_datetime(value):
     return value
 
 
-def fifty_two_week_high_dict(stock=None, stocks=None):
+def fifty_two_week_range_dict(stock=None, stocks=None):
+    """{symbol: (52-week high, 52-week low)} from one extrema lookup."""
     if stocks is None:
         stocks = [stock] if stock else []
 
     if not stocks:
         return {}
 
-    query = """
-        SELECT DISTINCT ON (stock_symbol) stock_symbol, high
-        FROM incrementum.stock_history
-        WHERE stock_symbol = ANY(%s)
-        ORDER BY stock_symbol, high DESC
-    """
-    with connection.cursor() as cursor:
-        cursor.execute(query, [stocks])
-        results = cursor.fetchall()
-
-    return {row[0]: row[1] for row in results}
+    extrema = FiftyTwoWeekService.extrema(stocks)
+    return {symbol: (row.high, row.low) for symbol, row in extrema.items()}
 
 
-def fifty_two_week_low_dict(stock=None, stocks=None):
-    if stocks is None:
-        stocks = [stock] if stock else []
-
-    if not stocks:
-        return {}
+def fifty_two_week_high_dict(stock=None, stocks=None):
+    ranges = fifty_two_week_range_dict(stock, stocks)
+    return {symbol: high for symbol, (high, _) in ranges.items()}
 
-    query = """
-        SELECT DISTINCT ON (stock_symbol) stock_symbol, low
-        FROM incrementum.stock_history
-        WHERE stock_symbol = ANY(%s)
-        ORDER BY stock_symbol, low ASC
-    """
-    with connection.cursor() as cursor:
-        cursor.execute(query, [stocks])
-        results = cursor.fetchall()
 
-    return {row[0]: row[1] for row in results}
+def fifty_two_week_low_dict(stock=None, stocks=None):
+    ranges = fifty_two_week_range_dict(stock, stocks)
+    return {symbol: low for symbol, (_, low) in ranges.items()}
 
 
 def current_price_dict(stock=None, stocks=None):
@@ -114,46 +99,37 @@ def day_percent_change(stock=None, stocks=None):
     if not stale_or_missing_symbols:
         return percent_changes
 
-    query = """
-        SELECT stock_symbol, close_price, day_and_time
-        FROM incrementum.stock_history
-        WHERE stock_symbol = ANY(%s)
-        AND EXTRACT(HOUR FROM day_and_time) = 17
-        ORDER BY stock_symbol, day_and_time DESC
-    """
-    with connection.cursor() as cursor:
-        cursor.execute(query, [stale_or_missing_symbols])
-        results = cursor.fetchall()
-
-    stock_prices = {}
-    for row in results:
-        symbol = row[0]
-        if symbol not in stock_prices:
-            stock_prices[symbol] = []
-        stock_prices[symbol].append(row[1])
+    # The newest daily_close row carries both the latest session close and
+    # the one before it, so each symbol is a single keyed lookup. The stock
+    # rows to refresh come back from the same query.
+    latest_close = DailyClose.objects.filter(
+        stock_symbol=OuterRef('symbol')
+    ).order_by('-trading_date')
+    stocks_to_update = list(
+        StockModel.objects.filter(symbol__in=stale_or_missing_symbols).annotate(
+            session_close=Subquery(latest_close.values('close_price')[:1]),
+            session_prev_close=Subquery(latest_close.values('prev_close')[:1]),
+        )
+    )
 
     recalculated_changes = {}
-    for symbol, prices in stock_prices.items():
-        if len(prices) >= 2 and prices[1] != 0:
-            percent_change = ((prices[0] - prices[1]) / prices[1]) * 100
-            recalculated_changes[symbol] = percent_change
-
-    if stale_or_missing_symbols:
-        stocks_to_update = StockModel.objects.filter(
-            symbol__in=stale_or_missing_symbols
-        )
-        for stock_obj in stocks_to_update:
-            recalculated_value = recalculated_changes.get(stock_obj.symbol)
-            stock_obj.day_percent_change = (
-                Decimal(str(recalculated_value))
-                if recalculated_value is not None
-                else None
-            )
-            stock_obj.updated_at = now
-        StockModel.objects.bulk_update(
-            stocks_to_update,
-            ['day_percent_change', 'updated_at'],
+    for stock_obj in stocks_to_update:
+        close, prev_close = stock_obj.session_close, stock_obj.session_prev_close
+        if close is not None and prev_close:
+            recalculated_changes[stock_obj.symbol] = (close - prev_close) / prev_close * 100
+
+    for stock_obj in stocks_to_update:
+        recalculated_value = recalculated_changes.get(stock_obj.symbol)
+        stock_obj.day_percent_change = (
+            Decimal(str(recalculated_value))
+            if recalculated_value is not None
+            else None
         )
+        stock_obj.updated_at = now
+    StockModel.objects.bulk_update(
+        stocks_to_update,
+        ['day_percent_change', 'updated_at'],
+    )
 
     percent_changes.update(recalculated_changes)
 
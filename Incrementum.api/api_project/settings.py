@@ -119,6 +119,61 @@ else:
         }
     }
 
+# Screener backend: 'database' builds a Django query per request, 'columnar'
+# serves screens from an in-memory NumPy snapshot of the stock table.
+SCREENER_ENGINE = os.environ.get('SCREENER_ENGINE', 'database').lower()
+SCREENER_ENGINE_MAX_AGE_SECONDS = int(os.environ.get('SCREENER_ENGINE_MAX_AGE_SECONDS', '300'))
+
+# Screener result/count caches and the data-generation counter share this
+# alias. locmem evicts least-recently-used entries past MAX_ENTRIES; use a
+# shared backend (e.g. FileBasedCache) so bump_data_generation reaches every
+# worker process. The result cache stays off on a process-local backend even
+# when enabled, since other workers would keep serving pages from before a
+# bump.
+SCREENER_CACHE_ALIAS = 'screener'
+SCREENER_RESULT_CACHE_ENABLED = (
+    os.environ.get('SCREENER_RESULT_CACHE_ENABLED', 'False').lower() in ('true', '1', 'yes')
+)
+SCREENER_RESULT_CACHE_TIMEOUT = int(os.environ.get('SCREENER_RESULT_CACHE_TIMEOUT', '300'))
+SCREENER_RESULT_CACHE_MAX_ENTRY_BYTES = int(
+    os.environ.get('SCREENER_RESULT_CACHE_MAX_ENTRY_BYTES', str(1024 * 1024))
+)
+
+# Chart history, candlestick and metadata responses send ETag/Last-Modified
+# validators from the symbol's latest bar; shared caches may reuse them for
+# this many seconds.
+HISTORY_CACHE_MAX_AGE = int(os.environ.get('HISTORY_CACHE_MAX_AGE', '60'))
+
+# Per-process LRU of per-symbol stock_history arrays behind
+# StockHistoryService.get_db_history (0 disables it). Entries are reloaded in
+# full after HISTORY_ARRAY_CACHE_REFRESH_SECONDS to pick up corrected bars.
+HISTORY_ARRAY_CACHE_MAX_BYTES = int(
+    os.environ.get('HISTORY_ARRAY_CACHE_MAX_BYTES', str(64 * 1024 * 1024))
+)
+HISTORY_ARRAY_CACHE_REFRESH_SECONDS = int(
+    os.environ.get('HISTORY_ARRAY_CACHE_REFRESH_SECONDS', '3600')
+)
+
+# Directory of memory-mapped per-symbol history files, kept current by
+# `manage.py sync_history_store`. Empty disables the store.
+HISTORY_STORE_PATH = os.environ.get('HISTORY_STORE_PATH', '')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'screener': {
+        'BACKEND': os.environ.get(
+            'SCREENER_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('SCREENER_CACHE_LOCATION', 'screener'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SCREENER_CACHE_MAX_ENTRIES', '2000')),
+        },
+    },
+}
+
 MIGRATION_MODULES = {
     'Incrementum': None,
     'admin': None,
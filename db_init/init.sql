@@ -45,7 +45,18 @@ create table incrementum.stock (
     price_per_sales numeric(20, 2)
 );
 
+-- Trigram indexes so ILIKE substring/wildcard filters and autocomplete on
+-- ticker, company name and industry are index lookups instead of seq scans.
+create extension if not exists pg_trgm;
+create index stock_symbol_trgm on incrementum.stock using gin (symbol gin_trgm_ops);
+create index stock_company_name_trgm on incrementum.stock using gin (company_name gin_trgm_ops);
+create index stock_sic_description_trgm on incrementum.stock using gin (sic_description gin_trgm_ops);
+
+-- History is range-partitioned by month (stock_history_YYYY_MM) so time
+-- ranges prune to a few partitions and old months can be detached for
+-- retention; see the stock_history_partitions management command.
 create table incrementum.stock_history (
+    id bigint generated by default as identity,
     stock_symbol varchar(20) not null references incrementum.stock(symbol),
     day_and_time timestamp not null,
     open_price integer not null,
@@ -53,8 +64,391 @@ create table incrementum.stock_history (
     high integer not null,
     low integer not null,
     volume integer not null,
-    is_hourly boolean default true
+    is_hourly boolean not null default true,
+    primary key (stock_symbol, day_and_time)
+) partition by range (day_and_time);
+
+create table incrementum.stock_history_default partition of incrementum.stock_history default;
+
+create index stock_history_symbol_hourly_time
+    on incrementum.stock_history (stock_symbol, is_hourly, day_and_time);
+create index stock_history_time_brin
+    on incrementum.stock_history using brin (day_and_time);
+
+-- Creates the month's partition with PARTITION OF while the default
+-- partition is detached, moves any of its rows out of the default, then
+-- re-attaches the default (a partition cannot be created while the default
+-- holds rows for its range).
+create or replace function incrementum.create_stock_history_partition(month date) returns text as $$
+declare
+    start_at date := date_trunc('month', month)::date;
+    end_at date := (date_trunc('month', month) + interval '1 month')::date;
+    partition_name text := 'stock_history_' || to_char(start_at, 'YYYY_MM');
+begin
+    if to_regclass(format('incrementum.%I', partition_name)) is not null then
+        return partition_name;
+    end if;
+
+    alter table incrementum.stock_history detach partition incrementum.stock_history_default;
+    execute format(
+        'create table incrementum.%I partition of incrementum.stock_history '
+        'for values from (%L) to (%L)',
+        partition_name, start_at, end_at
+    );
+    execute format(
+        'with moved as ('
+        '    delete from incrementum.stock_history_default'
+        '    where day_and_time >= %L and day_and_time < %L'
+        '    returning *'
+        ') insert into incrementum.%I select * from moved',
+        start_at, end_at, partition_name
+    );
+    alter table incrementum.stock_history
+        attach partition incrementum.stock_history_default default;
+    return partition_name;
+end;
+$$ language plpgsql;
+
+select incrementum.create_stock_history_partition(month::date)
+from generate_series(
+    date_trunc('month', now() at time zone 'UTC') - interval '5 years',
+    date_trunc('month', now() at time zone 'UTC') + interval '2 months',
+    interval '1 month'
+) as month;
+
+-- Latest bar per symbol, kept current by a statement-level trigger so the
+-- screener can join it instead of running a subquery per stock.
+create table incrementum.latest_bar (
+    stock_symbol varchar(20) primary key references incrementum.stock(symbol) on delete cascade,
+    day_and_time timestamp not null,
+    open_price integer not null,
+    close_price integer not null,
+    high integer not null,
+    low integer not null,
+    volume integer not null
+);
+
+create or replace function incrementum.refresh_latest_bar() returns trigger as $$
+begin
+    insert into incrementum.latest_bar as lb (
+        stock_symbol, day_and_time, open_price, close_price, high, low, volume
+    )
+    select distinct on (stock_symbol)
+        stock_symbol, day_and_time, open_price, close_price, high, low, volume
+    from new_bars
+    order by stock_symbol, day_and_time desc
+    on conflict (stock_symbol) do update set
+        day_and_time = excluded.day_and_time,
+        open_price = excluded.open_price,
+        close_price = excluded.close_price,
+        high = excluded.high,
+        low = excluded.low,
+        volume = excluded.volume
+    where excluded.day_and_time >= lb.day_and_time;
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_latest_bar
+    after insert on incrementum.stock_history
+    referencing new table as new_bars
+    for each statement execute function incrementum.refresh_latest_bar();
+
+-- Deleting or correcting a symbol's newest bar rebuilds its latest_bar row
+-- from stock_history (one index probe per affected symbol).
+create or replace function incrementum.resync_latest_bar(symbols varchar[]) returns void as $$
+    delete from incrementum.latest_bar where stock_symbol = any(symbols);
+
+    insert into incrementum.latest_bar (
+        stock_symbol, day_and_time, open_price, close_price, high, low, volume
+    )
+    select s.symbol, b.day_and_time, b.open_price, b.close_price, b.high, b.low, b.volume
+    from unnest(symbols) as s(symbol)
+    cross join lateral (
+        select day_and_time, open_price, close_price, high, low, volume
+        from incrementum.stock_history
+        where stock_symbol = s.symbol
+        order by day_and_time desc
+        limit 1
+    ) b;
+$$ language sql;
+
+create or replace function incrementum.latest_bar_after_delete() returns trigger as $$
+begin
+    perform incrementum.resync_latest_bar(array(
+        select distinct o.stock_symbol
+        from old_bars o
+        join incrementum.latest_bar lb on lb.stock_symbol = o.stock_symbol
+        where o.day_and_time >= lb.day_and_time
+    ));
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace function incrementum.latest_bar_after_update() returns trigger as $$
+begin
+    perform incrementum.resync_latest_bar(array(
+        select o.stock_symbol
+        from old_bars o
+        join incrementum.latest_bar lb on lb.stock_symbol = o.stock_symbol
+        where o.day_and_time >= lb.day_and_time
+        union
+        select n.stock_symbol
+        from new_bars n
+        left join incrementum.latest_bar lb on lb.stock_symbol = n.stock_symbol
+        where lb.day_and_time is null or n.day_and_time >= lb.day_and_time
+    ));
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_latest_bar_delete
+    after delete on incrementum.stock_history
+    referencing old table as old_bars
+    for each statement execute function incrementum.latest_bar_after_delete();
+
+create trigger stock_history_latest_bar_update
+    after update on incrementum.stock_history
+    referencing old table as old_bars new table as new_bars
+    for each statement execute function incrementum.latest_bar_after_update();
+
+-- Trailing 52-week high/low per symbol. The trigger only ever raises the
+-- high or lowers the low; FiftyTwoWeekService recomputes a side from the
+-- window once its extreme is older than 52 weeks.
+create table incrementum.fifty_two_week_extrema (
+    stock_symbol varchar(20) primary key references incrementum.stock(symbol) on delete cascade,
+    high integer not null,
+    high_at timestamp not null,
+    low integer not null,
+    low_at timestamp not null
+);
+
+create or replace function incrementum.refresh_fifty_two_week_extrema() returns trigger as $$
+begin
+    insert into incrementum.fifty_two_week_extrema as e (stock_symbol, high, high_at, low, low_at)
+    select h.stock_symbol, h.high, h.day_and_time, l.low, l.day_and_time
+    from (
+        select distinct on (stock_symbol) stock_symbol, high, day_and_time
+        from new_bars
+        where day_and_time >= (now() at time zone 'UTC') - interval '52 weeks'
+        order by stock_symbol, high desc, day_and_time desc
+    ) h
+    join (
+        select distinct on (stock_symbol) stock_symbol, low, day_and_time
+        from new_bars
+        where day_and_time >= (now() at time zone 'UTC') - interval '52 weeks'
+        order by stock_symbol, low asc, day_and_time desc
+    ) l on l.stock_symbol = h.stock_symbol
+    on conflict (stock_symbol) do update set
+        high = case when excluded.high > e.high
+            or (excluded.high = e.high and excluded.high_at >= e.high_at)
+            then excluded.high else e.high end,
+        high_at = case when excluded.high > e.high
+            or (excluded.high = e.high and excluded.high_at >= e.high_at)
+            then excluded.high_at else e.high_at end,
+        low = case when excluded.low < e.low
+            or (excluded.low = e.low and excluded.low_at >= e.low_at)
+            then excluded.low else e.low end,
+        low_at = case when excluded.low < e.low
+            or (excluded.low = e.low and excluded.low_at >= e.low_at)
+            then excluded.low_at else e.low_at end;
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_fifty_two_week
+    after insert on incrementum.stock_history
+    referencing new table as new_bars
+    for each statement execute function incrementum.refresh_fifty_two_week_extrema();
+
+-- Session close (the 17:00 bar) and previous session close per symbol and
+-- trading date, so day-over-day change is a keyed lookup.
+create table incrementum.daily_close (
+    stock_symbol varchar(20) not null references incrementum.stock(symbol) on delete cascade,
+    trading_date date not null,
+    close_price integer not null,
+    prev_close integer,
+    primary key (stock_symbol, trading_date)
 );
+
+create or replace function incrementum.refresh_daily_close() returns trigger as $$
+begin
+    insert into incrementum.daily_close (stock_symbol, trading_date, close_price)
+    select distinct on (stock_symbol, day_and_time::date)
+        stock_symbol, day_and_time::date, close_price
+    from new_bars
+    where extract(hour from day_and_time) = 17
+    order by stock_symbol, day_and_time::date, day_and_time desc
+    on conflict (stock_symbol, trading_date) do update set
+        close_price = excluded.close_price;
+
+    update incrementum.daily_close dc set prev_close = (
+        select p.close_price from incrementum.daily_close p
+        where p.stock_symbol = dc.stock_symbol
+        and p.trading_date < dc.trading_date
+        order by p.trading_date desc
+        limit 1
+    )
+    from (
+        select stock_symbol, min(day_and_time::date) as since
+        from new_bars
+        where extract(hour from day_and_time) = 17
+        group by stock_symbol
+    ) changed
+    where dc.stock_symbol = changed.stock_symbol
+    and dc.trading_date >= changed.since;
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_daily_close
+    after insert on incrementum.stock_history
+    referencing new table as new_bars
+    for each statement execute function incrementum.refresh_daily_close();
+
+-- OHLCV buckets at the chart intervals, maintained as bars land so
+-- StockHistoryService.history() never resamples at request time. Minute bars
+-- feed every interval; hourly bars feed 1d and 1wk.
+create table incrementum.stock_history_rollup (
+    stock_symbol varchar(20) not null references incrementum.stock(symbol) on delete cascade,
+    bucket_interval varchar(4) not null,
+    is_hourly boolean not null,
+    bucket timestamp not null,
+    open_price integer not null,
+    open_at timestamp not null,
+    close_price integer not null,
+    close_at timestamp not null,
+    high integer not null,
+    low integer not null,
+    volume bigint not null,
+    primary key (stock_symbol, bucket_interval, is_hourly, bucket)
+);
+
+create or replace function incrementum.stock_history_bucket(bucket_interval text, ts timestamp)
+returns timestamp as $$
+    select case bucket_interval
+        when '5m' then date_trunc('hour', ts)
+            + floor(extract(minute from ts) / 5) * interval '5 minutes'
+        when '15m' then date_trunc('hour', ts)
+            + floor(extract(minute from ts) / 15) * interval '15 minutes'
+        when '30m' then date_trunc('hour', ts)
+            + floor(extract(minute from ts) / 30) * interval '30 minutes'
+        when '1h' then date_trunc('hour', ts)
+        when '1d' then date_trunc('day', ts)
+        when '1wk' then date_trunc('week', ts) + interval '6 days'
+    end
+$$ language sql immutable;
+
+create or replace function incrementum.refresh_stock_history_rollup() returns trigger as $$
+begin
+    insert into incrementum.stock_history_rollup as r (
+        stock_symbol, bucket_interval, is_hourly, bucket,
+        open_price, open_at, close_price, close_at, high, low, volume
+    )
+    select
+        b.stock_symbol, i.bucket_interval, b.is_hourly,
+        incrementum.stock_history_bucket(i.bucket_interval, b.day_and_time),
+        (array_agg(b.open_price order by b.day_and_time))[1], min(b.day_and_time),
+        (array_agg(b.close_price order by b.day_and_time desc))[1], max(b.day_and_time),
+        max(b.high), min(b.low), sum(b.volume)
+    from new_bars b
+    join (values
+        ('5m', false), ('15m', false), ('30m', false), ('1h', false),
+        ('1d', false), ('1wk', false), ('1d', true), ('1wk', true)
+    ) as i(bucket_interval, is_hourly) on i.is_hourly = b.is_hourly
+    group by 1, 2, 3, 4
+    on conflict (stock_symbol, bucket_interval, is_hourly, bucket) do update set
+        open_price = case when excluded.open_at < r.open_at
+            then excluded.open_price else r.open_price end,
+        open_at = least(r.open_at, excluded.open_at),
+        close_price = case when excluded.close_at >= r.close_at
+            then excluded.close_price else r.close_price end,
+        close_at = greatest(r.close_at, excluded.close_at),
+        high = greatest(r.high, excluded.high),
+        low = least(r.low, excluded.low),
+        volume = r.volume + excluded.volume;
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_rollup
+    after insert on incrementum.stock_history
+    referencing new table as new_bars
+    for each statement execute function incrementum.refresh_stock_history_rollup();
+
+-- Deleting or correcting bars rebuilds every bucket of each (symbol, source,
+-- week) they touched; all intervals nest inside a Monday-to-Sunday week.
+create or replace function incrementum.resync_stock_history_rollup(
+    symbols varchar[], hourly boolean[], weeks timestamp[]
+) returns void as $$
+    delete from incrementum.stock_history_rollup r
+    using unnest(symbols, hourly, weeks) as w(stock_symbol, is_hourly, week)
+    where r.stock_symbol = w.stock_symbol
+        and r.is_hourly = w.is_hourly
+        and r.bucket >= w.week
+        and r.bucket < w.week + interval '7 days';
+
+    insert into incrementum.stock_history_rollup (
+        stock_symbol, bucket_interval, is_hourly, bucket,
+        open_price, open_at, close_price, close_at, high, low, volume
+    )
+    select
+        b.stock_symbol, i.bucket_interval, b.is_hourly,
+        incrementum.stock_history_bucket(i.bucket_interval, b.day_and_time),
+        (array_agg(b.open_price order by b.day_and_time))[1], min(b.day_and_time),
+        (array_agg(b.close_price order by b.day_and_time desc))[1], max(b.day_and_time),
+        max(b.high), min(b.low), sum(b.volume)
+    from unnest(symbols, hourly, weeks) as w(stock_symbol, is_hourly, week)
+    join incrementum.stock_history b
+        on b.stock_symbol = w.stock_symbol
+        and b.is_hourly = w.is_hourly
+        and b.day_and_time >= w.week
+        and b.day_and_time < w.week + interval '7 days'
+    join (values
+        ('5m', false), ('15m', false), ('30m', false), ('1h', false),
+        ('1d', false), ('1wk', false), ('1d', true), ('1wk', true)
+    ) as i(bucket_interval, is_hourly) on i.is_hourly = b.is_hourly
+    group by 1, 2, 3, 4;
+$$ language sql;
+
+create or replace function incrementum.stock_history_rollup_after_delete() returns trigger as $$
+begin
+    perform incrementum.resync_stock_history_rollup(
+        array_agg(stock_symbol), array_agg(is_hourly), array_agg(week)
+    )
+    from (
+        select distinct stock_symbol, is_hourly, date_trunc('week', day_and_time) as week
+        from old_bars
+    ) changed;
+    return null;
+end;
+$$ language plpgsql;
+
+create or replace function incrementum.stock_history_rollup_after_update() returns trigger as $$
+begin
+    perform incrementum.resync_stock_history_rollup(
+        array_agg(stock_symbol), array_agg(is_hourly), array_agg(week)
+    )
+    from (
+        select stock_symbol, is_hourly, date_trunc('week', day_and_time) as week
+        from old_bars
+        union
+        select stock_symbol, is_hourly, date_trunc('week', day_and_time) as week
+        from new_bars
+    ) changed;
+    return null;
+end;
+$$ language plpgsql;
+
+create trigger stock_history_rollup_delete
+    after delete on incrementum.stock_history
+    referencing old table as old_bars
+    for each statement execute function incrementum.stock_history_rollup_after_delete();
+
+create trigger stock_history_rollup_update
+    after update on incrementum.stock_history
+    referencing old table as old_bars new table as new_bars
+    for each statement execute function incrementum.stock_history_rollup_after_update();
     
 create table incrementum.screener (
     id int primary key generated always as identity,
@@ -68,9 +462,36 @@ create table incrementum.custom_screener (
     screener_name varchar(100) not null,
     created_at timestamp not null default current_timestamp,
     is_private boolean not null default true,
-    filters json not null
+    filters json not null,
+    results_as_of timestamp,
+    results_stale boolean not null default true
+);
+
+-- Precomputed matches for saved screeners, rewritten by the
+-- evaluate_saved_screeners job after each data refresh.
+create table incrementum.custom_screener_result (
+    id int primary key generated always as identity,
+    custom_screener_id int not null references incrementum.custom_screener(id) on delete cascade,
+    stock_symbol varchar(20) not null references incrementum.stock(symbol) on delete cascade,
+    position integer not null,
+    market_cap bigint,
+    price integer,
+    day_percent_change numeric(12, 6),
+    volume bigint,
+    unique (custom_screener_id, stock_symbol)
 );
 
+create index custom_screener_result_pos
+    on incrementum.custom_screener_result (custom_screener_id, position);
+create index custom_screener_result_cap
+    on incrementum.custom_screener_result (custom_screener_id, market_cap);
+create index custom_screener_result_price
+    on incrementum.custom_screener_result (custom_screener_id, price);
+create index custom_screener_result_pct
+    on incrementum.custom_screener_result (custom_screener_id, day_percent_change);
+create index custom_screener_result_vol
+    on incrementum.custom_screener_result (custom_screener_id, volume);
+
 create table incrementum.custom_collection (
     id int primary key generated always as identity,
     account_id int not null references incrementum.account(id),
@@ -65,6 +65,8 @@ echo -e "${YELLOW}Deploying API with image tag: $IMAGE_TAG${NC}"
 # Replace image tag placeholder
 sed "s/\${IMAGE_TAG}/$IMAGE_TAG/g" kubernetes/api-deployment.yaml | kubectl apply -f -
 kubectl apply -f kubernetes/api-service.yaml
+kubectl apply -f kubernetes/partition-cronjob.yaml
+kubectl apply -f kubernetes/saved-screener-cronjob.yaml
 
 # Deploy Client
 echo -e "${YELLOW}Deploying Client with image tag: $IMAGE_TAG${NC}"